@@ -0,0 +1,307 @@
+# admission.py
+# Keeps duplicate and concurrent kiosk requests from corrupting sessions or multiplying provider
+# calls, and keeps tail latency bounded under rushes:
+# - SessionLocks: one turn at a time per session (load -> plan -> LLM -> save is not atomic).
+# - TurnCoalescer: a duplicate of an in-flight turn / transcription (retry, double tap) waits for
+#   the first one's result instead of running again; with an Idempotency-Key the result is also
+#   replayed to a retry that arrives after it finished.
+# - AdmissionController + AdmissionMiddleware: at most N kiosk requests are worked on at once,
+#   the rest wait in a bounded priority queue (running conversations before new /start calls)
+#   and get a fast 429 when it is full or the wait is too long; new conversations are let in at a
+#   bounded rate, so a rush cannot swamp the ones already running.
+# All of it is per process: with serve.py, a retry that lands on another worker is not coalesced.
+
+import asyncio
+import hashlib
+import heapq
+import itertools
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Mapping, Optional, Tuple
+
+# ============ CONFIGURATION ============
+TURN_COALESCING = os.getenv("TURN_COALESCING", "1").lower() in ("1", "true", "yes")
+# How long a finished result is replayed: requests with an Idempotency-Key header / without one.
+# Keyless duplicates are matched on session + content, and a visitor may well answer "yes" twice
+# in a row, so by default they only share a turn that is still running.
+IDEMPOTENCY_TTL_S = float(os.getenv("IDEMPOTENCY_TTL_S", "120"))
+COALESCE_REPLAY_S = float(os.getenv("COALESCE_REPLAY_S", "0"))
+COALESCE_MAX_KEYS = int(os.getenv("COALESCE_MAX_KEYS", "10000"))
+# Kiosk requests worked on at once (0 disables admission control) and how many may wait for a slot
+ADMISSION_MAX_ACTIVE = int(os.getenv("ADMISSION_MAX_ACTIVE", "64"))
+ADMISSION_QUEUE_MAX = int(os.getenv("ADMISSION_QUEUE_MAX", "128"))
+# New conversations only queue while the queue is shorter than this; beyond it /start gets a 429 first
+ADMISSION_START_QUEUE_MAX = int(os.getenv("ADMISSION_START_QUEUE_MAX", "16"))
+# New conversations per second (token bucket, 0 = unlimited): /start is cheap, the turns that follow
+# are not, so a rush is let in at this pace instead of all at once
+ADMISSION_START_RATE = float(os.getenv("ADMISSION_START_RATE", "5"))
+ADMISSION_START_BURST = int(os.getenv("ADMISSION_START_BURST", "20"))
+ADMISSION_QUEUE_TIMEOUT_S = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_S", "5"))
+# Retry-After sent with a 429 (whole seconds)
+ADMISSION_RETRY_AFTER_S = int(os.getenv("ADMISSION_RETRY_AFTER_S", "1"))
+
+PRIORITY_ACTIVE = 0  # a running conversation: /chat, /stt, /tts, /turn, /audio
+PRIORITY_NEW = 1  # /start
+
+
+def turn_key(kind: str, session_id: str, content: bytes, idempotency_key: Optional[str]) -> Tuple[str, float]:
+    """Coalescing key and replay window: the client's Idempotency-Key, else session + content hash."""
+    if idempotency_key:
+        return f"{kind}:{session_id}:key:{idempotency_key}", IDEMPOTENCY_TTL_S
+    return f"{kind}:{session_id}:{hashlib.blake2b(content, digest_size=16).hexdigest()}", COALESCE_REPLAY_S
+
+
+class SessionLocks:
+    """One asyncio.Lock per session with waiters; dropped when nobody holds or waits for it."""
+
+    def __init__(self):
+        self._locks: Dict[str, List[Any]] = {}  # session_id -> [lock, holders + waiters]
+        self.acquired = 0
+        self.contended = 0
+
+    async def acquire(self, session_id: str):
+        entry = self._locks.get(session_id)
+        if entry is None:
+            entry = self._locks[session_id] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        if entry[0].locked():
+            self.contended += 1
+        try:
+            await entry[0].acquire()
+        except BaseException:
+            self._unref(session_id, entry)
+            raise
+        self.acquired += 1
+
+    def release(self, session_id: str):
+        entry = self._locks[session_id]
+        entry[0].release()
+        self._unref(session_id, entry)
+
+    def _unref(self, session_id: str, entry: List[Any]):
+        entry[1] -= 1
+        if entry[1] == 0:
+            del self._locks[session_id]
+
+    @asynccontextmanager
+    async def hold(self, session_id: str) -> AsyncIterator[None]:
+        await self.acquire(session_id)
+        try:
+            yield
+        finally:
+            self.release(session_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"locked_sessions": len(self._locks), "acquired": self.acquired, "contended": self.contended}
+
+
+class TurnCoalescer:
+    """
+    key -> future of the first request's result. Failures are not kept: waiters get the error,
+    the next retry runs again. Waiters are shielded, so a client hanging up on a duplicate
+    never cancels the original.
+    """
+
+    def __init__(self, max_keys: int = COALESCE_MAX_KEYS, enabled: bool = TURN_COALESCING):
+        self.max_keys = max_keys
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, Tuple[asyncio.Future, float]]" = OrderedDict()  # key -> (future, expires)
+        self.started = 0
+        self.coalesced = 0  # attached to a request still in flight
+        self.replayed = 0  # served a finished result
+
+    def _purge(self, now: float):
+        for key in [k for k, (fut, expires) in self._entries.items() if fut.done() and expires < now]:
+            del self._entries[key]
+        while len(self._entries) > self.max_keys:
+            key, (fut, _) = next(iter(self._entries.items()))
+            if not fut.done():
+                break  # in-flight entries are never dropped
+            del self._entries[key]
+
+    def lookup(self, key: str) -> Optional["asyncio.Future"]:
+        """The first request's future if this one is a duplicate, else None."""
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        fut, expires = entry
+        if not fut.done():
+            self.coalesced += 1
+            return fut
+        if expires >= time.monotonic() and not fut.cancelled() and fut.exception() is None:
+            self.replayed += 1
+            return fut
+        del self._entries[key]
+        return None
+
+    def begin(self, key: str) -> "asyncio.Future":
+        fut = asyncio.get_running_loop().create_future()
+        if self.enabled:
+            self._purge(time.monotonic())
+            self._entries[key] = (fut, float("inf"))
+        self.started += 1
+        return fut
+
+    def finish(self, key: str, fut: "asyncio.Future", result: Any, ttl_s: float):
+        if fut.done():
+            return
+        fut.set_result(result)
+        if self._entries.get(key, (None,))[0] is fut:
+            if ttl_s > 0:
+                self._entries[key] = (fut, time.monotonic() + ttl_s)
+            else:
+                del self._entries[key]
+
+    def fail(self, key: str, fut: "asyncio.Future", error: BaseException):
+        if fut.done():
+            return
+        if isinstance(error, asyncio.CancelledError):
+            fut.cancel()
+        else:
+            fut.set_exception(error)
+            fut.exception()  # mark retrieved when nobody else was waiting
+        if self._entries.get(key, (None,))[0] is fut:
+            del self._entries[key]
+
+    async def run(self, key: str, ttl_s: float, factory: Callable[[], Awaitable[Any]]) -> Any:
+        existing = self.lookup(key)
+        if existing is not None:
+            return await asyncio.shield(existing)
+        fut = self.begin(key)
+        try:
+            result = await factory()
+        except BaseException as e:
+            self.fail(key, fut, e)
+            raise
+        self.finish(key, fut, result, ttl_s)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "keys": len(self._entries), "started": self.started,
+                "coalesced": self.coalesced, "replayed": self.replayed}
+
+
+class AdmissionController:
+    """
+    A counting semaphore with a bounded priority queue in front: a freed slot goes to the
+    highest-priority, longest-waiting request. New conversations also take a token from a
+    rate-limited bucket. acquire() returns False for a 429.
+    """
+
+    def __init__(self, max_active: int = ADMISSION_MAX_ACTIVE, queue_max: int = ADMISSION_QUEUE_MAX,
+                 start_queue_max: int = ADMISSION_START_QUEUE_MAX, queue_timeout_s: float = ADMISSION_QUEUE_TIMEOUT_S,
+                 start_rate: float = ADMISSION_START_RATE, start_burst: int = ADMISSION_START_BURST):
+        self.max_active = max_active
+        self.queue_max = queue_max
+        self.start_queue_max = start_queue_max
+        self.queue_timeout_s = queue_timeout_s
+        self.start_rate = start_rate
+        self.start_burst = start_burst
+        self._start_tokens = float(start_burst)
+        self._start_refilled = time.monotonic()
+        self.active = 0
+        self.queued = 0
+        self._heap: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self.counters: Dict[str, int] = {"admitted": 0, "queued": 0, "rejected_full": 0, "rejected_timeout": 0,
+                                         "rejected_start_rate": 0}
+        self.max_wait_s = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_active > 0
+
+    def _take_start_token(self) -> bool:
+        if self.start_rate <= 0:
+            return True
+        now = time.monotonic()
+        self._start_tokens = min(self.start_burst, self._start_tokens + (now - self._start_refilled) * self.start_rate)
+        self._start_refilled = now
+        if self._start_tokens < 1:
+            return False
+        self._start_tokens -= 1
+        return True
+
+    async def acquire(self, priority: int) -> bool:
+        if priority >= PRIORITY_NEW and not self._take_start_token():
+            self.counters["rejected_start_rate"] += 1
+            return False
+        if self.active < self.max_active and not self.queued:
+            self.active += 1
+            self.counters["admitted"] += 1
+            return True
+        limit = self.start_queue_max if priority >= PRIORITY_NEW else self.queue_max
+        if self.queued >= limit:
+            self.counters["rejected_full"] += 1
+            return False
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (priority, next(self._seq), fut))
+        self.queued += 1
+        self.counters["queued"] += 1
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), self.queue_timeout_s)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if fut.done():
+                self.release()  # handed a slot just as we gave up: pass it on
+            else:
+                fut.cancel()
+                self.queued -= 1
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.counters["rejected_timeout"] += 1
+            return False
+        self.max_wait_s = max(self.max_wait_s, time.perf_counter() - start)
+        self.counters["admitted"] += 1
+        return True
+
+    def release(self):
+        while self._heap:
+            _, _, fut = heapq.heappop(self._heap)
+            if not fut.done():
+                self.queued -= 1
+                fut.set_result(True)  # the slot moves to the waiter; active stays the same
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "max_active": self.max_active, "active": self.active, "queued": self.queued,
+                **self.counters, "max_wait_ms": round(self.max_wait_s * 1000, 1)}
+
+
+class AdmissionMiddleware:
+    """Gates the kiosk routes (path -> priority) through the controller; everything else passes."""
+
+    def __init__(self, app, controller: AdmissionController, priorities: Mapping[str, int]):
+        self.app = app
+        self.controller = controller
+        self.priorities = dict(priorities)
+
+    def _priority(self, path: str) -> Optional[int]:
+        priority = self.priorities.get(path)
+        if priority is None and path.startswith("/audio/"):
+            priority = self.priorities.get("/audio/")
+        return priority
+
+    async def __call__(self, scope, receive, send):
+        priority = self._priority(scope["path"]) if scope["type"] == "http" else None
+        if priority is None or not self.controller.enabled:
+            return await self.app(scope, receive, send)
+        if not await self.controller.acquire(priority):
+            return await _too_busy(send, ADMISSION_RETRY_AFTER_S)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
+
+
+async def _too_busy(send, retry_after_s: int):
+    body = b'{"detail":"Server busy, retry shortly"}'
+    await send({"type": "http.response.start", "status": 429,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()),
+                            (b"retry-after", str(retry_after_s).encode())]})
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,276 @@
+# analytics.py
+# Feedback analytics: the JSONL feedback log (including rotated files) is ingested incrementally
+# by byte offset into SQLite: an indexed events table plus running aggregates per day, exhibit,
+# question and choice, updated in the same transaction. Queries read the aggregates, so their
+# latency depends on the number of exhibits/questions/days, not on the size of the log.
+
+import glob
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ============ CONFIGURATION ============
+ANALYTICS_DB_PATH = os.getenv("ANALYTICS_DB_PATH", "data/analytics.db")
+# Background ingestion of the feedback log (0 disables; POST /analytics/ingest still works)
+ANALYTICS_INGEST_INTERVAL_S = float(os.getenv("ANALYTICS_INGEST_INTERVAL_S", "30"))
+# Lines per transaction: bounds memory and how long a worker holds the write lock
+ANALYTICS_BATCH_LINES = int(os.getenv("ANALYTICS_BATCH_LINES", "50000"))
+ANALYTICS_RECENT_ANSWERS = int(os.getenv("ANALYTICS_RECENT_ANSWERS", "20"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    day TEXT NOT NULL,
+    ts TEXT,
+    session_id TEXT,
+    type TEXT NOT NULL,
+    exhibit TEXT NOT NULL,
+    question_id TEXT,
+    choice TEXT,
+    answer TEXT
+);
+CREATE INDEX IF NOT EXISTS events_question ON events(question_id, id);
+CREATE INDEX IF NOT EXISTS events_exhibit_day ON events(exhibit, day);
+CREATE INDEX IF NOT EXISTS events_day ON events(day);
+CREATE TABLE IF NOT EXISTS totals (
+    exhibit TEXT NOT NULL, type TEXT NOT NULL, n INTEGER NOT NULL,
+    PRIMARY KEY (exhibit, type)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS daily_counts (
+    day TEXT NOT NULL, exhibit TEXT NOT NULL, type TEXT NOT NULL, n INTEGER NOT NULL,
+    PRIMARY KEY (day, exhibit, type)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS question_daily (
+    exhibit TEXT NOT NULL, question_id TEXT NOT NULL, day TEXT NOT NULL, n INTEGER NOT NULL,
+    PRIMARY KEY (question_id, day, exhibit)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS question_daily_exhibit ON question_daily(exhibit, day);
+CREATE TABLE IF NOT EXISTS choice_counts (
+    exhibit TEXT NOT NULL, question_id TEXT NOT NULL, choice TEXT NOT NULL, n INTEGER NOT NULL,
+    PRIMARY KEY (exhibit, question_id, choice)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS choice_counts_question ON choice_counts(question_id);
+CREATE TABLE IF NOT EXISTS ingest_state (
+    file_key TEXT PRIMARY KEY, path TEXT NOT NULL, offset INTEGER NOT NULL, updated_at REAL NOT NULL
+);
+"""
+
+
+def _file_key(path: str) -> Optional[str]:
+    """inode + hash of the first line: survives rotation (rename), not fooled by inode reuse."""
+    try:
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            first = f.readline(4096)
+    except OSError:
+        return None
+    if not first.endswith(b"\n"):
+        return None  # not even one complete line yet
+    return f"{st.st_ino}:{zlib.crc32(first):08x}"
+
+
+def _row(event: Dict[str, Any]) -> Optional[Tuple]:
+    ts = event.get("ts")
+    if not isinstance(ts, str) or len(ts) < 10:
+        return None
+    kind = event.get("type") or ("answer" if event.get("question_id") else "other")
+    exhibit = event.get("exhibit") or "unknown"
+    return (ts[:10], ts, event.get("session_id"), kind, exhibit,
+            event.get("question_id"), event.get("choice"), event.get("answer"))
+
+
+class FeedbackAnalytics:
+    """
+    ingest() is safe to run from several workers: each batch is read and committed inside one
+    BEGIN IMMEDIATE transaction together with the file offset, so a line is counted exactly once.
+    """
+
+    def __init__(self, db_path: str = ANALYTICS_DB_PATH, log_path: str = "data/feedback_log.jsonl",
+                 batch_lines: int = ANALYTICS_BATCH_LINES):
+        self.db_path = db_path
+        self.log_path = log_path
+        self.batch_lines = batch_lines
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self.counters: Dict[str, Any] = {"ingested": 0, "bad_lines": 0, "runs": 0, "last_run_ms": 0.0}
+
+    # ---------- Ingestion ----------
+    def _log_files(self) -> List[str]:
+        # Rotated files (feedback_log.jsonl.20250101-...) first, oldest first, then the live one
+        rotated = sorted(p for p in glob.glob(glob.escape(self.log_path) + ".*") if not p.endswith(".lock"))
+        return rotated + [self.log_path]
+
+    def ingest(self) -> int:
+        """Reads everything appended since the last call. Blocking: run it in a thread."""
+        start = time.perf_counter()
+        total = 0
+        with self._lock:
+            for path in self._log_files():
+                key = _file_key(path)
+                if key is None:
+                    continue
+                while True:
+                    n = self._ingest_batch(path, key)
+                    total += n
+                    if n == 0:
+                        break
+        self.counters["runs"] += 1
+        self.counters["last_run_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        return total
+
+    def _ingest_batch(self, path: str, key: str) -> int:
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT offset FROM ingest_state WHERE file_key = ?", (key,)).fetchone()
+            offset = row[0] if row else 0
+            with open(path, "rb") as f:
+                f.seek(offset)
+                lines = f.readlines(self.batch_lines * 160)[:self.batch_lines]
+            # A half-written last line waits for the next run
+            if lines and not lines[-1].endswith(b"\n"):
+                lines.pop()
+            if not lines:
+                conn.execute("COMMIT")
+                return 0
+            rows, bad = [], 0
+            for line in lines:
+                try:
+                    r = _row(json.loads(line))
+                except ValueError:
+                    r = None
+                if r is None:
+                    bad += 1
+                else:
+                    rows.append(r)
+            self._apply(rows)
+            conn.execute(
+                "INSERT INTO ingest_state(file_key, path, offset, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(file_key) DO UPDATE SET path = excluded.path, offset = excluded.offset, "
+                "updated_at = excluded.updated_at",
+                (key, path, offset + sum(len(line) for line in lines), time.time()),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self.counters["ingested"] += len(rows)
+        self.counters["bad_lines"] += bad
+        return len(lines)
+
+    def _apply(self, rows: List[Tuple]):
+        conn = self._conn
+        conn.executemany(
+            "INSERT INTO events(day, ts, session_id, type, exhibit, question_id, choice, answer) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        totals: Counter = Counter()
+        daily: Counter = Counter()
+        questions: Counter = Counter()
+        choices: Counter = Counter()
+        for day, _, _, kind, exhibit, qid, choice, _ in rows:
+            totals[(exhibit, kind)] += 1
+            daily[(day, exhibit, kind)] += 1
+            if qid:
+                questions[(exhibit, qid, day)] += 1
+                if choice:
+                    choices[(exhibit, qid, choice)] += 1
+        conn.executemany(
+            "INSERT INTO totals(exhibit, type, n) VALUES (?, ?, ?) "
+            "ON CONFLICT DO UPDATE SET n = n + excluded.n", [(*k, n) for k, n in totals.items()])
+        conn.executemany(
+            "INSERT INTO daily_counts(day, exhibit, type, n) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT DO UPDATE SET n = n + excluded.n", [(*k, n) for k, n in daily.items()])
+        conn.executemany(
+            "INSERT INTO question_daily(exhibit, question_id, day, n) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT DO UPDATE SET n = n + excluded.n", [(*k, n) for k, n in questions.items()])
+        conn.executemany(
+            "INSERT INTO choice_counts(exhibit, question_id, choice, n) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT DO UPDATE SET n = n + excluded.n", [(*k, n) for k, n in choices.items()])
+
+    # ---------- Queries (aggregates only, plus indexed recent answers) ----------
+    def _query(self, sql: str, args: Tuple = ()) -> List[Tuple]:
+        with self._lock:
+            return self._conn.execute(sql, args).fetchall()
+
+    def overview(self, since: Optional[str] = None, until: Optional[str] = None) -> Dict[str, Any]:
+        if since or until:
+            rows = self._query(
+                "SELECT exhibit, type, SUM(n) FROM daily_counts WHERE day >= ? AND day <= ? GROUP BY exhibit, type",
+                (since or "", until or "9999"))
+        else:
+            rows = self._query("SELECT exhibit, type, n FROM totals")
+        exhibits: Dict[str, Dict[str, int]] = {}
+        for exhibit, kind, n in rows:
+            exhibits.setdefault(exhibit, {})[kind] = n
+        return {"since": since, "until": until, "exhibits": exhibits,
+                "events": sum(n for _, _, n in rows)}
+
+    def daily(self, exhibit: Optional[str] = None, since: Optional[str] = None,
+              until: Optional[str] = None) -> List[Dict[str, Any]]:
+        sql = "SELECT day, type, SUM(n) FROM daily_counts WHERE day >= ? AND day <= ?"
+        args: Tuple = (since or "", until or "9999")
+        if exhibit:
+            sql += " AND exhibit = ?"
+            args += (exhibit,)
+        rows = self._query(sql + " GROUP BY day, type ORDER BY day", args)
+        days: Dict[str, Dict[str, Any]] = {}
+        for day, kind, n in rows:
+            days.setdefault(day, {"day": day})[kind] = n
+        return list(days.values())
+
+    def exhibit(self, exhibit: str, since: Optional[str] = None, until: Optional[str] = None) -> Dict[str, Any]:
+        counts = self._query(
+            "SELECT question_id, SUM(n) FROM question_daily WHERE exhibit = ? AND day >= ? AND day <= ? "
+            "GROUP BY question_id", (exhibit, since or "", until or "9999"))
+        choices = self._query("SELECT question_id, choice, n FROM choice_counts WHERE exhibit = ?", (exhibit,))
+        questions: Dict[str, Dict[str, Any]] = {qid: {"answers": n, "choices": {}} for qid, n in counts}
+        for qid, choice, n in choices:
+            questions.setdefault(qid, {"answers": 0, "choices": {}})["choices"][choice] = n
+        # choices are all-time totals; the answer counts honour since/until
+        return {"exhibit": exhibit, "questions": questions, "daily": self.daily(exhibit, since, until)}
+
+    def question(self, question_id: str, recent: int = ANALYTICS_RECENT_ANSWERS) -> Dict[str, Any]:
+        daily = self._query("SELECT day, SUM(n) FROM question_daily WHERE question_id = ? GROUP BY day ORDER BY day",
+                            (question_id,))
+        choices = self._query("SELECT choice, SUM(n) FROM choice_counts WHERE question_id = ? GROUP BY choice "
+                              "ORDER BY 2 DESC", (question_id,))
+        answers = self._query("SELECT ts, exhibit, answer, choice FROM events WHERE question_id = ? "
+                              "ORDER BY id DESC LIMIT ?", (question_id, recent))
+        return {
+            "question_id": question_id,
+            "answers": sum(n for _, n in daily),
+            "choices": dict(choices),
+            "daily": [{"day": d, "answers": n} for d, n in daily],
+            "recent": [{"ts": ts, "exhibit": ex, "answer": a, "choice": c} for ts, ex, a, c in answers],
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters + bytes not ingested yet. Blocking (SQLite, stat of every log file): run it in a thread."""
+        pending = 0
+        for path in self._log_files():
+            key = _file_key(path)
+            if key is None:
+                continue
+            row = self._query("SELECT offset FROM ingest_state WHERE file_key = ?", (key,))
+            try:
+                pending += os.path.getsize(path) - (row[0][0] if row else 0)
+            except OSError:
+                pass
+        return {**self.counters, "pending_bytes": pending}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
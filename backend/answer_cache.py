@@ -0,0 +1,138 @@
+# answer_cache.py
+# Reply cache for factual questions ("What is Faces?", "How does the sandbox work?"): the answer
+# part of the LLM reply is kept per exhibit, and the next visitor asking the same or a near-identical
+# question gets it back followed by their own target question, without an LLM call.
+
+import os
+import re
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Mapping, Optional, Set, Tuple
+
+from intent import SWITCH_CUES, content_words
+
+# ============ CONFIGURATION ============
+ANSWER_CACHE = os.getenv("ANSWER_CACHE", "1").lower() in ("1", "true", "yes")
+ANSWER_CACHE_MAX = int(os.getenv("ANSWER_CACHE_MAX", "512"))
+# Jaccard similarity of the content words above which a cached question counts as the same one
+ANSWER_CACHE_MIN_SIMILARITY = float(os.getenv("ANSWER_CACHE_MIN_SIMILARITY", "0.7"))
+# Longer turns usually carry more than the question ("it was fun, but how does it know where I am?")
+ANSWER_CACHE_MAX_WORDS = int(os.getenv("ANSWER_CACHE_MAX_WORDS", "12"))
+
+_WORDS = re.compile(r"[a-z']+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_QUESTION_WORDS = ("what", "how", "why", "who", "where", "when", "which")
+_QUESTION_STARTS = {"what", "how", "why", "who", "where", "when", "which", "can", "could", "does", "do", "is",
+                    "are", "tell", "explain"}
+# "what does that mean?" / "say that again?" depend on what the guide just said, not on the exhibit
+_CONTEXT_WORDS = {"mean", "meant", "said", "repeat", "pardon", "sorry", "talking", "question"}
+# Words that do not change what is asked ("what is Faces exactly?")
+_FILLER_WORDS = {"exactly", "actually", "basically", "even", "anyway", "again"}
+_MIN_ANSWER_WORDS = 4
+
+# Process-wide so the numbers survive the rebuild of the cache on question-bank reload
+ANSWER_COUNTERS: Dict[str, int] = {
+    "questions": 0, "hits": 0, "fuzzy_hits": 0, "misses": 0, "stored": 0, "not_stored": 0,
+    "evicted": 0, "invalidated": 0,
+}
+
+Key = Tuple[str, str, FrozenSet[str]]  # (exhibit, question word, content words)
+
+
+def split_answer(reply: str) -> Optional[str]:
+    """The reply without its closing question(s); None when there is no standalone answer part."""
+    sentences = _SENTENCE_END.split(reply.strip())
+    if len(sentences) < 2 or "?" not in sentences[-1]:
+        return None
+    while sentences and "?" in sentences[-1]:
+        sentences.pop()
+    answer = " ".join(sentences)
+    if "?" in answer or len(answer.split()) < _MIN_ANSWER_WORDS:
+        return None
+    return answer
+
+
+class AnswerCache:
+    """
+    Built by load_exhibit_questions() with the question bank; a reload that changes the bank
+    (new one-liners, new aliases) installs an empty one. key() decides whether a turn is a cacheable factual question:
+    short, phrased as a question, no switch cue, not about what the guide just said. The key is
+    the exhibit, the question word and the stemmed content words minus the exhibit's own names
+    ("how does the sandbox work?" on Sandbox == "how does it work?"); get() falls back to the
+    most similar cached question of the same exhibit and question word. LRU-bounded.
+    """
+
+    def __init__(self, aliases: Mapping[str, str], content_hash: str = "", max_size: int = ANSWER_CACHE_MAX,
+                 min_similarity: float = ANSWER_CACHE_MIN_SIMILARITY):
+        self.counters = ANSWER_COUNTERS
+        self.content_hash = content_hash
+        self.max_size = max_size
+        self.min_similarity = min_similarity
+        self._names: Dict[str, Set[str]] = {}  # exhibit -> content words of its names and keywords
+        for alias, exhibit in aliases.items():
+            self._names.setdefault(exhibit, set()).update(content_words(alias))
+        self._answers: "OrderedDict[Key, str]" = OrderedDict()
+        self._by_topic: Dict[Tuple[str, str], Set[Key]] = {}  # (exhibit, question word) -> keys, for fuzzy lookups
+
+    def key(self, exhibit: Optional[str], text: str) -> Optional[Key]:
+        if not ANSWER_CACHE:
+            return None
+        lowered = (text or "").lower().replace("'s", " is")
+        words = _WORDS.findall(lowered)
+        question_word = next((w for w in words if w in _QUESTION_WORDS), "")
+        # "Maybe the sandbox one?" picks an exhibit, it does not ask about one
+        if not words or not (words[0] in _QUESTION_STARTS or (question_word and "?" in lowered)):
+            return None
+        self.counters["questions"] += 1
+        if len(words) > ANSWER_CACHE_MAX_WORDS or any(cue in lowered for cue in SWITCH_CUES):
+            return None
+        content = set(content_words(lowered)) - _FILLER_WORDS
+        if not content or content & _CONTEXT_WORDS:
+            return None
+        return (exhibit or "", question_word, frozenset(content - self._names.get(exhibit or "", set())))
+
+    def get(self, key: Key) -> Optional[str]:
+        answer = self._answers.get(key)
+        if answer is not None:
+            self._answers.move_to_end(key)
+            self.counters["hits"] += 1
+            return answer
+        best, best_score = None, self.min_similarity
+        for other in self._by_topic.get(key[:2], ()):
+            score = len(key[2] & other[2]) / len(key[2] | other[2]) if key[2] | other[2] else 1.0
+            if score >= best_score:
+                best, best_score = other, score
+        if best is None:
+            self.counters["misses"] += 1
+            return None
+        self._answers.move_to_end(best)
+        self.counters["fuzzy_hits"] += 1
+        return self._answers[best]
+
+    def put(self, key: Key, reply: str):
+        """Keeps the answer part of an LLM reply (the target question it ended with is dropped)."""
+        answer = split_answer(reply)
+        if answer is None:
+            self.counters["not_stored"] += 1
+            return
+        self._answers[key] = answer
+        self._answers.move_to_end(key)
+        self._by_topic.setdefault(key[:2], set()).add(key)
+        self.counters["stored"] += 1
+        while len(self._answers) > self.max_size:
+            old, _ = self._answers.popitem(last=False)
+            self._by_topic[old[:2]].discard(old)
+            self.counters["evicted"] += 1
+
+    def reply(self, answer: str, target_question: str) -> str:
+        return f"{answer} {target_question}"
+
+    def __len__(self) -> int:
+        return len(self._answers)
+
+    # ---------- Metrics ----------
+    def stats(self) -> Dict[str, Any]:
+        c = dict(self.counters)
+        lookups = c["hits"] + c["fuzzy_hits"] + c["misses"]
+        c["hit_rate"] = round((c["hits"] + c["fuzzy_hits"]) / lookups, 4) if lookups else 0.0
+        c.update(enabled=ANSWER_CACHE, entries=len(self), max_size=self.max_size, content_hash=self.content_hash)
+        return c
@@ -0,0 +1,171 @@
+# audio_input.py
+# In-memory handling of uploaded clips for /stt and /turn: size cap, WAV header parsing and
+# duration check. The upload buffer goes straight to the provider; nothing is written to disk.
+
+import logging
+import os
+import struct
+from typing import BinaryIO, Iterable, NamedTuple, Optional, Tuple
+
+import starlette
+from fastapi import HTTPException, UploadFile
+from starlette.formparsers import MultiPartParser
+
+logger = logging.getLogger(__name__)
+
+# ============ CONFIGURATION ============
+STT_MAX_UPLOAD_BYTES = int(os.getenv("STT_MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+STT_MAX_DURATION_S = float(os.getenv("STT_MAX_DURATION_S", "60"))
+# Shorter WAV clips (accidental taps) are rejected before they cost an API call
+STT_MIN_DURATION_S = float(os.getenv("STT_MIN_DURATION_S", "0.3"))
+# Enough for RIFF + fmt + the odd LIST/INFO chunk in front of "data"
+WAV_HEADER_PROBE_BYTES = 4096
+# Room for the multipart envelope and the other form fields
+_FORM_OVERHEAD_BYTES = 64 * 1024
+
+# The Starlette version in requirements.txt; keep_uploads_in_memory() relies on its MultiPartParser
+PINNED_STARLETTE = "0.27.0"
+
+
+def keep_uploads_in_memory(max_bytes: int = STT_MAX_UPLOAD_BYTES):
+    """
+    Starlette spools file parts above 1 MB to a temp file; this raises that threshold to the audio
+    upload cap so clips stay in memory. The threshold is a MultiPartParser class attribute, so it
+    applies to every multipart route of the app: today only /stt and /turn take files, and both are
+    capped at max_bytes by UploadLimitMiddleware before parsing. A new upload route needs the same
+    middleware cap. The attribute is max_file_size in the pinned Starlette (spool_max_size in later
+    releases); recheck this when upgrading.
+    """
+    if starlette.__version__ != PINNED_STARLETTE:
+        logger.warning(f"Starlette {starlette.__version__} is not the pinned {PINNED_STARLETTE}: "
+                       "check that large audio uploads still stay in memory")
+    for attr in ("spool_max_size", "max_file_size"):
+        if hasattr(MultiPartParser, attr):
+            setattr(MultiPartParser, attr, max_bytes)
+            return
+    logger.warning("Starlette's MultiPartParser has no spool threshold attribute; uploads above 1 MB go to disk")
+
+
+class WavInfo(NamedTuple):
+    channels: int
+    sample_rate: int
+    sample_width: int  # bytes per sample
+    data_offset: int
+    data_size: int
+    format_tag: int = 1  # 1 = integer PCM, 3 = IEEE float (WAVE_FORMAT_EXTENSIBLE resolved)
+
+    @property
+    def frames(self) -> int:
+        return self.data_size // (self.channels * self.sample_width)
+
+    @property
+    def duration_s(self) -> float:
+        return self.frames / self.sample_rate
+
+
+def parse_wav_header(buf: bytes, total_size: Optional[int] = None) -> Optional[WavInfo]:
+    """
+    Reads the fmt/data chunks from the start of a RIFF/WAVE file. buf may be just the first
+    few KB; total_size is the size of the whole file (defaults to len(buf)).
+    Returns None if the buffer is not a WAV file; raises ValueError if it is a broken one.
+    """
+    total_size = len(buf) if total_size is None else total_size
+    if len(buf) < 12 or buf[:4] != b"RIFF" or buf[8:12] != b"WAVE":
+        return None
+    fmt: Optional[Tuple[int, int, int, int]] = None
+    pos = 12
+    while pos + 8 <= len(buf):
+        chunk_id = bytes(buf[pos:pos + 4])
+        (size,) = struct.unpack_from("<I", buf, pos + 4)
+        body = pos + 8
+        if chunk_id == b"fmt ":
+            if size < 16 or body + 16 > len(buf):
+                raise ValueError("truncated fmt chunk")
+            tag, channels, sample_rate, _, _, bits = struct.unpack_from("<HHIIHH", buf, body)
+            if not channels or not sample_rate or bits % 8:
+                raise ValueError("unsupported WAV format")
+            if tag == 0xFFFE and size >= 40 and body + 26 <= len(buf):
+                (tag,) = struct.unpack_from("<H", buf, body + 24)  # first field of the SubFormat GUID
+            fmt = (channels, sample_rate, bits // 8, tag)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("data chunk before fmt chunk")
+            # Streaming writers leave the size at 0 / 0xFFFFFFFF: the data runs to the end
+            available = total_size - body
+            data_size = available if size in (0, 0xFFFFFFFF) or size > available else size
+            return WavInfo(fmt[0], fmt[1], fmt[2], body, data_size, fmt[3])
+        pos = body + size + (size & 1)  # chunks are word-aligned
+    raise ValueError("no data chunk")
+
+
+def open_upload(
+    audio_file: UploadFile,
+    max_bytes: int = STT_MAX_UPLOAD_BYTES,
+    max_duration_s: float = STT_MAX_DURATION_S,
+    min_duration_s: float = STT_MIN_DURATION_S,
+) -> Tuple[BinaryIO, Optional[WavInfo]]:
+    """
+    Validates an upload without copying it: 413 above max_bytes or max_duration_s, 400 if empty
+    or a malformed WAV, 422 below min_duration_s. Returns the upload's own file object rewound to the start (the provider
+    streams it out in chunks) and the WAV header, or None for non-WAV formats.
+    """
+    f = audio_file.file
+    size = getattr(audio_file, "size", None)
+    if size is None:
+        size = f.seek(0, os.SEEK_END)
+    if size > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Audio upload exceeds {max_bytes} bytes")
+    if not size:
+        raise HTTPException(status_code=400, detail="Empty audio upload")
+
+    f.seek(0)
+    try:
+        info = parse_wav_header(f.read(WAV_HEADER_PROBE_BYTES), total_size=size)
+    except (ValueError, struct.error) as e:
+        raise HTTPException(status_code=400, detail=f"Malformed WAV: {e}")
+    f.seek(0)
+    if info is not None and info.duration_s > max_duration_s:
+        raise HTTPException(
+            status_code=413, detail=f"Audio is {info.duration_s:.1f}s, the limit is {max_duration_s:.0f}s"
+        )
+    if info is not None and info.duration_s < min_duration_s:
+        raise HTTPException(status_code=422, detail="No speech detected")
+    return f, info
+
+
+class UploadLimitMiddleware:
+    """
+    Rejects oversized audio uploads with 413 before the multipart body is parsed: by
+    Content-Length when the client sends one, otherwise while the body is being received.
+    """
+
+    def __init__(self, app, paths: Iterable[str], max_bytes: int = STT_MAX_UPLOAD_BYTES):
+        self.app = app
+        self.paths = set(paths)
+        self.limit = max_bytes + _FORM_OVERHEAD_BYTES
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            return await self.app(scope, receive, send)
+        for name, value in scope["headers"]:
+            if name == b"content-length" and value.isdigit() and int(value) > self.limit:
+                return await _reject(send, self.limit)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            received += len(message.get("body", b""))
+            if received > self.limit:
+                raise HTTPException(status_code=413, detail=f"Audio upload exceeds {self.limit} bytes")
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def _reject(send, limit: int):
+    body = f'{{"detail":"Audio upload exceeds {limit} bytes"}}'.encode()
+    await send({"type": "http.response.start", "status": 413,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]})
+    await send({"type": "http.response.body", "body": body})
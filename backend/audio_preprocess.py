@@ -0,0 +1,147 @@
+# audio_preprocess.py
+# Optional /stt preprocessing on the uploaded PCM: trim leading/trailing silence with an energy
+# VAD, downmix to mono and resample to 16 kHz, so only the spoken part is uploaded and transcribed.
+
+import os
+import struct
+from typing import NamedTuple, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # preprocessing is optional: without NumPy /stt forwards the raw upload
+    np = None
+
+from audio_input import WavInfo
+
+# ============ CONFIGURATION ============
+STT_PREPROCESS = os.getenv("STT_PREPROCESS", "0") == "1"  # default for requests without the form field
+STT_TARGET_RATE = int(os.getenv("STT_TARGET_RATE", "16000"))
+# A frame is speech when its energy is this far above the clip's noise floor (and above the absolute minimum)
+STT_VAD_MARGIN_DB = float(os.getenv("STT_VAD_MARGIN_DB", "12"))
+STT_VAD_MIN_DBFS = float(os.getenv("STT_VAD_MIN_DBFS", "-50"))
+STT_VAD_PAD_MS = int(os.getenv("STT_VAD_PAD_MS", "250"))  # kept around the first/last speech frame
+STT_VAD_FRAME_MS = 20
+# none | mulaw (8-bit G.711 WAV: half the bytes of 16-bit PCM; the provider must accept it)
+STT_COMPRESS = os.getenv("STT_COMPRESS", "none")
+
+
+class PreprocessResult(NamedTuple):
+    audio: bytes  # WAV to send (the original upload if processing would not make it smaller)
+    bytes_in: int
+    seconds_in: float
+    seconds_out: float
+    speech_s: float  # total length of the frames the VAD classified as speech
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_in - len(self.audio)
+
+    @property
+    def seconds_saved(self) -> float:
+        return self.seconds_in - self.seconds_out
+
+
+def available() -> bool:
+    return np is not None
+
+
+def decode_pcm(data: bytes, info: WavInfo) -> Optional["np.ndarray"]:
+    """Samples as float32 in [-1, 1], shape (frames, channels); None for encodings we do not handle."""
+    width, channels = info.sample_width, info.channels
+    raw = memoryview(data)[info.data_offset:info.data_offset + info.frames * channels * width]
+    if info.format_tag == 3 and width in (4, 8):
+        x = np.frombuffer(raw, dtype="<f4" if width == 4 else "<f8").astype(np.float32)
+    elif info.format_tag != 1:
+        return None
+    elif width == 1:
+        x = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 2:
+        x = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 3:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        v = b[:, 0] | (b[:, 1] << 8) | (b[:, 2] << 16)
+        x = (np.where(v & 0x800000, v - 0x1000000, v)).astype(np.float32) / 8388608.0
+    elif width == 4:
+        x = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        return None
+    return x.reshape(-1, channels)
+
+
+def speech_bounds(mono: "np.ndarray", rate: int) -> Tuple[int, int, float]:
+    """(start, end) sample range worth sending, and the seconds of speech in it (0.0 = silence)."""
+    frame = max(1, rate * STT_VAD_FRAME_MS // 1000)
+    n = len(mono) // frame
+    if n == 0:
+        return 0, 0, 0.0
+    energy = np.square(mono[:n * frame].reshape(n, frame)).mean(axis=1)
+    db = 10.0 * np.log10(energy + 1e-12)
+    # The quietest 10% of frames approximate the room noise; clips that are all speech keep
+    # their quiet syllables because trimming only ever removes the ends
+    threshold = max(float(np.percentile(db, 10)) + STT_VAD_MARGIN_DB, STT_VAD_MIN_DBFS)
+    voiced = np.flatnonzero(db > threshold)
+    if voiced.size == 0:
+        return 0, 0, 0.0
+    pad = rate * STT_VAD_PAD_MS // 1000
+    start = max(0, int(voiced[0]) * frame - pad)
+    end = min(len(mono), (int(voiced[-1]) + 1) * frame + pad)
+    return start, end, voiced.size * frame / rate
+
+
+def resample(x: "np.ndarray", rate: int, target: int) -> "np.ndarray":
+    if rate == target or not len(x):
+        return x
+    if rate > target:
+        # Box low-pass over one output period (cumsum moving average), then linear interpolation
+        k = int(round(rate / target))
+        if k > 1:
+            c = np.cumsum(np.concatenate(([0.0], x)), dtype=np.float64)
+            x = ((c[k:] - c[:-k]) / k).astype(np.float32)
+    n_out = int(len(x) * target / rate)
+    positions = np.arange(n_out, dtype=np.float64) * (rate / target)
+    return np.interp(positions, np.arange(len(x)), x).astype(np.float32)
+
+
+# G.711 mu-law on 14-bit linear input: bias, clip, segment (exponent) = position of the top bit
+_MULAW_BIAS, _MULAW_CLIP = 0x21, 8159
+_MULAW_SEG_END = np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF]) if np is not None else None
+
+
+def _mulaw(x: "np.ndarray") -> bytes:
+    """Float samples in [-1, 1] -> G.711 mu-law bytes (sign, 3-bit exponent, 4-bit mantissa, inverted)."""
+    pcm = (np.clip(x, -1.0, 1.0) * 32767.0).astype(np.int32) >> 2
+    mask = np.where(pcm < 0, 0x7F, 0xFF)
+    pcm = np.minimum(np.abs(pcm), _MULAW_CLIP) + _MULAW_BIAS
+    seg = np.searchsorted(_MULAW_SEG_END, pcm)  # first segment whose end is >= pcm
+    uval = np.where(seg > 7, 0x7F, (seg << 4) | ((pcm >> np.minimum(seg + 1, 8)) & 0xF))  # full scale: top code
+    return (uval ^ mask).astype(np.uint8).tobytes()
+
+
+def encode_wav(x: "np.ndarray", rate: int, compress: str = STT_COMPRESS) -> bytes:
+    if compress == "mulaw":
+        data = _mulaw(x)
+        fmt = struct.pack("<HHIIHHH", 7, 1, rate, rate, 1, 8, 0)
+        chunks = b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"fact" + struct.pack("<II", 4, len(x))
+    else:
+        data = (np.clip(x, -1.0, 1.0) * 32767.0).astype("<i2").tobytes()
+        fmt = struct.pack("<HHIIHH", 1, 1, rate, rate * 2, 2, 16)
+        chunks = b"fmt " + struct.pack("<I", len(fmt)) + fmt
+    chunks += b"data" + struct.pack("<I", len(data))
+    return b"RIFF" + struct.pack("<I", 4 + len(chunks) + len(data)) + b"WAVE" + chunks + data
+
+
+def preprocess_wav(data: bytes, info: WavInfo, target_rate: int = STT_TARGET_RATE) -> Optional[PreprocessResult]:
+    """Trim, downmix and resample a WAV upload. None if the encoding is not supported."""
+    samples = decode_pcm(data, info)
+    if samples is None:
+        return None
+    mono = samples.mean(axis=1) if info.channels > 1 else samples[:, 0]
+    start, end, speech_s = speech_bounds(mono, info.sample_rate)
+    if not speech_s:
+        return PreprocessResult(b"", len(data), info.duration_s, 0.0, 0.0)
+    out = resample(mono[start:end], info.sample_rate, target_rate)
+    audio = encode_wav(out, target_rate)
+    if len(audio) >= len(data):
+        # Already tight and at (or below) the target rate: re-encoding would not help
+        return PreprocessResult(bytes(data), len(data), info.duration_s, info.duration_s, speech_s)
+    return PreprocessResult(audio, len(data), info.duration_s, len(out) / target_rate, speech_s)
@@ -0,0 +1,191 @@
+"""
+Duplicate turns and rushes: what per-session locks, turn coalescing and admission control buy.
+
+1. Double taps: every /chat turn of --sessions conversations is sent --copies times, 50 ms apart
+   (a retry / double tap while the first is still waiting for the LLM). Run unprotected (no
+   session locks, no coalescing: the behaviour before admission.py), with locks only, with
+   locks + coalescing, and with the client also sending an Idempotency-Key per turn. Reported: LLM calls per intended turn, turns the session recorded beyond
+   the intended ones, and turns whose copies got different replies.
+2. Rush: --active conversations keep chatting while --rush new visitors arrive at once (a school
+   group: /start + a few turns each; visitors pause --think-ms between turns), against a fake LLM with LLM_CONCURRENCY slots. Reported with
+   admission control off and on: /chat latency of the conversations already running, how many
+   requests were turned away with a 429 (the kiosk retries after Retry-After) and how long until
+   every newcomer had finished.
+
+In-process over ASGI with the fake provider, so only the app's own scheduling is measured.
+
+Run from backend/:
+    python -m benchmarks.admission_bench
+    python -m benchmarks.admission_bench --rush 600 --llm-latency const:500
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List
+
+os.environ.setdefault("TTS_CACHE_DIR", tempfile.mkdtemp(prefix="admission_bench_"))
+os.environ.setdefault("FEEDBACK_LOG_PATH", os.path.join(os.environ["TTS_CACHE_DIR"], "feedback_log.jsonl"))
+os.environ.setdefault("ANALYTICS_DB_PATH", os.path.join(os.environ["TTS_CACHE_DIR"], "analytics.db"))
+os.environ.setdefault("QUESTION_BANK_POLL_S", "0")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark-not-used")
+
+import httpx  # noqa: E402
+
+import main  # noqa: E402
+import providers  # noqa: E402
+from providers import FakeProvider  # noqa: E402
+from benchmarks.provider_load import percentile  # noqa: E402
+
+TURNS = ["Sandbox", "Playful", "The colours were great", "Not really", "Yes, to my kids"]
+RUSH_TURNS = ["Sandbox", "It was fun", "bye"]
+
+
+class NoLocks:
+    """Stand-in for SessionLocks: turns of one session interleave freely."""
+
+    async def acquire(self, session_id):
+        pass
+
+    def release(self, session_id):
+        pass
+
+    @asynccontextmanager
+    async def hold(self, session_id):
+        yield
+
+    def stats(self):
+        return {}
+
+
+async def double_taps(http: httpx.AsyncClient, label: str, sessions: int, copies: int, keyed: bool) -> Dict[str, float]:
+    fake = providers.get_provider()
+    calls_before = fake.calls["llm"]
+    extra_turns = mismatched = 0
+
+    async def conversation(i: int):
+        nonlocal extra_turns, mismatched
+        sid = f"{label}-{i}"
+        await http.get("/start", params={"session_id": sid})
+        for t, text in enumerate(TURNS):
+            headers = {"Idempotency-Key": f"{sid}-{t}"} if keyed else {}
+
+            async def tap(n: int):
+                await asyncio.sleep(0.05 * n)
+                return await http.post("/chat", json={"session_id": sid, "user_text": text}, headers=headers)
+            replies = await asyncio.gather(*[tap(n) for n in range(copies)])
+            if len({r.json().get("reply_text") for r in replies}) > 1:
+                mismatched += 1
+        extra_turns += main.SESSION_STORE.get(sid).turn_count - len(TURNS)
+
+    await asyncio.gather(*[conversation(i) for i in range(sessions)])
+    turns = sessions * len(TURNS)
+    return {"llm_per_turn": (fake.calls["llm"] - calls_before) / turns, "extra_turns": extra_turns,
+            "mismatched": mismatched, "turns": turns}
+
+
+async def rush(http: httpx.AsyncClient, label: str, active: int, visitors: int, think_s: float) -> Dict[str, float]:
+    latencies: List[float] = []
+    newcomer_latencies: List[float] = []
+    rejected = {"start": 0, "chat": 0}
+    stop = asyncio.Event()
+
+    async def running(i: int):
+        sid = f"{label}-active-{i}"
+        await http.get("/start", params={"session_id": sid})
+        n = 0
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            await request("chat", lambda: http.post("/chat", json={"session_id": sid, "user_text": TURNS[n % len(TURNS)]}))
+            latencies.append((time.perf_counter() - t0) * 1000)  # a 429 and its retry count against the turn
+            n += 1
+            await asyncio.sleep(think_s)
+
+    async def request(kind: str, send):
+        # A turned-away kiosk waits as told by Retry-After and tries again
+        while True:
+            r = await send()
+            if r.status_code != 429:
+                return r
+            rejected[kind] += 1
+            await asyncio.sleep(float(r.headers.get("retry-after", "1")))
+
+    async def newcomer(i: int):
+        sid = f"{label}-new-{i}"
+        await request("start", lambda: http.get("/start", params={"session_id": sid}))
+        for text in RUSH_TURNS:
+            await asyncio.sleep(think_s)
+            t0 = time.perf_counter()
+            await request("chat", lambda: http.post("/chat", json={"session_id": sid, "user_text": text}))
+            newcomer_latencies.append((time.perf_counter() - t0) * 1000)
+
+    tasks = [asyncio.ensure_future(running(i)) for i in range(active)]
+    await asyncio.sleep(1.0)
+    latencies.clear()  # only the turns during the rush
+    t0 = time.perf_counter()
+    await asyncio.gather(*[newcomer(i) for i in range(visitors)])
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    await asyncio.gather(*tasks)
+    return {"p50": percentile(latencies, 50), "p95": percentile(latencies, 95), "p99": percentile(latencies, 99),
+            "new_p95": percentile(newcomer_latencies, 95), "elapsed": elapsed, **rejected}
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=100, help="conversations in the double-tap test")
+    parser.add_argument("--copies", type=int, default=2, help="copies of every /chat turn")
+    parser.add_argument("--active", type=int, default=24, help="conversations running when the rush arrives")
+    parser.add_argument("--rush", type=int, default=300, help="new visitors arriving at once")
+    parser.add_argument("--think-ms", type=float, default=2000, help="visitor pause between turns in the rush")
+    parser.add_argument("--llm-latency", default="const:300", help="FakeProvider latency spec")
+    parser.add_argument("--max-active", type=int, default=32, help="ADMISSION_MAX_ACTIVE for the 'on' run")
+    parser.add_argument("--start-rate", type=float, default=5, help="ADMISSION_START_RATE for the 'on' run")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    async def run():
+        providers.set_provider(FakeProvider(llm_latency=args.llm_latency, stt_latency="const:0", tts_latency="const:0"))
+        await main.startup_event()
+        limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://kiosk", timeout=300, limits=limits) as http:
+            admission, locks = main.ADMISSION, main.SESSION_LOCKS
+            admission.max_active, admission.start_rate = 0, args.start_rate
+
+            print(f"double taps: {args.sessions} conversations x {len(TURNS)} turns, every /chat sent {args.copies}x, "
+                  f"fake LLM {args.llm_latency} ms")
+            print(f"{'mode':<20} {'LLM calls/turn':>14} {'extra turns':>11} {'mismatched':>10}")
+            for label, session_locks, coalescing, keyed in (
+                    ("unprotected", NoLocks(), False, False), ("locks", locks, False, False),
+                    ("locks + coalescing", locks, True, False), ("+ Idempotency-Key", locks, True, True)):
+                main.SESSION_LOCKS, main.TURNS.enabled = session_locks, coalescing
+                r = await double_taps(http, label.replace(" ", ""), args.sessions, args.copies, keyed)
+                print(f"{label:<20} {r['llm_per_turn']:>14.2f} {r['extra_turns']:>11} "
+                      f"{r['mismatched']:>6}/{r['turns']}")
+            main.SESSION_LOCKS, main.TURNS.enabled = locks, True
+
+            print(f"\nrush: {args.rush} new visitors (/start + {len(RUSH_TURNS)} turns) while {args.active} "
+                  f"conversations run, {args.think_ms:.0f} ms between turns, LLM_CONCURRENCY={providers.LLM_CONCURRENCY}")
+            print("running = /chat latency of the conversations already running, new = of the newcomers' turns")
+            print(f"{'admission':<34} {'running p50':>11} {'p95':>6} {'p99':>6} {'new p95':>7} {'429 start':>9} "
+                  f"{'429 chat':>8} {'rush s':>7}")
+            for label, max_active in (("off", 0),
+                                      (f"on (max_active={args.max_active}, {admission.start_rate:g} starts/s)",
+                                       args.max_active)):
+                admission.max_active = max_active
+                r = await rush(http, label.split(" ")[0], args.active, args.rush, args.think_ms / 1000)
+                print(f"{label:<34} {r['p50']:>11.0f} {r['p95']:>6.0f} {r['p99']:>6.0f} {r['new_p95']:>7.0f} "
+                      f"{r['start']:>9} {r['chat']:>8} {r['elapsed']:>7.1f}")
+            print(f"admission stats: {admission.stats()}")
+        await main.shutdown_event()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,198 @@
+"""
+Feedback analytics: ingest throughput and query latency as the feedback log grows, compared
+with the only option before the analytics store existed, re-parsing the whole JSONL.
+
+Writes a synthetic log shaped like the one log_feedback_event produces (answer and select
+events over the bank's exhibits and questions, spread over --days days, rotated every
+--rotate-mb like FeedbackLogWriter does), in stages. After each stage the store ingests only
+what was appended, then the /analytics queries are timed. The full-scan baseline is timed
+while the log is at most --scan-limit events (it grows linearly; beyond that it only burns time).
+
+Run from backend/:
+    python -m benchmarks.analytics_bench                      # 10M events, ~1.5 GB of JSONL
+    python -m benchmarks.analytics_bench --events 1000000 --keep /tmp/analytics_bench
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from analytics import FeedbackAnalytics
+from benchmarks.conversations import OPEN_ANSWERS
+from benchmarks.provider_load import percentile
+
+STAGES = (0.01, 0.1, 0.5, 1.0)
+
+
+class LogGenerator:
+    """Seeded synthetic feedback events, written as pre-formatted lines (json.dumps per event is the bottleneck)."""
+
+    def __init__(self, bank: Dict, total: int, days: int, seed: int = 0):
+        self.total = total
+        self.rng = random.Random(seed)
+        self.start = datetime(2025, 1, 1, 9, 0, 0)
+        self.span_s = days * 86400
+        self.questions = []  # (exhibit, qid, choices)
+        for exhibit, pack in bank.items():
+            for q in pack.get("questions", []):
+                self.questions.append((exhibit, q["id"], q.get("choices") if q.get("answer_type") == "choice" else None))
+        self.exhibits = sorted({e for e, _, _ in self.questions})
+        self.answers = [json.dumps(a) for a in OPEN_ANSWERS]
+
+    def lines(self, first: int, count: int) -> List[str]:
+        rng, out = self.rng, []
+        for i in range(first, first + count):
+            # Time grows with the event index, like an append-only log
+            ts = (self.start + timedelta(seconds=self.span_s * i / self.total + rng.random())).isoformat()
+            sid = f"s{i // 5:08d}"
+            if i % 5 == 0:
+                out.append(f'{{"session_id": "{sid}", "type": "select", "exhibit": "{rng.choice(self.exhibits)}", '
+                           f'"ts": "{ts}"}}\n')
+                continue
+            exhibit, qid, choices = rng.choice(self.questions)
+            if choices:
+                choice = rng.choice(choices)
+                out.append(f'{{"session_id": "{sid}", "exhibit": "{exhibit}", "question_id": "{qid}", '
+                           f'"answer": "{choice}", "choice": "{choice}", "ts": "{ts}"}}\n')
+            else:
+                out.append(f'{{"session_id": "{sid}", "exhibit": "{exhibit}", "question_id": "{qid}", '
+                           f'"answer": {rng.choice(self.answers)}, "ts": "{ts}"}}\n')
+        return out
+
+
+class LogFile:
+    """Appends like FeedbackLogWriter: one live file, renamed to path.<timestamp> past rotate_bytes."""
+
+    def __init__(self, path: str, rotate_bytes: int):
+        self.path = path
+        self.rotate_bytes = rotate_bytes
+        self.rotations = 0
+
+    def append(self, lines: List[str]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(lines))
+            size = f.tell()
+        if self.rotate_bytes and size >= self.rotate_bytes:
+            self.rotations += 1
+            os.replace(self.path, f"{self.path}.20250101-000000-{self.rotations:06d}")
+
+    def files(self) -> List[str]:
+        rotated = sorted(p for p in os.listdir(os.path.dirname(self.path)) if p.startswith(os.path.basename(self.path) + "."))
+        return [os.path.join(os.path.dirname(self.path), p) for p in rotated] + [self.path]
+
+
+def full_scan(files: List[str], exhibit: str) -> Dict:
+    """The pre-analytics way: parse every line to answer one per-exhibit breakdown."""
+    answers: Counter = Counter()
+    choices: Dict[str, Counter] = defaultdict(Counter)
+    for path in files:
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                e = json.loads(line)
+                if e.get("exhibit") == exhibit and e.get("question_id"):
+                    answers[e["question_id"]] += 1
+                    if e.get("choice"):
+                        choices[e["question_id"]][e["choice"]] += 1
+    return {"answers": answers, "choices": choices}
+
+
+def time_queries(store: FeedbackAnalytics, gen: LogGenerator, reps: int) -> Dict[str, float]:
+    rng = random.Random(1)
+    exhibits = gen.exhibits
+    qids = [q for _, q, _ in gen.questions]
+    month = (gen.start + timedelta(days=30)).strftime("%Y-%m-%d"), (gen.start + timedelta(days=60)).strftime("%Y-%m-%d")
+    queries = {
+        "overview": lambda: store.overview(),
+        "daily": lambda: store.daily(),
+        "exhibit": lambda: store.exhibit(rng.choice(exhibits)),
+        "exhibit_30d": lambda: store.exhibit(rng.choice(exhibits), *month),
+        "question": lambda: store.question(rng.choice(qids)),
+    }
+    out = {}
+    for name, query in queries.items():
+        samples = []
+        for _ in range(reps):
+            t0 = time.perf_counter()
+            query()
+            samples.append((time.perf_counter() - t0) * 1000)
+        out[name] = percentile(samples, 50)
+    return out
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=10_000_000)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--rotate-mb", type=float, default=50)
+    parser.add_argument("--reps", type=int, default=50, help="runs per query and stage")
+    parser.add_argument("--scan-limit", type=int, default=1_000_000, help="largest log the full scan is timed on")
+    parser.add_argument("--questions", default="data/exhibit_questions.json")
+    parser.add_argument("--keep", help="directory to write into and keep (default: a temp dir, removed)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    workdir = args.keep or tempfile.mkdtemp(prefix="analytics_bench_")
+    os.makedirs(workdir, exist_ok=True)
+    with open(args.questions, "r", encoding="utf-8") as f:
+        gen = LogGenerator(json.load(f), args.events, args.days, args.seed)
+    log = LogFile(os.path.join(workdir, "feedback_log.jsonl"), int(args.rotate_mb * 1024 * 1024))
+    store = FeedbackAnalytics(os.path.join(workdir, "analytics.db"), log.path)
+
+    print(f"{args.events:,} events over {args.days} days, {len(gen.exhibits)} exhibits, "
+          f"{len(gen.questions)} questions; query p50 over {args.reps} runs")
+    print(f"{'events':>11} {'log MB':>8} {'db MB':>8} {'ingest ev/s':>12} "
+          + " ".join(f"{q:>12}" for q in ("overview ms", "daily ms", "exhibit ms", "exh 30d ms", "question ms"))
+          + f" {'full scan ms':>13}")
+    written = ingested = 0
+    try:
+        for stage in STAGES:
+            target = int(args.events * stage)
+            while written < target:
+                chunk = min(200_000, target - written)
+                log.append(gen.lines(written, chunk))
+                written += chunk
+            t0 = time.perf_counter()
+            store.ingest()
+            ingest_s = time.perf_counter() - t0
+            new, ingested = written - ingested, written
+            q = time_queries(store, gen, args.reps)
+            scan = ""
+            if written <= args.scan_limit:
+                t0 = time.perf_counter()
+                full_scan(log.files(), gen.exhibits[0])
+                scan = f"{(time.perf_counter() - t0) * 1000:.0f}"
+            log_mb = sum(os.path.getsize(p) for p in log.files() if os.path.exists(p)) / 1e6
+            db_mb = sum(os.path.getsize(os.path.join(workdir, p)) for p in os.listdir(workdir)
+                        if p.startswith("analytics.db")) / 1e6
+            print(f"{written:>11,} {log_mb:>8.0f} {db_mb:>8.0f} {new / ingest_s:>12,.0f} "
+                  + " ".join(f"{v:>12.2f}" for v in q.values()) + f" {scan:>13}")
+
+        # Steady state: the background task picks up a few seconds of kiosk traffic
+        samples = []
+        for _ in range(20):
+            log.append(gen.lines(written, 1000))
+            written += 1000
+            t0 = time.perf_counter()
+            store.ingest()
+            samples.append((time.perf_counter() - t0) * 1000)
+        print(f"incremental ingest of 1,000 new events on the full log: p50 {statistics.median(samples):.1f} ms")
+        totals = store.overview()["events"]
+        print(f"store holds {totals:,} events ({store.counters['bad_lines']} bad lines, {log.rotations} rotations)")
+    finally:
+        store.close()
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main_cli()
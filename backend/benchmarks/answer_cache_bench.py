@@ -0,0 +1,118 @@
+"""
+Answer cache: /chat latency and LLM calls on turns where the visitor asks a factual question
+about the exhibit ("What is Faces?", "how does it work?"), with the cache off vs on, plus its
+exact / fuzzy hit rate.
+
+Drives kiosk sessions in-process through main.start_endpoint / run_chat_turn, --concurrency at
+a time, against a mock provider that answers like the prompt asks: the exhibit's one-liner,
+then the target question. Each session picks an exhibit, then alternates questions about it
+(drawn from a few phrasings per fact, the way visitors word them) with plain answers.
+
+Run from backend/:
+    python -m benchmarks.answer_cache_bench
+    python -m benchmarks.answer_cache_bench --sessions 500 --latency-ms 1200
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import re
+import statistics
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark-not-used")
+os.environ.setdefault("FEEDBACK_LOG_PATH", "/tmp/answer_cache_bench_feedback.jsonl")
+
+import main  # noqa: E402
+import providers  # noqa: E402
+import answer_cache  # noqa: E402
+from answer_cache import ANSWER_COUNTERS, AnswerCache  # noqa: E402
+from benchmarks.provider_load import MockProvider, percentile  # noqa: E402
+
+# One list per fact; visitors word the same question differently
+QUESTIONS = [
+    ["What is {name}?", "What's the {name}?", "what is this exhibit", "What is {name} exactly?"],
+    ["How does the {name} work?", "how does it work?", "How does this work", "how does {name} actually work?"],
+    ["Who made the {name}?", "who made this?", "Who created {name}?"],
+    ["Why is it called {name}?", "why is it called that"],
+]
+ANSWERS = ["The colours were great", "It was fun", "A bit confusing at first", "Yes, I liked it"]
+
+_TOPIC = re.compile(r"- Current Topic: (.*)")
+_TARGET = re.compile(r'^>>> "(.*)"', re.M)
+
+
+class KnowledgeProvider(MockProvider):
+    """Answers from the knowledge base (the exhibit's one-liner), then asks the target question."""
+
+    def __init__(self, latency_s: float):
+        super().__init__(latency_s)
+        self.calls = 0
+
+    async def complete(self, messages, max_output_tokens, temperature=0.7, usage=None, cache_key=None):
+        self.calls += 1
+        await self._wait()
+        delta = messages[-1]["content"]
+        topic, target = _TOPIC.search(delta), _TARGET.search(delta)
+        if not topic or not target:
+            return "Thank you so much for your feedback. Enjoy the rest of Data Spaces!"
+        pack = main.EXHIBIT_QUESTIONS.get(topic.group(1), {})
+        return f"{pack.get('one_liner', 'It is part of Data Spaces.')} {target.group(1)}"
+
+
+async def run_session(sid: str, rng: random.Random, question_ms: list):
+    exhibit = rng.choice([name for name, pack in main.EXHIBIT_QUESTIONS.items() if pack.get("questions")])
+    name = main.EXHIBIT_QUESTIONS[exhibit].get("display_name", exhibit)
+    await main.start_endpoint(sid)
+    await main.run_chat_turn(sid, exhibit)
+    for turn in range(4):
+        if turn % 2:
+            await main.run_chat_turn(sid, rng.choice(ANSWERS))
+            continue
+        text = rng.choice(rng.choice(QUESTIONS)).format(name=name)
+        t0 = time.perf_counter()
+        await main.run_chat_turn(sid, text)
+        question_ms.append((time.perf_counter() - t0) * 1000)
+
+
+async def run_mode(enabled: bool, sessions: int, concurrency: int, provider: KnowledgeProvider) -> tuple:
+    answer_cache.ANSWER_CACHE = enabled
+    main.ANSWER_CACHE = AnswerCache(main.QUESTION_BANK.aliases, main.QUESTION_BANK.content_hash)
+    for k in ANSWER_COUNTERS:
+        ANSWER_COUNTERS[k] = 0
+    rng = random.Random(5)
+    question_ms, calls_before = [], provider.calls
+    for start in range(0, sessions, concurrency):
+        batch = range(start, min(start + concurrency, sessions))
+        await asyncio.gather(*[run_session(f"answer-{enabled}-{i}", rng, question_ms) for i in batch])
+    return question_ms, (provider.calls - calls_before) / sessions, main.ANSWER_CACHE.stats()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10, help="sessions running at the same time")
+    parser.add_argument("--latency-ms", type=float, default=800, help="mock provider latency per call")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    main.load_exhibit_questions()
+    provider = KnowledgeProvider(args.latency_ms / 1000)
+    providers.set_provider(provider)
+
+    print(f"{args.sessions} sessions ({args.concurrency} at a time), mock latency {args.latency_ms:.0f} ms; "
+          f"latency of the turns asking a factual question")
+    print(f"{'cache':<6} {'turns':>6} {'LLM calls/session':>17} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8} "
+          f"{'hits':>6} {'fuzzy':>6} {'entries':>7}")
+    for enabled in (False, True):
+        lat, calls, stats = asyncio.run(run_mode(enabled, args.sessions, args.concurrency, provider))
+        hits = f"{stats['hit_rate']:.0%}" if enabled else "-"
+        print(f"{'on' if enabled else 'off':<6} {len(lat):>6} {calls:>17.2f} {percentile(lat, 50):>8.2f} "
+              f"{percentile(lat, 95):>8.2f} {statistics.mean(lat):>8.2f} {hits:>6} {stats['fuzzy_hits']:>6} "
+              f"{stats['entries']:>7}")
+
+
+if __name__ == "__main__":
+    main_cli()
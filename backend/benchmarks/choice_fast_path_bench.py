@@ -0,0 +1,83 @@
+"""
+Choice fast path: /chat latency on turns that answer a choice question, with the template
+engine off (every reply from the LLM) vs on, plus how often it triggers.
+
+Drives kiosk sessions in-process through main.start_endpoint / run_chat_turn against the
+mock provider from provider_load. Choice questions are answered the way visitors do: the bare
+choice, a short sentence around it, a question back, or something unrelated.
+
+Run from backend/:
+    python -m benchmarks.choice_fast_path_bench
+    python -m benchmarks.choice_fast_path_bench --sessions 200 --latency-ms 1200
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark-not-used")
+os.environ.setdefault("FEEDBACK_LOG_PATH", "/tmp/choice_fast_path_bench_feedback.jsonl")
+
+import main  # noqa: E402
+import providers  # noqa: E402
+from choice_replies import CHOICE_COUNTERS  # noqa: E402
+from benchmarks.provider_load import MockProvider, percentile  # noqa: E402
+
+ANSWER_SHAPES = [
+    "{choice}", "{Choice}.", "I'd say {choice}", "It felt {choice} to me", "Definitely {choice}!",
+    "What does it actually do?", "Hmm, hard to say", "{choice} but also a bit confusing, the screen kept flickering",
+]
+
+
+async def run_session(sid: str, rng: random.Random, choice_ms: list, other_ms: list):
+    await main.start_endpoint(sid)
+    await main.run_chat_turn(sid, rng.choice(list(main.EXHIBIT_QUESTIONS)))
+    for _ in range(2):
+        s = await main._get_session(sid)
+        question = main._find_question(s.selected_exhibit, s.last_qid) or {}
+        if question.get("answer_type") == "choice":
+            choice = rng.choice(question["choices"])
+            text = rng.choice(ANSWER_SHAPES).format(choice=choice, Choice=choice.capitalize())
+            bucket = choice_ms
+        else:
+            text, bucket = "The colours were great", other_ms
+        t0 = time.perf_counter()
+        await main.run_chat_turn(sid, text)
+        bucket.append((time.perf_counter() - t0) * 1000)
+
+
+async def run_mode(enabled: bool, sessions: int) -> tuple:
+    main.CHOICE_FAST_PATH = enabled
+    for k in CHOICE_COUNTERS:
+        CHOICE_COUNTERS[k] = 0
+    rng = random.Random(3)
+    choice_ms, other_ms = [], []
+    await asyncio.gather(*[run_session(f"choice-{enabled}-{i}", rng, choice_ms, other_ms) for i in range(sessions)])
+    return choice_ms, main.CHOICE_ENGINE.stats()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=800, help="mock provider latency per call")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    main.load_exhibit_questions()
+    providers.set_provider(MockProvider(latency_s=args.latency_ms / 1000))
+
+    print(f"{args.sessions} sessions, mock latency {args.latency_ms:.0f} ms; latency of choice-question turns")
+    print(f"{'fast path':<10} {'turns':>6} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8} {'triggered':>10}")
+    for enabled in (False, True):
+        lat, stats = asyncio.run(run_mode(enabled, args.sessions))
+        triggered = f"{stats['trigger_rate']:.0%}" if enabled else "-"
+        print(f"{'on' if enabled else 'off':<10} {len(lat):>6} {percentile(lat, 50):>8.2f} {percentile(lat, 95):>8.2f} "
+              f"{statistics.mean(lat):>8.2f} {triggered:>10}")
+
+
+if __name__ == "__main__":
+    main_cli()
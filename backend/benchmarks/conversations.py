@@ -0,0 +1,110 @@
+"""
+Synthetic kiosk conversations for the load suite, built from the question bank
+(exhibit_questions.json) and KEYWORD_MAPPING.
+
+Each conversation is the list of visitor utterances after /start. The mix covers the paths
+the server takes: picking an exhibit by keyword or display name and answering its questions
+(choice picks and open answers), switching exhibit half-way, leaving early with "bye",
+input that matches no exhibit, and feedback on the exhibition as a whole.
+
+    python -m benchmarks.conversations --count 5     # print a few
+"""
+
+import argparse
+import json
+import random
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Sequence, Tuple
+
+import config
+
+KINDS: Tuple[Tuple[str, float], ...] = (
+    ("full", 0.4), ("switch", 0.2), ("bye", 0.15), ("unmatched", 0.15), ("overall", 0.1),
+)
+SELECT_SHAPES = ["{alias}", "The {alias}", "I want to talk about the {alias}", "let's do {alias}", "Maybe the {alias} one?"]
+SWITCH_SHAPES = ["Actually, can we talk about the {alias} instead?", "I'd rather review {alias}", "switch to {alias}"]
+CHOICE_SHAPES = ["{choice}", "{Choice}.", "I'd say {choice}", "Definitely {choice}!", "Hmm, {choice} I think"]
+OPEN_ANSWERS = [
+    "The colours were great", "It was a bit confusing at first", "I liked moving my hands and seeing it react",
+    "Too short, I wanted more", "More explanation next to the screen would help", "Honestly I don't know",
+    "The sound was too loud", "It reminded me of my childhood", "Nothing, it was perfect",
+]
+UNMATCHED = ["hmm", "what?", "I don't remember the name", "the blue thing near the door", "no idea"]
+EXITS = ["bye", "stop", "I have to go, bye"]
+
+
+@dataclass
+class Conversation:
+    kind: str
+    exhibit: str
+    turns: List[str]
+
+
+class ConversationGenerator:
+    """Seeded: the same seed and bank always produce the same conversations."""
+
+    def __init__(self, bank: Mapping[str, Dict], keyword_mapping: Mapping[str, str], seed: int = 0):
+        self.bank = bank
+        self.rng = random.Random(seed)
+        self.exhibits = [name for name, pack in bank.items() if pack.get("questions")]
+        self.aliases: Dict[str, List[str]] = {name: [name] for name in self.exhibits}
+        for name in self.exhibits:
+            if bank[name].get("display_name"):
+                self.aliases[name].append(bank[name]["display_name"])
+        for keyword, name in keyword_mapping.items():
+            if name in self.aliases and len(keyword) > 3:  # short keywords ("ai", "vr") collide too easily
+                self.aliases[name].append(keyword)
+
+    def _select(self, exhibit: str, shapes: Sequence[str] = SELECT_SHAPES) -> str:
+        return self.rng.choice(shapes).format(alias=self.rng.choice(self.aliases[exhibit]))
+
+    def _answers(self, exhibit: str, limit: int) -> List[str]:
+        # The server asks an exhibit's questions in bank order
+        out = []
+        for q in self.bank[exhibit]["questions"][:limit]:
+            if q.get("answer_type") == "choice" and self.rng.random() < 0.7:
+                choice = self.rng.choice(q["choices"])
+                out.append(self.rng.choice(CHOICE_SHAPES).format(choice=choice, Choice=choice.capitalize()))
+            else:
+                out.append(self.rng.choice(OPEN_ANSWERS))
+        return out
+
+    def conversation(self) -> Conversation:
+        kind = self.rng.choices([k for k, _ in KINDS], weights=[w for _, w in KINDS])[0]
+        exhibit = self.rng.choice(self.exhibits)
+        turns = [self._select(exhibit)]
+        if kind == "full":
+            turns += self._answers(exhibit, 4)
+        elif kind == "switch":
+            other = self.rng.choice([e for e in self.exhibits if e != exhibit] or [exhibit])
+            turns += self._answers(exhibit, 1) + [self._select(other, SWITCH_SHAPES)] + self._answers(other, 2)
+        elif kind == "bye":
+            turns += self._answers(exhibit, self.rng.randint(0, 2)) + [self.rng.choice(EXITS)]
+        elif kind == "unmatched":
+            turns = self.rng.sample(UNMATCHED, 2) + turns + self._answers(exhibit, 2)
+        else:
+            turns = ["The overall exhibition", self.rng.choice(OPEN_ANSWERS), self.rng.choice(OPEN_ANSWERS)]
+            exhibit = "overall exhibition"
+        return Conversation(kind, exhibit, turns)
+
+    def conversations(self, count: int) -> List[Conversation]:
+        return [self.conversation() for _ in range(count)]
+
+
+def load_generator(questions_path: str = "data/exhibit_questions.json", seed: int = 0) -> ConversationGenerator:
+    with open(questions_path, "r", encoding="utf-8") as f:
+        bank = json.load(f)
+    return ConversationGenerator(bank, config.KEYWORD_MAPPING, seed)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    for c in load_generator(seed=args.seed).conversations(args.count):
+        print(f"[{c.kind}] {c.exhibit}: " + " | ".join(c.turns))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,226 @@
+"""
+Local OpenAI-compatible mock server with fault injection, for exercising the real
+OpenAIProvider (HTTP client, SDK parsing, timeouts) without the network.
+
+Serves the three endpoints the backend uses:
+    POST /v1/responses                 JSON or SSE (stream: true)
+    POST /v1/chat/completions          JSON or SSE, as served by local model servers (PROVIDER=local)
+    POST /v1/audio/transcriptions      {"text": ...}
+    POST /v1/audio/speech              audio bytes
+
+Faults are drawn per request: slow responses, 429 with Retry-After, 500s and connection
+resets; `outage = True` fails every request with a 503 until cleared.
+
+Point the SDK at it with OPENAI_BASE_URL=http://127.0.0.1:<port>/v1, or run it standalone:
+    python -m benchmarks.fault_server --port 8089 --slow 0.05 --rate-limit 0.05 --reset 0.02
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+REPLY_TEXT = "That sounds great! What did you like most about it?"
+
+
+@dataclass
+class Faults:
+    latency_s: float = 0.05  # median base latency (log-normal)
+    slow_p: float = 0.0
+    slow_s: float = 3.0
+    rate_limit_p: float = 0.0
+    retry_after_s: float = 0.2
+    error_p: float = 0.0
+    reset_p: float = 0.0
+    outage: bool = False
+
+
+class FaultServer:
+    def __init__(self, faults: Optional[Faults] = None, seed: int = 0):
+        self.faults = faults or Faults()
+        self.rng = random.Random(seed)
+        self.counts: Dict[str, int] = {"requests": 0, "ok": 0, "slow": 0, "429": 0, "500": 0, "reset": 0, "503": 0}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.port = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    async def start(self, port: int = 0) -> "FaultServer":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    # ---------- HTTP ----------
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        line = await reader.readline()
+        if not line:
+            return None
+        method, path, _ = line.decode("latin-1").split(" ", 2)
+        headers: Dict[str, str] = {}
+        while True:
+            h = await reader.readline()
+            if h in (b"\r\n", b"\n", b""):
+                break
+            k, _, v = h.decode("latin-1").partition(":")
+            headers[k.strip().lower()] = v.strip()
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            body = b""
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                chunk = await reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                body += chunk[:-2]
+        else:
+            body = await reader.readexactly(int(headers.get("content-length", "0")))
+        return method, path, headers, body
+
+    @staticmethod
+    def _response(status: int, body: bytes, content_type: str = "application/json",
+                  extra: Optional[Dict[str, str]] = None) -> bytes:
+        reason = {200: "OK", 429: "Too Many Requests", 500: "Internal Server Error",
+                  503: "Service Unavailable", 404: "Not Found"}.get(status, "Error")
+        head = [f"HTTP/1.1 {status} {reason}", f"content-type: {content_type}", f"content-length: {len(body)}"]
+        head += [f"{k}: {v}" for k, v in (extra or {}).items()]
+        return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                if not await self._serve(writer, *request):
+                    return  # connection was reset on purpose
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _serve(self, writer: asyncio.StreamWriter, method: str, path: str, headers: Dict[str, str], body: bytes) -> bool:
+        f, rng = self.faults, self.rng
+        self.counts["requests"] += 1
+        if f.outage:
+            self.counts["503"] += 1
+            writer.write(self._response(503, b'{"error": {"message": "overloaded"}}'))
+            return True
+        draw = rng.random()
+        if draw < f.reset_p:
+            self.counts["reset"] += 1
+            await asyncio.sleep(f.latency_s)
+            writer.transport.abort()
+            return False
+        draw -= f.reset_p
+        if draw < f.rate_limit_p:
+            self.counts["429"] += 1
+            writer.write(self._response(429, b'{"error": {"message": "rate limited"}}',
+                                        extra={"retry-after": str(f.retry_after_s)}))
+            return True
+        draw -= f.rate_limit_p
+        if draw < f.error_p:
+            self.counts["500"] += 1
+            writer.write(self._response(500, b'{"error": {"message": "internal error"}}'))
+            return True
+        delay = rng.lognormvariate(0, 0.25) * f.latency_s
+        if rng.random() < f.slow_p:
+            self.counts["slow"] += 1
+            delay = f.slow_s
+        await asyncio.sleep(delay)
+        self.counts["ok"] += 1
+
+        if path.endswith("/responses"):
+            payload = json.loads(body or b"{}")
+            if payload.get("stream"):
+                writer.write(self._sse_reply())
+            else:
+                writer.write(self._response(200, json.dumps(_response_object(REPLY_TEXT)).encode()))
+        elif path.endswith("/chat/completions"):
+            payload = json.loads(body or b"{}")
+            if payload.get("stream"):
+                writer.write(self._sse_chat_reply())
+            else:
+                writer.write(self._response(200, json.dumps(_chat_completion(REPLY_TEXT)).encode()))
+        elif path.endswith("/audio/transcriptions"):
+            writer.write(self._response(200, json.dumps({"text": "It was really fun"}).encode()))
+        elif path.endswith("/audio/speech"):
+            writer.write(self._response(200, b"\x00" * 4000, content_type="audio/mpeg"))
+        else:
+            writer.write(self._response(404, b'{"error": {"message": "not found"}}'))
+        return True
+
+    def _sse_reply(self) -> bytes:
+        events = [{"type": "response.output_text.delta", "delta": word + " ", "item_id": "msg_0",
+                   "output_index": 0, "content_index": 0, "sequence_number": i}
+                  for i, word in enumerate(REPLY_TEXT.split())]
+        events.append({"type": "response.completed", "response": _response_object(REPLY_TEXT),
+                       "sequence_number": len(events)})
+        body = "".join(f"event: {e['type']}\ndata: {json.dumps(e)}\n\n" for e in events).encode()
+        return self._response(200, body, content_type="text/event-stream")
+
+    def _sse_chat_reply(self) -> bytes:
+        chunks = [{"id": "chatcmpl_mock", "object": "chat.completion.chunk", "created": int(time.time()), "model": "mock",
+                   "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}]}
+                  for word in REPLY_TEXT.split()]
+        usage = _chat_completion(REPLY_TEXT)["usage"]
+        chunks.append({"id": "chatcmpl_mock", "object": "chat.completion.chunk", "created": int(time.time()),
+                       "model": "mock", "choices": [], "usage": usage})
+        body = "".join(f"data: {json.dumps(c)}\n\n" for c in chunks) + "data: [DONE]\n\n"
+        return self._response(200, body.encode(), content_type="text/event-stream")
+
+
+def _chat_completion(text: str) -> dict:
+    return {
+        "id": "chatcmpl_mock", "object": "chat.completion", "created": int(time.time()), "model": "mock",
+        "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": text}}],
+        "usage": {"prompt_tokens": 600, "completion_tokens": 20, "total_tokens": 620,
+                  "prompt_tokens_details": {"cached_tokens": 512}},
+    }
+
+
+def _response_object(text: str) -> dict:
+    # The fields the SDK reads: output_text and usage
+    return {
+        "id": "resp_mock", "object": "response", "created_at": int(time.time()), "model": "mock",
+        "status": "completed", "parallel_tool_calls": False, "tool_choice": "auto", "tools": [],
+        "output": [{"type": "message", "id": "msg_0", "role": "assistant", "status": "completed",
+                    "content": [{"type": "output_text", "text": text, "annotations": []}]}],
+        "usage": {"input_tokens": 600, "output_tokens": 20, "total_tokens": 620,
+                  "input_tokens_details": {"cached_tokens": 512}, "output_tokens_details": {"reasoning_tokens": 0}},
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--slow", type=float, default=0.0, help="share of slow responses")
+    parser.add_argument("--slow-ms", type=float, default=3000)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="share of 429s")
+    parser.add_argument("--error", type=float, default=0.0, help="share of 500s")
+    parser.add_argument("--reset", type=float, default=0.0, help="share of connection resets")
+    args = parser.parse_args()
+
+    faults = Faults(latency_s=args.latency_ms / 1000, slow_p=args.slow, slow_s=args.slow_ms / 1000,
+                    rate_limit_p=args.rate_limit, error_p=args.error, reset_p=args.reset)
+
+    async def serve():
+        server = await FaultServer(faults).start(args.port)
+        print(f"fault server on {server.base_url}")
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,91 @@
+"""
+Feedback log throughput: open/append/close per event vs the batched background writer.
+
+Reports events/sec end to end (all events durable on disk) and the mean time
+the request path spends per log call.
+
+Run from backend/:
+    python -m benchmarks.feedback_log_bench
+    python -m benchmarks.feedback_log_bench --events 200000 --threads 8
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from feedback_log import FeedbackLogWriter
+
+
+def legacy_log(path, event):
+    # The previous log_feedback_event body
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    event["ts"] = datetime.now().isoformat()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+
+def make_event(i):
+    return {"session_id": f"s{i % 500}", "exhibit": "Sandbox", "question_id": "sbx_emotion", "answer": "It felt playful"}
+
+
+def drive(log_fn, events, threads):
+    per_thread = events // threads
+    call_time = [0.0] * threads
+
+    def worker(t):
+        spent = 0.0
+        for i in range(per_thread):
+            t0 = time.perf_counter()
+            log_fn(make_event(i))
+            spent += time.perf_counter() - t0
+        call_time[t] = spent
+
+    pool = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    for p in pool:
+        p.start()
+    for p in pool:
+        p.join()
+    return sum(call_time) / (per_thread * threads)
+
+
+def count_lines(path):
+    with open(path, "rb") as f:
+        return sum(1 for _ in f)
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=50000)
+    parser.add_argument("--threads", type=int, default=4, help="concurrent producers (kiosk requests)")
+    args = parser.parse_args()
+
+    print(f"events={args.events} producers={args.threads}")
+    print(f"{'implementation':<22} {'events/s':>10} {'us per log call':>16} {'lines':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "legacy", "feedback_log.jsonl")
+        t0 = time.perf_counter()
+        per_call = drive(lambda e: legacy_log(path, e), args.events, args.threads)
+        elapsed = time.perf_counter() - t0
+        print(f"{'open/append/close':<22} {args.events / elapsed:>10.0f} {per_call * 1e6:>16.1f} {count_lines(path):>8}")
+
+        path = os.path.join(tmp, "batched", "feedback_log.jsonl")
+        writer = FeedbackLogWriter(path, rotate_bytes=0, rotate_interval_s=0)
+        writer.start()
+        t0 = time.perf_counter()
+
+        def log(e):
+            e["ts"] = datetime.now().isoformat()
+            writer.enqueue(e)
+
+        per_call = drive(log, args.events, args.threads)
+        writer.stop()  # drain + fsync: everything is on disk after this
+        elapsed = time.perf_counter() - t0
+        print(f"{'batched writer':<22} {args.events / elapsed:>10.0f} {per_call * 1e6:>16.1f} {count_lines(path):>8}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,104 @@
+"""
+LiDAR ranking: replays a synthetic day of tracking events through LidarRankings and measures
+ingestion rate and suggestion latency, next to the old read path (stat + open + json.load
+of data/lidar_stats.json on every failed-selection turn).
+
+The day: visitors arrive over 10 opening hours (busier around midday), walk through a few
+zones and stop at several exhibits each, with a popularity that shifts during the day and
+log-normal dwell times.
+
+Run from backend/:
+    python -m benchmarks.lidar_bench
+    python -m benchmarks.lidar_bench --visitors 50000 --queries 200000
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from lidar import LidarRankings
+
+EXHIBITS = [
+    "D4A", "Asan.AI", "Swarming bacteria", "Chatbot", "Circuit Flowfields", "Complex calculations",
+    "Complexity Explorables", "Data traces", "Dresden mapping", "Faces", "Film Forms", "Hyperuniformity",
+    "Magic Mirror", "Mathematical models", "Physarum", "Retro Reboot", "Sandbox", "Seamless pattern",
+    "Server cabinet", "Server kit", "Time travel", "Traces", "VR experience",
+]
+ZONES = ["entrance", "lab", "studio", "archive"]
+OPEN_S = 10 * 3600
+
+
+def synthetic_day(visitors: int, seed: int = 1):
+    rng = random.Random(seed)
+    start = time.time() - OPEN_S
+    events = []
+    for v in range(visitors):
+        t = start + min(OPEN_S - 1, max(0.0, rng.gauss(OPEN_S / 2, OPEN_S / 5)))
+        zone = rng.choice(ZONES)
+        session_id = f"visitor-{v}" if rng.random() < 0.3 else None  # paired with a kiosk session
+        for _ in range(rng.randint(3, 12)):
+            # Popularity drifts: the favourite exhibit moves along the list over the day
+            hour = (t - start) / 3600
+            idx = int(rng.paretovariate(1.3) + hour * 2) % len(EXHIBITS)
+            dwell = rng.lognormvariate(3.5, 0.8)
+            t += dwell + rng.uniform(5, 60)
+            events.append({"exhibit": EXHIBITS[idx], "dwell_s": dwell, "ts": t, "zone": zone, "session_id": session_id})
+    events.sort(key=lambda e: e["ts"])
+    return events
+
+
+def legacy_suggestions(path: str):
+    # The previous get_lidar_suggestions body
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            data = json.load(f)
+            if data and len(data) >= 3:
+                return ", ".join(data[:3])
+
+
+def percentile_ns(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--visitors", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=100000)
+    args = parser.parse_args()
+
+    events = synthetic_day(args.visitors)
+    path = os.path.join(tempfile.mkdtemp(prefix="lidar_bench_"), "lidar_stats.json")
+    with open(path, "w") as f:
+        json.dump(["Sandbox", "Magic Mirror", "Retro Reboot"], f)
+    rankings = LidarRankings(stats_path=path)
+
+    t0 = time.perf_counter()
+    for e in events:
+        rankings.ingest(e["exhibit"], e["dwell_s"], e["ts"], e["zone"], e["session_id"])
+    ingest_s = time.perf_counter() - t0
+    print(f"{len(events)} events from {args.visitors} visitors: ingested in {ingest_s:.2f}s "
+          f"({len(events) / ingest_s:,.0f} events/s)")
+    print(f"top overall: {', '.join(rankings.suggestions())}")
+
+    rng = random.Random(2)
+    keys = [(f"visitor-{rng.randrange(args.visitors)}", rng.choice(ZONES)) for _ in range(args.queries)]
+    print(f"{'read path':<10} {'p50 ns':>9} {'p99 ns':>9} {'queries/s':>12}")
+    for name, fn in (("legacy", lambda sid, zone: legacy_suggestions(path)),
+                     ("ranking", lambda sid, zone: rankings.suggestions(sid, zone))):
+        samples = []
+        start = time.perf_counter()
+        for sid, zone in keys:
+            q0 = time.perf_counter_ns()
+            fn(sid, zone)
+            samples.append(time.perf_counter_ns() - q0)
+        total = time.perf_counter() - start
+        print(f"{name:<10} {percentile_ns(samples, 50):>9,} {percentile_ns(samples, 99):>9,} {len(keys) / total:>12,.0f}")
+    print(rankings.stats())
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,244 @@
+"""
+End-to-end load suite: replays generated kiosk conversations (benchmarks/conversations.py)
+through the real app, in-process over ASGI, against the deterministic FakeProvider.
+
+Each session does what the Unity client does: /start and GET /tts for the greeting, then
+per visitor turn POST /stt (a short WAV), POST /chat and GET /tts for the reply. N sessions
+run at once until all conversations are replayed.
+
+Reported: throughput, p50/p95/p99 per endpoint, and LLM calls per /chat turn (counted per
+request, including the classifier / switch check and any speculative prefetch it starts).
+
+Headless regression gate: --save writes the results as JSON; --baseline compares against a
+saved run and exits 1 when p95 or LLM calls per turn grow, or throughput drops, by more
+than --threshold.
+
+Run from backend/:
+    python -m benchmarks.load_suite
+    python -m benchmarks.load_suite --sessions 50 --conversations 300
+    python -m benchmarks.load_suite --baseline benchmarks/data/load_baseline.json   # CI / review
+    python -m benchmarks.load_suite --save benchmarks/data/load_baseline.json       # new baseline
+"""
+
+import argparse
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+# Keep the run self-contained: no disk cache / log / session files shared with a real deployment
+_tmp = tempfile.mkdtemp(prefix="load_suite_")
+os.environ.setdefault("TTS_CACHE_DIR", os.path.join(_tmp, "tts_cache"))
+os.environ.setdefault("FEEDBACK_LOG_PATH", os.path.join(_tmp, "feedback_log.jsonl"))
+os.environ.setdefault("ANALYTICS_DB_PATH", os.path.join(_tmp, "analytics.db"))
+os.environ.setdefault("SESSION_BACKEND", "memory")
+os.environ.setdefault("QUESTION_BANK_POLL_S", "0")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark-not-used")
+# Sessions are started far faster than real kiosks would: no pacing of new conversations
+os.environ.setdefault("ADMISSION_START_RATE", "0")
+
+import httpx  # noqa: E402
+
+import main  # noqa: E402
+import providers  # noqa: E402
+from providers import FakeProvider  # noqa: E402
+from resilience import ResilientProvider  # noqa: E402
+from benchmarks.conversations import Conversation, load_generator  # noqa: E402
+from benchmarks.provider_load import percentile  # noqa: E402
+from benchmarks.turn_latency import make_wav  # noqa: E402
+
+ENDPOINTS = ("start", "stt", "chat", "tts")
+
+# LLM calls made while serving the current request (set per /chat by the driver)
+_LLM_CALLS: contextvars.ContextVar[Optional[List[int]]] = contextvars.ContextVar("llm_calls", default=None)
+
+
+class CountingProvider:
+    """Counts LLM calls into the calling request's counter; everything else is passed through."""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.name = inner.name
+        self.tts_model = inner.tts_model
+
+    def _count(self):
+        calls = _LLM_CALLS.get()
+        if calls is not None:
+            calls[0] += 1
+
+    async def complete(self, *args, **kwargs):
+        self._count()
+        return await self.inner.complete(*args, **kwargs)
+
+    def stream_complete(self, *args, **kwargs):
+        self._count()
+        return self.inner.stream_complete(*args, **kwargs)
+
+    async def transcribe(self, *args, **kwargs):
+        return await self.inner.transcribe(*args, **kwargs)
+
+    async def synthesize(self, *args, **kwargs):
+        return await self.inner.synthesize(*args, **kwargs)
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+class Recorder:
+    def __init__(self):
+        self.latency_ms: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+        self.llm_per_turn: List[int] = []
+
+    async def call(self, endpoint: str, request) -> Optional[httpx.Response]:
+        t0 = time.perf_counter()
+        try:
+            r = await request
+            r.raise_for_status()
+        except httpx.HTTPError as e:
+            self.errors[endpoint] += 1
+            logging.getLogger(__name__).warning(f"{endpoint} failed: {e}")
+            return None
+        self.latency_ms[endpoint].append((time.perf_counter() - t0) * 1000)
+        return r
+
+
+async def replay(http: httpx.AsyncClient, rec: Recorder, sid: str, conv: Conversation, wav: bytes, think_s: float):
+    r = await rec.call("start", http.get("/start", params={"session_id": sid}))
+    if r is None:
+        return
+    await rec.call("tts", http.get("/tts", params={"text": r.json()["reply_text"]}))
+    for text in conv.turns:
+        await asyncio.sleep(think_s)
+        await rec.call("stt", http.post("/stt", data={"session_id": sid}, files={"audio_file": ("turn.wav", wav, "audio/wav")}))
+        calls = [0]
+        token = _LLM_CALLS.set(calls)
+        try:
+            r = await rec.call("chat", http.post("/chat", json={"session_id": sid, "user_text": text}))
+        finally:
+            _LLM_CALLS.reset(token)
+        if r is None:
+            continue
+        rec.llm_per_turn.append(calls[0])
+        await rec.call("tts", http.get("/tts", params={"text": r.json()["reply_text"]}))
+
+
+async def run(args) -> Dict[str, Any]:
+    fake = FakeProvider(llm_latency=args.llm_latency, stt_latency=args.stt_latency,
+                        tts_latency=args.tts_latency, seed=args.seed)
+    providers.set_provider(ResilientProvider(CountingProvider(fake)))  # the production wrapper
+    await main.startup_event()
+    conversations = load_generator(main.QUESTIONS_PATH, seed=args.seed).conversations(args.conversations)
+    wav = make_wav(args.clip_s)
+    rec = Recorder()
+    limit = asyncio.Semaphore(args.sessions)
+
+    async def session(i: int, conv: Conversation):
+        async with limit:
+            await replay(http, rec, f"load-{i}", conv, wav, args.think_ms / 1000)
+
+    transport = httpx.ASGITransport(app=main.app)
+    start = time.perf_counter()
+    async with httpx.AsyncClient(transport=transport, base_url="http://kiosk", timeout=120) as http:
+        await asyncio.gather(*[session(i, c) for i, c in enumerate(conversations)])
+    elapsed = time.perf_counter() - start
+    await main.shutdown_event()
+
+    requests = sum(len(v) for v in rec.latency_ms.values())
+    per_turn = Counter(rec.llm_per_turn)
+    return {
+        "config": {k: getattr(args, k) for k in ("sessions", "conversations", "seed", "llm_latency", "stt_latency",
+                                                 "tts_latency", "think_ms", "clip_s")},
+        "elapsed_s": round(elapsed, 2),
+        "requests_per_s": round(requests / elapsed, 1),
+        "turns_per_s": round(len(rec.llm_per_turn) / elapsed, 2),
+        "endpoints": {
+            name: {"count": len(lat), "errors": rec.errors[name],
+                   "p50_ms": round(percentile(lat, 50), 1), "p95_ms": round(percentile(lat, 95), 1),
+                   "p99_ms": round(percentile(lat, 99), 1), "mean_ms": round(statistics.mean(lat), 1)}
+            for name in ENDPOINTS if (lat := rec.latency_ms[name])
+        },
+        "llm_calls_per_turn": {
+            "mean": round(statistics.mean(rec.llm_per_turn), 3) if rec.llm_per_turn else 0.0,
+            "histogram": {str(n): per_turn[n] for n in sorted(per_turn)},
+        },
+        "kinds": dict(Counter(c.kind for c in conversations)),
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    """Regressions beyond the threshold, as readable lines (empty = pass)."""
+    failures = []
+    for name, base in baseline["endpoints"].items():
+        cur = current["endpoints"].get(name)
+        if cur is None:
+            failures.append(f"{name}: no successful requests")
+        elif cur["p95_ms"] > base["p95_ms"] * (1 + threshold):
+            failures.append(f"{name} p95 {cur['p95_ms']:.1f} ms > baseline {base['p95_ms']:.1f} ms +{threshold:.0%}")
+        if cur is not None and cur["errors"] > base["errors"]:
+            failures.append(f"{name}: {cur['errors']} errors (baseline {base['errors']})")
+    if current["requests_per_s"] < baseline["requests_per_s"] * (1 - threshold):
+        failures.append(f"throughput {current['requests_per_s']} req/s < baseline {baseline['requests_per_s']} -{threshold:.0%}")
+    cur_llm, base_llm = current["llm_calls_per_turn"]["mean"], baseline["llm_calls_per_turn"]["mean"]
+    if cur_llm > base_llm * (1 + threshold):
+        failures.append(f"LLM calls per turn {cur_llm} > baseline {base_llm} +{threshold:.0%}")
+    return failures
+
+
+def print_report(result: Dict[str, Any]):
+    cfg = result["config"]
+    print(f"{cfg['conversations']} conversations, {cfg['sessions']} concurrent sessions, fake LLM {cfg['llm_latency']} ms "
+          f"({', '.join(f'{k} {v}' for k, v in sorted(result['kinds'].items()))})")
+    print(f"{result['elapsed_s']} s: {result['requests_per_s']} req/s, {result['turns_per_s']} chat turns/s")
+    print(f"{'endpoint':<8} {'count':>6} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'mean ms':>8}")
+    for name, e in result["endpoints"].items():
+        print(f"{name:<8} {e['count']:>6} {e['errors']:>6} {e['p50_ms']:>8.1f} {e['p95_ms']:>8.1f} "
+              f"{e['p99_ms']:>8.1f} {e['mean_ms']:>8.1f}")
+    llm = result["llm_calls_per_turn"]
+    print(f"LLM calls per /chat turn: mean {llm['mean']}, "
+          + ", ".join(f"{n} calls: {count}" for n, count in llm["histogram"].items()))
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=25, help="concurrent kiosk sessions")
+    parser.add_argument("--conversations", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--llm-latency", default="lognormal:800:0.35", help="FakeProvider latency spec")
+    parser.add_argument("--stt-latency", default="lognormal:400:0.3")
+    parser.add_argument("--tts-latency", default="lognormal:300:0.3")
+    parser.add_argument("--think-ms", type=float, default=0, help="pause before each visitor turn")
+    parser.add_argument("--clip-s", type=float, default=3.0, help="length of the WAV sent to /stt")
+    parser.add_argument("--save", help="write the results as JSON")
+    parser.add_argument("--baseline", help="compare against a saved run; exit 1 on regression")
+    parser.add_argument("--threshold", type=float, default=0.15, help="allowed relative regression")
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    result = asyncio.run(run(args))
+    print_report(result)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline["config"] != result["config"]:
+            print(f"warning: baseline was recorded with {baseline['config']}")
+        failures = compare(result, baseline, args.threshold)
+        for line in failures:
+            print(f"REGRESSION: {line}")
+        print("OK: within threshold of the baseline" if not failures else f"{len(failures)} regression(s)")
+        sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main_cli()
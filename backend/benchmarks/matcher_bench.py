@@ -0,0 +1,77 @@
+"""
+Exhibit matcher micro-benchmark + accuracy check.
+
+Compares the legacy triple substring scan (JSON keys, EXHIBITS, KEYWORD_MAPPING,
+first dict-order hit) with the compiled ExhibitMatcher on the labelled corpus in
+benchmarks/data/matcher_corpus.json. Reports per-utterance latency, accuracy and
+how many turns would have triggered a spurious SWITCH/STAY validation call.
+
+Run from backend/:
+    python -m benchmarks.matcher_bench
+"""
+
+import argparse
+import json
+import os
+import timeit
+
+from config import EXHIBITS, KEYWORD_MAPPING
+from exhibit_matcher import ExhibitMatcher
+
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "data", "matcher_corpus.json")
+QUESTIONS_PATH = os.getenv("EXHIBIT_QUESTIONS_PATH", "data/exhibit_questions.json")
+
+
+def legacy_detect(text, exhibit_questions):
+    t = (text or "").lower()
+    for name in exhibit_questions.keys():
+        if name.lower() in t: return name
+    for name in EXHIBITS:
+        if name.lower() in t: return name
+    for keyword, official_name in KEYWORD_MAPPING.items():
+        if keyword in t:
+            return official_name
+    return None
+
+
+def evaluate(detect, corpus):
+    correct = spurious = 0
+    for row in corpus:
+        detected = detect(row["text"])
+        current = row["current"]
+        resolved = detected or current
+        if resolved == row["expected"]:
+            correct += 1
+        # chat_endpoint asks the LLM "SWITCH or STAY?" whenever a different exhibit is detected
+        if current and detected and detected != current and row["expected"] == current:
+            spurious += 1
+    return correct, spurious
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=2000, help="passes over the corpus for timing")
+    args = parser.parse_args()
+
+    with open(QUESTIONS_PATH, "r", encoding="utf-8") as f:
+        exhibit_questions = json.load(f)
+    with open(CORPUS_PATH, "r", encoding="utf-8") as f:
+        corpus = json.load(f)
+
+    matcher = ExhibitMatcher.build(exhibit_questions, EXHIBITS, KEYWORD_MAPPING)
+    impls = {
+        "legacy substring scan": lambda text: legacy_detect(text, exhibit_questions),
+        "compiled matcher": matcher.best,
+    }
+
+    n = len(corpus) * args.repeat
+    print(f"corpus={len(corpus)} utterances, {n} timed calls each")
+    print(f"{'implementation':<24} {'us/call':>8} {'accuracy':>9} {'spurious switch checks':>23}")
+    for label, detect in impls.items():
+        seconds = timeit.timeit(lambda: [detect(row["text"]) for row in corpus], number=args.repeat)
+        correct, spurious = evaluate(detect, corpus)
+        print(f"{label:<24} {seconds / n * 1e6:>8.2f} {correct / len(corpus):>9.0%} {spurious:>23}")
+
+
+if __name__ == "__main__":
+    main_cli()
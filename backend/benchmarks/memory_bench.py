@@ -0,0 +1,85 @@
+"""
+Conversation memory: history tokens sent per LLM call with the old fixed 10-message window
+vs the token-budgeted ConversationMemory, over long kiosk sessions with some long transcripts.
+
+Reports mean/p95/max history tokens per call and the mean append cost.
+
+Run from backend/:
+    python -m benchmarks.memory_bench
+    python -m benchmarks.memory_bench --turns 60 --long-share 0.3
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from conversation_memory import ConversationMemory, MESSAGE_OVERHEAD_TOKENS
+from prompts import estimate_tokens
+
+SHORT_ANSWERS = ["It was fun", "Playful I guess", "Maybe more signs would help", "Not really", "The colours were great"]
+FILLER = "and then I walked over to the screen and it sort of followed me around which was strange but also kind of cool "
+REPLY = "Thanks for sharing that. It uses LiDAR sensors to track movement. Did it feel playful or a bit creepy to you?"
+
+
+class LegacyWindow:
+    """The previous _push_message: list with pop(0) once 10 messages are stored."""
+
+    def __init__(self):
+        self.messages = []
+
+    def append(self, role, content):
+        if len(self.messages) >= 10:
+            self.messages.pop(0)
+        self.messages.append({"role": role, "content": content})
+
+    def history(self):
+        return list(self.messages)
+
+
+def history_tokens(messages) -> int:
+    return sum(estimate_tokens(m["content"]) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def utterance(rng: random.Random, long_share: float) -> str:
+    if rng.random() < long_share:
+        return FILLER * rng.randint(3, 10)  # rambling STT transcript
+    return rng.choice(SHORT_ANSWERS)
+
+
+def run(args):
+    results = {}
+    for name, factory in (("window10", LegacyWindow), ("budgeted", ConversationMemory)):
+        rng = random.Random(11)
+        per_call, append_s, appends = [], 0.0, 0
+        for _ in range(args.sessions):
+            memory = factory()
+            for _ in range(args.turns):
+                t0 = time.perf_counter()
+                memory.append("user", utterance(rng, args.long_share))
+                append_s += time.perf_counter() - t0
+                per_call.append(history_tokens(memory.history()))
+                t0 = time.perf_counter()
+                memory.append("assistant", REPLY)
+                append_s += time.perf_counter() - t0
+                appends += 2
+        per_call.sort()
+        results[name] = (statistics.mean(per_call), per_call[int(len(per_call) * 0.95)], per_call[-1],
+                         append_s / appends * 1e6)
+
+    print(f"{args.sessions} sessions x {args.turns} turns, {args.long_share:.0%} long transcripts")
+    print(f"{'memory':<10} {'mean tok':>9} {'p95 tok':>8} {'max tok':>8} {'append us':>10}")
+    for name, (mean, p95, peak, append_us) in results.items():
+        print(f"{name:<10} {mean:>9.0f} {p95:>8} {peak:>8} {append_us:>10.2f}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument("--long-share", type=float, default=0.2)
+    run(parser.parse_args())
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,84 @@
+"""
+Tracing overhead: server-side cost per request of the metrics layer (spans, Server-Timing,
+histograms) and of the sampling profiler, with a zero-latency fake provider so only the
+app's own work is measured.
+
+Sends /start + /chat turns in-process over ASGI with METRICS_ENABLED off, on, and on with
+the profiler sampling every 5 ms.
+
+Run from backend/:
+    python -m benchmarks.metrics_overhead_bench
+    python -m benchmarks.metrics_overhead_bench --sessions 2000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("TTS_CACHE_DIR", tempfile.mkdtemp(prefix="metrics_bench_"))
+os.environ.setdefault("FEEDBACK_LOG_PATH", os.path.join(os.environ["TTS_CACHE_DIR"], "feedback_log.jsonl"))
+os.environ.setdefault("ANALYTICS_DB_PATH", os.path.join(os.environ["TTS_CACHE_DIR"], "analytics.db"))
+os.environ.setdefault("QUESTION_BANK_POLL_S", "0")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark-not-used")
+# Sessions are started far faster than real kiosks would: no pacing of new conversations
+os.environ.setdefault("ADMISSION_START_RATE", "0")
+
+import httpx  # noqa: E402
+
+import main  # noqa: E402
+import metrics  # noqa: E402
+import providers  # noqa: E402
+from providers import FakeProvider  # noqa: E402
+from benchmarks.provider_load import percentile  # noqa: E402
+
+TURNS = ["Sandbox", "Playful", "The colours were great", "bye"]
+
+
+async def run_mode(http: httpx.AsyncClient, label: str, sessions: int) -> list:
+    samples = []
+    for i in range(sessions):
+        sid = f"{label}-{i}"
+        t0 = time.perf_counter()
+        await http.get("/start", params={"session_id": sid})
+        samples.append((time.perf_counter() - t0) * 1e6)
+        for text in TURNS:
+            t0 = time.perf_counter()
+            await http.post("/chat", json={"session_id": sid, "user_text": text})
+            samples.append((time.perf_counter() - t0) * 1e6)
+    return samples
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=500)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    async def run():
+        providers.set_provider(FakeProvider(llm_latency="const:0", stt_latency="const:0", tts_latency="const:0"))
+        await main.startup_event()
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://kiosk") as http:
+            await run_mode(http, "warmup", 50)
+            print(f"{args.sessions} sessions x {1 + len(TURNS)} requests, zero-latency provider")
+            print(f"{'mode':<18} {'p50 us':>8} {'p99 us':>8} {'mean us':>8}")
+            for label, enabled, profile in (("metrics off", False, False), ("metrics on", True, False),
+                                            ("on + profiler", True, True)):
+                metrics.METRICS_ENABLED = enabled
+                if profile:
+                    metrics.PROFILER.start(5)
+                lat = await run_mode(http, label.replace(" ", ""), args.sessions)
+                if profile:
+                    metrics.PROFILER.stop()
+                print(f"{label:<18} {percentile(lat, 50):>8.0f} {percentile(lat, 99):>8.0f} {statistics.mean(lat):>8.0f}")
+        await main.shutdown_event()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,88 @@
+"""
+Speculative prefetch: /chat latency per turn with SPECULATIVE_PREFETCH off vs on.
+
+Drives kiosk sessions in-process through main.start_endpoint / run_chat_turn against the
+mock provider from provider_load. Between turns the visitor "records" for --think-ms, which
+is the window the prefetch works in. Choice questions are answered with one of the declared
+choices (--choice-share of the time), everything else with free text.
+
+Run from backend/:
+    python -m benchmarks.prefetch_bench
+    python -m benchmarks.prefetch_bench --sessions 50 --latency-ms 1200 --think-ms 3000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark-not-used")
+os.environ.setdefault("FEEDBACK_LOG_PATH", "/tmp/prefetch_bench_feedback.jsonl")
+
+import main  # noqa: E402
+import providers  # noqa: E402
+from prefetch import PrefetchSlots  # noqa: E402
+from tts_cache import TTSCache  # noqa: E402
+from benchmarks.provider_load import MockProvider, percentile  # noqa: E402
+
+OPEN_ANSWERS = ["The colours were great", "Maybe more signs would help", "It was a bit slow to react"]
+
+
+async def run_session(sid: str, rng: random.Random, args, latencies: list):
+    await main.start_endpoint(sid)
+    utterances = [rng.choice(list(main.EXHIBIT_QUESTIONS))] + [None] * (args.turns - 1)
+    for text in utterances:
+        await asyncio.sleep(args.think_ms / 1000)
+        if text is None:
+            s = await main._get_session(sid)
+            question = main._find_question(s.selected_exhibit, s.last_qid) or {}
+            if question.get("answer_type") == "choice" and rng.random() < args.choice_share:
+                text = rng.choice(question["choices"]).capitalize() + "."
+            else:
+                text = rng.choice(OPEN_ANSWERS)
+        t0 = time.perf_counter()
+        await main.run_chat_turn(sid, text)
+        latencies.append((time.perf_counter() - t0) * 1000)
+
+
+async def run_mode(enabled: bool, args) -> tuple:
+    main.SPECULATIVE_PREFETCH = enabled
+    main.PREFETCH = PrefetchSlots()
+    main.TTS_CACHE = TTSCache(directory=tempfile.mkdtemp(prefix="prefetch_bench_tts_"))
+    rng = random.Random(5)
+    latencies = []
+    await asyncio.gather(*[run_session(f"prefetch-{enabled}-{i}", rng, args, latencies)
+                           for i in range(args.sessions)])
+    return latencies, main.PREFETCH.stats()
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=4, help="chat turns per session (incl. exhibit choice)")
+    parser.add_argument("--latency-ms", type=float, default=800, help="mock provider latency per call")
+    parser.add_argument("--think-ms", type=float, default=2000, help="visitor listening + recording time")
+    parser.add_argument("--choice-share", type=float, default=0.7, help="choice answers that use a declared choice")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    main.CHOICE_FAST_PATH = False  # otherwise plain choice answers never reach the LLM to prefetch
+    main.load_exhibit_questions()
+    providers.set_provider(MockProvider(latency_s=args.latency_ms / 1000))
+
+    print(f"{args.sessions} sessions x {args.turns} turns, mock latency {args.latency_ms:.0f} ms, "
+          f"think time {args.think_ms:.0f} ms")
+    print(f"{'prefetch':<9} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8} {'hit rate':>9} {'reply hits':>10} {'saved ms/turn':>13}")
+    for enabled in (False, True):
+        lat, stats = asyncio.run(run_mode(enabled, args))
+        print(f"{'on' if enabled else 'off':<9} {percentile(lat, 50):>8.1f} {percentile(lat, 95):>8.1f} "
+              f"{statistics.mean(lat):>8.1f} {stats['hit_rate']:>9.0%} {stats['reply_hits']:>10} "
+              f"{stats['saved_ms_per_turn']:>13.1f}")
+
+
+if __name__ == "__main__":
+    main_cli()
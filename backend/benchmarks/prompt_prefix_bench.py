@@ -0,0 +1,156 @@
+"""
+Prompt-prefix benchmark: how much of each /chat LLM input a provider-side prompt cache can
+reuse with the old prompt layout vs the template engine, and what rendering costs locally.
+
+Drives real conversations through main._prepare_chat_turn / _finish_chat_turn (no LLM, the
+reply is canned) and, for every turn, serializes the LLM input both ways:
+  legacy   : one system message, KB sandwiched between topic and target question, then history
+  template : byte-stable prefix, history, per-turn delta last
+Provider caching model (OpenAI): the longest prefix shared with any earlier request is reusable
+once it reaches 1024 tokens, in 128-token steps. Tokens are estimated at ~4 chars/token.
+
+Run from backend/:
+    python -m benchmarks.prompt_prefix_bench
+    python -m benchmarks.prompt_prefix_bench --sessions 100
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark-not-used")
+os.environ.setdefault("FEEDBACK_LOG_PATH", "/tmp/prompt_prefix_bench_feedback.jsonl")
+
+import main  # noqa: E402
+from prompts import estimate_tokens  # noqa: E402
+
+CACHE_MIN_TOKENS = 1024
+CACHE_STEP_TOKENS = 128
+CANNED_REPLY = "Thanks for sharing that. Did it feel playful or a bit creepy to you?"
+ANSWERS = ["It was fun", "I found it a bit confusing", "Maybe more signs would help",
+           "How does it actually work?", "Playful I guess", "The colours were great"]
+
+
+def legacy_system_prompt(target_question, current_exhibit, is_closing=False, transition_note=None) -> str:
+    """The pre-template build_unified_system_prompt, for comparison."""
+    prompt = f"""
+You are the embodied subconscious of the 'Data Spaces' exhibition.
+Your goal is to collect specific feedback from the visitor.
+
+Global Exhibition Knowledge (Use this to answer factual questions):
+{main.GLOBAL_KB_STR}
+
+Context:
+- Current Topic: {current_exhibit if current_exhibit else "General (No exhibit selected)"}
+"""
+    if is_closing:
+        prompt += """
+Current Status: CONVERSATION ENDING.
+Task:
+1. Review the conversation history.
+2. Generate a 2-sentence closing.
+   - If they gave feedback, summarize it ("Thanks for your thoughts on the VR").
+   - If not, just say thanks.
+3. End politely. Do NOT ask any new questions.
+"""
+        return prompt
+    prompt += f"""
+Current Status: ACTIVE INTERVIEW.
+
+Your Mandatory Goal:
+You MUST get an answer to this specific question:
+>>> "{target_question}"
+
+INSTRUCTIONS:
+1. **Answer First:** If the user asked a question (e.g., "How does it work?"), answer it clearly using the 'Global Exhibition Knowledge' above.
+2. **Transition Immediately:** After answering, you MUST asks the Target Question above.
+3. **Negative Constraints:** - Do NOT ask "Do you want to know more?"
+   - Do NOT ask "Is there anything else?"
+   - Do NOT ask "Does that make sense?"
+   - ONLY ask the Target Question.
+
+Example Interaction:
+User: "What is Faces?"
+You: "Faces uses LiDAR sensors to track your eyes. Did seeing that feel playful or creepy?"
+(Notice how you answered, then immediately pivoted to the feedback question).
+"""
+    if transition_note:
+        prompt += f"\n**SPECIAL TRANSITION:** {transition_note}\n"
+    return prompt
+
+
+def serialize(messages) -> str:
+    return "".join(f"<{m['role']}>{m['content']}\n" for m in messages)
+
+
+class PromptCacheModel:
+    def __init__(self):
+        self.seen = []
+
+    def cached_tokens(self, text: str) -> int:
+        best = max((len(os.path.commonprefix([text, prev])) for prev in self.seen), default=0)
+        self.seen.append(text)
+        tokens = best // 4
+        if tokens < CACHE_MIN_TOKENS:
+            return 0
+        return CACHE_MIN_TOKENS + (tokens - CACHE_MIN_TOKENS) // CACHE_STEP_TOKENS * CACHE_STEP_TOKENS
+
+
+async def run(args):
+    main.load_exhibit_questions()
+    rng = random.Random(7)
+    exhibits = list(main.EXHIBIT_QUESTIONS)
+    layouts = {"legacy": PromptCacheModel(), "template": PromptCacheModel()}
+    totals = {k: {"input": 0, "cached": 0, "render_s": 0.0} for k in layouts}
+    calls = 0
+
+    for i in range(args.sessions):
+        sid = f"prefix-bench-{i}"
+        await main.start_endpoint(sid)
+        utterances = [rng.choice(exhibits)] + [rng.choice(ANSWERS) for _ in range(args.turns - 1)]
+        for text in utterances:
+            turn = await main._prepare_chat_turn(sid, text)
+            s = await main._get_session(sid)
+            plan = turn["plan"]
+            history = turn["history"]
+
+            t0 = time.perf_counter()
+            legacy = [{"role": "system", "content": legacy_system_prompt(
+                plan["text"] if plan else "", s.selected_exhibit, is_closing=plan is None)}] + history
+            totals["legacy"]["render_s"] += time.perf_counter() - t0
+            t0 = time.perf_counter()
+            parts = main.build_unified_system_prompt(
+                plan["text"] if plan else "", s.selected_exhibit, None, is_closing=plan is None)
+            template = main._llm_messages(parts, history)
+            totals["template"]["render_s"] += time.perf_counter() - t0
+
+            for name, messages in (("legacy", legacy), ("template", template)):
+                text_in = serialize(messages)
+                totals[name]["input"] += estimate_tokens(text_in)
+                totals[name]["cached"] += layouts[name].cached_tokens(text_in)
+            calls += 1
+            await main._finish_chat_turn(sid, turn, CANNED_REPLY)
+
+    print(f"{calls} LLM calls ({args.sessions} sessions x {args.turns} turns), "
+          f"static prefix ~{main.PROMPTS.prefix_tokens} tokens")
+    print(f"{'layout':<10} {'avg input tok':>13} {'avg cached tok':>14} {'cached ratio':>12} {'render us':>10}")
+    for name, t in totals.items():
+        print(f"{name:<10} {t['input'] / calls:>13.0f} {t['cached'] / calls:>14.0f} "
+              f"{t['cached'] / t['input']:>12.0%} {t['render_s'] / calls * 1e6:>10.1f}")
+    legacy_uncached = totals["legacy"]["input"] - totals["legacy"]["cached"]
+    template_uncached = totals["template"]["input"] - totals["template"]["cached"]
+    print(f"uncached input tokens per call: {legacy_uncached / calls:.0f} -> {template_uncached / calls:.0f} "
+          f"({1 - template_uncached / legacy_uncached:.0%} fewer)")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=40)
+    parser.add_argument("--turns", type=int, default=5)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main_cli()
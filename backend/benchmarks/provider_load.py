@@ -0,0 +1,149 @@
+"""
+Load benchmark for the async provider layer.
+
+Drives N concurrent kiosk sessions through /start + /chat against a local mock
+provider and prints p50/p99 /chat latency per concurrency level. With the async
+layer the latency stays flat; pass --blocking to simulate the old synchronous
+client (time.sleep on the event loop) for comparison.
+
+The server runs in a child process on a real socket; on a single core the load
+driver still shares CPU with it, so keep the mock latency realistic (~1 s).
+
+Run from backend/:
+    python -m benchmarks.provider_load
+    python -m benchmarks.provider_load --blocking --levels 1,5,10
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import socket
+import statistics
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+# Sessions are started far faster than real kiosks would: no pacing of new conversations
+os.environ.setdefault("ADMISSION_START_RATE", "0")
+
+import httpx
+import uvicorn
+
+import main
+import providers
+
+
+MOCK_REPLY = "The sandbox lets you shape a landscape with your hands. It projects water and contour lines onto the sand in real time. Did building your own terrain feel playful or more like work?"
+
+
+class MockProvider:
+    """
+    Answers every call after a fixed delay, like a healthy remote provider.
+    token_delay_s spreads a streamed reply over time; tts_s_per_char makes
+    synthesis time grow with the text length.
+    """
+
+    def __init__(self, latency_s: float, blocking: bool = False, token_delay_s: float = 0.0, tts_s_per_char: float = 0.0):
+        self.latency_s = latency_s
+        self.blocking = blocking
+        self.token_delay_s = token_delay_s
+        self.tts_s_per_char = tts_s_per_char
+
+    async def _wait(self, extra_s: float = 0.0):
+        if self.blocking:
+            time.sleep(self.latency_s + extra_s)  # what the old sync OpenAI client did
+        else:
+            await asyncio.sleep(self.latency_s + extra_s)
+
+    async def complete(self, messages, max_output_tokens, temperature=0.7, usage=None, cache_key=None):
+        await self._wait(self.token_delay_s * len(MOCK_REPLY.split()))
+        return MOCK_REPLY
+
+    async def stream_complete(self, messages, max_output_tokens, temperature=0.7, usage=None, cache_key=None):
+        await self._wait()
+        for word in MOCK_REPLY.split(" "):
+            await asyncio.sleep(self.token_delay_s)
+            yield word + " "
+
+    async def transcribe(self, file, language):
+        await self._wait()
+        return "I liked the sandbox"
+
+    async def synthesize(self, text, voice, fmt):
+        await self._wait(self.tts_s_per_char * len(text))
+        return b"\x00" * 1024
+
+    async def aclose(self):
+        pass
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+async def run_session(http: httpx.AsyncClient, sid: str, turns: int, latencies: list):
+    await http.get("/start", params={"session_id": sid})
+    for text in ["yes", "the sandbox please", "it felt playful", "the colours"][:turns]:
+        t0 = time.perf_counter()
+        r = await http.post("/chat", json={"session_id": sid, "user_text": text})
+        latencies.append((time.perf_counter() - t0) * 1000)
+        r.raise_for_status()
+
+
+def _serve(sock: socket.socket, mock_kwargs: dict):
+    logging.disable(logging.INFO)
+    providers.set_provider(MockProvider(**mock_kwargs))
+    uvicorn.Server(uvicorn.Config(main.app, log_level="warning")).run(sockets=[sock])
+
+
+def serve_in_background(**mock_kwargs) -> str:
+    """Run the app in its own process so the load driver doesn't compete for the GIL."""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    proc = multiprocessing.Process(target=_serve, args=(sock, mock_kwargs), daemon=True)
+    proc.start()
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(500):
+        try:
+            httpx.get(base_url + "/")
+            return base_url
+        except httpx.TransportError:
+            time.sleep(0.02)
+    raise RuntimeError("benchmark server did not start")
+
+
+async def run_level(base_url: str, concurrency: int, turns: int) -> list:
+    latencies = []
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as http:
+        await asyncio.gather(*[
+            run_session(http, f"bench-{concurrency}-{i}", turns, latencies)
+            for i in range(concurrency)
+        ])
+    return latencies
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", default="1,5,10,25,50", help="comma separated concurrent session counts")
+    parser.add_argument("--latency-ms", type=float, default=1000, help="mock provider latency per call")
+    parser.add_argument("--turns", type=int, default=3, help="chat turns per session")
+    parser.add_argument("--blocking", action="store_true", help="simulate the old blocking client")
+    args = parser.parse_args()
+
+    base_url = serve_in_background(latency_s=args.latency_ms / 1000, blocking=args.blocking)
+
+    mode = "blocking" if args.blocking else "async"
+    print(f"mode={mode} mock_latency={args.latency_ms:.0f}ms turns/session={args.turns}")
+    print(f"{'sessions':>8} {'requests':>8} {'p50 ms':>8} {'p99 ms':>8} {'mean ms':>8}")
+    for level in [int(x) for x in args.levels.split(",")]:
+        lat = asyncio.run(run_level(base_url, level, args.turns))
+        print(f"{level:>8} {len(lat):>8} {percentile(lat, 50):>8.1f} {percentile(lat, 99):>8.1f} {statistics.mean(lat):>8.1f}")
+
+
+if __name__ == "__main__":
+    main_cli()
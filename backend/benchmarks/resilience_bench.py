@@ -0,0 +1,131 @@
+"""
+Provider resilience: the real OpenAIProvider against the local fault-injecting server
+(fault_server.py), bare vs wrapped in ResilientProvider (retries only, then retries + hedging).
+
+Phase 1 (faults): LLM calls while the server injects slow responses, 429s, 500s and
+connection resets. Reported: success rate, latency percentiles, retries and hedges.
+Phase 2 (outage): the server answers 503 to everything for a while, then recovers.
+Reported: provider requests during the outage, short-circuited calls and how soon
+calls succeed again.
+
+Run from backend/:
+    python -m benchmarks.resilience_bench
+    python -m benchmarks.resilience_bench --calls 1000 --slow 0.1 --reset 0.05
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+# Short per-attempt deadline and breaker cooldown so the run takes seconds, not minutes
+os.environ.setdefault("LLM_TIMEOUT_S", "1.0")
+os.environ.setdefault("BREAKER_COOLDOWN_S", "1.0")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark-not-used")
+
+import resilience  # noqa: E402
+from providers import OpenAIProvider  # noqa: E402
+from resilience import ResilientProvider  # noqa: E402
+from benchmarks.fault_server import Faults, FaultServer  # noqa: E402
+from benchmarks.provider_load import percentile  # noqa: E402
+
+MESSAGES = [{"role": "system", "content": "You are a museum guide."}, {"role": "user", "content": "It was fun"}]
+
+
+async def timed_call(provider, latencies: list) -> bool:
+    t0 = time.perf_counter()
+    try:
+        hedge = {"hedge": True} if getattr(provider, "hedge", False) else {}  # ResilientProvider only
+        await provider.complete(MESSAGES, max_output_tokens=60, **hedge)
+        ok = True
+    except Exception:
+        ok = False
+    latencies.append((time.perf_counter() - t0) * 1000)
+    return ok
+
+
+async def run_faults(server: FaultServer, mode: str, calls: int, concurrency: int):
+    server.rng.seed(7)  # same fault sequence for every mode
+    inner = OpenAIProvider()
+    provider = inner if mode == "bare" else ResilientProvider(inner, hedge=(mode == "hedged"))
+    limit = asyncio.Semaphore(concurrency)
+    latencies: list = []
+
+    async def one():
+        async with limit:
+            return await timed_call(provider, latencies)
+
+    results = await asyncio.gather(*[one() for _ in range(calls)])
+    await inner.aclose()
+    stats = provider.stats()["llm"] if mode != "bare" else {}
+    return sum(results) / calls, latencies, stats
+
+
+async def run_outage(server: FaultServer, mode: str, outage_s: float, rate_hz: float):
+    server.faults = Faults(latency_s=0.03)
+    inner = OpenAIProvider()
+    provider = inner if mode == "bare" else ResilientProvider(inner)
+    start = time.perf_counter()
+    server.faults.outage = True
+    requests_before = server.counts["requests"]
+    recovered_after = None
+    tasks = []
+
+    async def probe(issued: float):
+        nonlocal recovered_after
+        if await timed_call(provider, []) and not server.faults.outage and recovered_after is None:
+            recovered_after = issued - start - outage_s
+
+    while time.perf_counter() - start < outage_s * 2:
+        if server.faults.outage and time.perf_counter() - start >= outage_s:
+            server.faults.outage = False
+            outage_requests = server.counts["requests"] - requests_before
+        tasks.append(asyncio.create_task(probe(time.perf_counter())))
+        await asyncio.sleep(1 / rate_hz)
+    await asyncio.gather(*tasks)
+    await inner.aclose()
+    short = provider.stats()["llm"]["short_circuits"] if mode != "bare" else 0
+    return len(tasks), outage_requests, short, recovered_after
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--slow", type=float, default=0.05, help="share of responses slower than the 1 s deadline")
+    parser.add_argument("--rate-limit", type=float, default=0.05)
+    parser.add_argument("--error", type=float, default=0.02)
+    parser.add_argument("--reset", type=float, default=0.03)
+    parser.add_argument("--outage-s", type=float, default=3.0)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    async def run():
+        server = await FaultServer().start()
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        print(f"phase 1: {args.calls} LLM calls, {args.slow:.0%} slow / {args.rate_limit:.0%} 429 / "
+              f"{args.error:.0%} 500 / {args.reset:.0%} reset, 1 s attempt deadline")
+        print(f"{'mode':<8} {'success':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'retries':>8} {'hedges':>7} {'won':>5}")
+        for mode in ("bare", "retry", "hedged"):
+            server.faults = Faults(latency_s=0.05, slow_p=args.slow, slow_s=3.0, rate_limit_p=args.rate_limit,
+                                   retry_after_s=0.1, error_p=args.error, reset_p=args.reset)
+            ok, lat, stats = await run_faults(server, mode, args.calls, args.concurrency)
+            print(f"{mode:<8} {ok:>8.1%} {percentile(lat, 50):>8.0f} {percentile(lat, 95):>8.0f} "
+                  f"{percentile(lat, 99):>8.0f} {stats.get('retries', '-'):>8} {stats.get('hedges', '-'):>7} "
+                  f"{stats.get('hedge_wins', '-'):>5}")
+
+        print(f"\nphase 2: {args.outage_s:.0f} s of 503s at 20 calls/s, then as long again healthy "
+              f"(breaker: {resilience.BREAKER_FAILURES} failures, {os.environ['BREAKER_COOLDOWN_S']} s cooldown)")
+        print(f"{'mode':<8} {'calls':>6} {'sent to provider':>17} {'short-circuited':>16} {'recovered after s':>18}")
+        for mode in ("bare", "retry"):
+            calls, sent, short, recovered = await run_outage(server, mode, args.outage_s, 20)
+            rec = f"{recovered:.2f}" if recovered is not None else "-"
+            print(f"{mode:<8} {calls:>6} {sent:>17} {short:>16} {rec:>18}")
+        await server.stop()
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,167 @@
+"""
+Session representation: the previous dict session (ad-hoc keys, a set of question id strings,
+role strings in the history, JSON in the SQLite store) vs SessionState (slots, asked questions
+as a bitmask, Role enums, struct-packed binary).
+
+Sessions come from real conversations: generated kiosk conversations (benchmarks/conversations.py)
+are replayed through main.run_chat_turn with a zero-latency fake provider, then every session is
+converted to both forms. Reported per session:
+- resident bytes: tracemalloc growth while --copies sessions are decoded from their stored form
+  (fresh strings each, as a store hands them out), message text included
+- stored bytes: the value written to the SQLite store
+- serialize / deserialize time, and the cost of the prefetch planner's session copy
+
+Run from backend/:
+    python -m benchmarks.session_state_bench
+    python -m benchmarks.session_state_bench --conversations 500 --copies 20000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+from typing import Any, Callable, Dict, List
+
+os.environ.setdefault("TTS_CACHE_DIR", tempfile.mkdtemp(prefix="session_state_bench_"))
+os.environ.setdefault("FEEDBACK_LOG_PATH", os.path.join(os.environ["TTS_CACHE_DIR"], "feedback_log.jsonl"))
+os.environ.setdefault("ANALYTICS_DB_PATH", os.path.join(os.environ["TTS_CACHE_DIR"], "analytics.db"))
+os.environ.setdefault("SESSION_BACKEND", "memory")
+os.environ.setdefault("QUESTION_BANK_POLL_S", "0")
+os.environ.setdefault("OPENAI_API_KEY", "benchmark-not-used")
+
+import main  # noqa: E402
+import providers  # noqa: E402
+from benchmarks.conversations import load_generator  # noqa: E402
+from conversation_memory import ROLE_NAMES  # noqa: E402
+from providers import FakeProvider  # noqa: E402
+from session_state import SessionState, decode_session, encode_session  # noqa: E402
+
+
+class LegacyMemory:
+    """ConversationMemory as it was stored before: no slots, role strings."""
+
+    def __init__(self):
+        self.budget, self.summary_budget = 500, 120
+        self.turns = deque()
+        self.summary = deque()
+        self.tokens = self.summary_tokens = 0
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"turns": [list(t) for t in self.turns], "summary": [list(l) for l in self.summary]}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "LegacyMemory":
+        memory = cls()
+        for role, content, tokens in state.get("turns", []):
+            memory.turns.append((role, content, tokens))
+            memory.tokens += tokens
+        for line, tokens in state.get("summary", []):
+            memory.summary.append((line, tokens))
+            memory.summary_tokens += tokens
+        return memory
+
+
+def legacy_session(s: SessionState) -> Dict[str, Any]:
+    memory = LegacyMemory.from_state({"turns": [[ROLE_NAMES[r], c, t] for r, c, t in s.memory.turns],
+                                      "summary": [list(l) for l in s.memory.summary]})
+    return {"session_id": s.session_id, "memory": memory, "selected_exhibit": s.selected_exhibit,
+            "asked_qids": set(s.asked_qids), "last_qid": s.last_qid, "turn_count": s.turn_count,
+            "selection_attempts": s.selection_attempts, "force_open_choice": s.force_open_choice, "zone": s.zone}
+
+
+def legacy_encode(session: Dict[str, Any]) -> str:
+    """The previous session_store.encode_session."""
+    def value(v):
+        if isinstance(v, set):
+            return sorted(v)
+        if isinstance(v, LegacyMemory):
+            return v.to_state()
+        return v
+    return json.dumps({k: value(v) for k, v in session.items()}, ensure_ascii=False)
+
+
+def legacy_decode(data: str) -> Dict[str, Any]:
+    session = json.loads(data)
+    session["asked_qids"] = set(session.get("asked_qids", []))
+    session["memory"] = LegacyMemory.from_state(session.get("memory") or {})
+    return session
+
+
+def resident_bytes(decode: Callable[[Any], Any], stored: List[Any], copies: int) -> float:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = [decode(stored[i % len(stored)]) for i in range(copies)]
+    grown = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del held
+    return grown / copies
+
+
+def per_call_us(fn: Callable[[Any], Any], items: List[Any], rounds: int = 5) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(items) * 1e6
+
+
+def build_sessions(count: int, seed: int) -> List[SessionState]:
+    conversations = load_generator(main.QUESTIONS_PATH, seed).conversations(count)
+
+    async def run():
+        providers.set_provider(FakeProvider(llm_latency="const:0", stt_latency="const:0", tts_latency="const:0"))
+        await main.startup_event()
+        sessions = []
+        for i, conv in enumerate(conversations):
+            sid = f"kiosk-{i % 12}-{i:06d}"
+            await main.start_endpoint(sid, zone=f"zone-{i % 3}")
+            for text in conv.turns:
+                await main.run_chat_turn(sid, text)
+            sessions.append(main.SESSION_STORE.get(sid))
+        await main.shutdown_event()
+        return sessions
+    return asyncio.run(run())
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=300)
+    parser.add_argument("--copies", type=int, default=10000, help="sessions held for the resident-size measurement")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    sessions = build_sessions(args.conversations, args.seed)
+    legacy = [legacy_session(s) for s in sessions]
+    blobs = [encode_session(s) for s in sessions]
+    texts = [legacy_encode(d) for d in legacy]
+    assert all(encode_session(decode_session(b)) == b for b in blobs)
+
+    rows = [
+        ("dict + JSON", resident_bytes(legacy_decode, texts, args.copies),
+         statistics.mean(len(t.encode("utf-8")) for t in texts), per_call_us(legacy_encode, legacy),
+         per_call_us(legacy_decode, texts),
+         per_call_us(lambda d: {**d, "asked_qids": set(d["asked_qids"]), "turn_count": d["turn_count"] + 1}, legacy)),
+        ("SessionState + binary", resident_bytes(decode_session, blobs, args.copies),
+         statistics.mean(len(b) for b in blobs), per_call_us(encode_session, sessions),
+         per_call_us(decode_session, blobs), per_call_us(SessionState.copy, sessions)),
+    ]
+    turns = statistics.mean(len(s.memory.turns) for s in sessions)
+    asked = statistics.mean(len(s.asked_qids) for s in sessions)
+    print(f"{len(sessions)} sessions from replayed conversations: {turns:.1f} messages in memory, "
+          f"{asked:.1f} questions asked on average")
+    print(f"{'representation':<22} {'resident B':>10} {'stored B':>9} {'encode us':>9} {'decode us':>9} {'copy us':>8}")
+    for label, resident, stored, enc, dec, copy in rows:
+        print(f"{label:<22} {resident:>10.0f} {stored:>9.0f} {enc:>9.2f} {dec:>9.2f} {copy:>8.2f}")
+
+
+if __name__ == "__main__":
+    main_cli()
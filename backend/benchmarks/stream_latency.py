@@ -0,0 +1,86 @@
+"""
+Time-to-first-sound benchmark: /chat + /tts vs streaming /chat/stream.
+
+Buffered path: the kiosk waits for the full /chat reply, then for /tts to
+synthesize the whole text. Streaming path: the first `audio` SSE event marks
+the moment the kiosk can start playing. The mock provider spreads the reply
+over --token-ms per word and makes TTS time grow with text length.
+
+Run from backend/:
+    python -m benchmarks.stream_latency
+    python -m benchmarks.stream_latency --ttft-ms 600 --token-ms 40 --tts-ms-per-char 10
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+from benchmarks.provider_load import percentile, serve_in_background
+
+
+async def buffered_turn(http: httpx.AsyncClient, sid: str) -> float:
+    t0 = time.perf_counter()
+    chat = await http.post("/chat", json={"session_id": sid, "user_text": "it felt playful"})
+    chat.raise_for_status()
+    tts = await http.post("/tts", json={"text": chat.json()["reply_text"], "format": "mp3"})
+    tts.raise_for_status()
+    return (time.perf_counter() - t0) * 1000
+
+
+async def streaming_turn(http: httpx.AsyncClient, sid: str) -> float:
+    t0 = time.perf_counter()
+    first_audio = None
+    async with http.stream("POST", "/chat/stream", json={"session_id": sid, "user_text": "it felt playful"}) as resp:
+        resp.raise_for_status()
+        async for line in resp.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            event = json.loads(line[len("data: "):])
+            if event["event"] == "audio" and first_audio is None:
+                first_audio = (time.perf_counter() - t0) * 1000
+            elif event["event"] == "error":
+                raise RuntimeError(event["detail"])
+    return first_audio
+
+
+async def run(base_url: str, turns: int) -> dict:
+    results = {"buffered (/chat + /tts)": [], "streaming (/chat/stream)": []}
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as http:
+        for i in range(turns):
+            for label, fn in (("buffered (/chat + /tts)", buffered_turn), ("streaming (/chat/stream)", streaming_turn)):
+                sid = f"stream-bench-{label[:4]}-{i}"
+                await http.get("/start", params={"session_id": sid})
+                await http.post("/chat", json={"session_id": sid, "user_text": "the sandbox"})
+                results[label].append(await fn(http, sid))
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--ttft-ms", type=float, default=400, help="mock time to first token (and base TTS latency)")
+    parser.add_argument("--token-ms", type=float, default=30, help="mock delay per streamed word")
+    parser.add_argument("--tts-ms-per-char", type=float, default=8, help="mock synthesis time per character")
+    args = parser.parse_args()
+
+    base_url = serve_in_background(
+        latency_s=args.ttft_ms / 1000,
+        token_delay_s=args.token_ms / 1000,
+        tts_s_per_char=args.tts_ms_per_char / 1000,
+    )
+    results = asyncio.run(run(base_url, args.turns))
+
+    print(f"ttft={args.ttft_ms:.0f}ms token={args.token_ms:.0f}ms tts={args.tts_ms_per_char}ms/char")
+    print(f"{'time to first sound':<26} {'p50 ms':>8} {'p99 ms':>8} {'mean ms':>8}")
+    for label, lat in results.items():
+        print(f"{label:<26} {percentile(lat, 50):>8.1f} {percentile(lat, 99):>8.1f} {statistics.mean(lat):>8.1f}")
+    ratio = statistics.mean(results["streaming (/chat/stream)"]) / statistics.mean(results["buffered (/chat + /tts)"])
+    print(f"streaming / buffered: {ratio:.2f}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,109 @@
+"""
+/stt preprocessing benchmark: bytes and seconds removed by silence trimming + mono/16 kHz
+resampling, and what it costs in CPU.
+
+Uses kiosk-like clips: a fixed Microphone.Start window (maxRecordSeconds) with a short
+utterance somewhere inside, room noise around it, at common device rates/channel counts.
+Pass --dir to run over real recordings (*.wav) instead.
+
+Run from backend/:
+    python -m benchmarks.stt_preprocess_bench
+    python -m benchmarks.stt_preprocess_bench --dir ~/recordings --bandwidth-mbps 5
+"""
+
+import argparse
+import glob
+import io
+import os
+import statistics
+import time
+import wave
+
+import numpy as np
+
+from audio_input import STT_MIN_DURATION_S, parse_wav_header
+from audio_preprocess import preprocess_wav
+
+# (window seconds, speech seconds, sample rate, channels)
+CLIPS = [
+    (10, 2.0, 16000, 1), (10, 4.0, 16000, 1), (15, 3.0, 44100, 1), (15, 6.0, 44100, 2),
+    (10, 1.5, 48000, 1), (20, 8.0, 48000, 2), (30, 12.0, 48000, 1), (5, 0.2, 16000, 1),
+]
+
+
+def kiosk_clip(window_s: float, speech_s: float, rate: int, channels: int, seed: int = 0) -> bytes:
+    """Room noise (~-60 dBFS) with a syllable-modulated harmonic 'voice' burst after a short pause."""
+    rng = np.random.default_rng(seed)
+    n = int(window_s * rate)
+    x = rng.normal(0, 0.001, n)
+    start = int(rng.uniform(0.5, 1.5) * rate)
+    t = np.arange(int(speech_s * rate)) / rate
+    f0 = 140 + 30 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / rate
+    voice = sum(np.sin(k * phase) / k for k in range(1, 8))
+    syllables = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) ** 0.5
+    seg = slice(start, start + len(t))
+    x[seg] += 0.2 * voice[: len(x[seg])] * syllables[: len(x[seg])]
+    pcm = (np.clip(x, -1, 1) * 32767).astype("<i2")
+    if channels > 1:
+        pcm = np.repeat(pcm[:, None], channels, axis=1)
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(pcm.tobytes())
+    return buf.getvalue()
+
+
+def load_clips(args):
+    if args.dir:
+        for path in sorted(glob.glob(os.path.join(os.path.expanduser(args.dir), "*.wav"))):
+            with open(path, "rb") as f:
+                yield os.path.basename(path), f.read()
+        return
+    for i, (window, speech, rate, ch) in enumerate(CLIPS):
+        yield f"{window}s win/{speech}s speech @{rate // 1000}k x{ch}", kiosk_clip(window, speech, rate, ch, seed=i)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", help="directory of recorded .wav clips")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--bandwidth-mbps", type=float, default=10.0, help="kiosk uplink, for upload time saved")
+    args = parser.parse_args()
+
+    bytes_per_s = args.bandwidth_mbps * 1_000_000 / 8
+    print(f"{'clip':<34} {'in':>8} {'out':>8} {'sec in':>7} {'sec out':>7} {'cpu ms':>7} {'upload ms saved':>15}")
+    totals = {"in": 0, "out": 0, "sec_in": 0.0, "sec_out": 0.0}
+    cpu = []
+    for label, data in load_clips(args):
+        info = parse_wav_header(data)
+        t0 = time.perf_counter()
+        for _ in range(args.iterations):
+            result = preprocess_wav(data, info)
+        ms = (time.perf_counter() - t0) * 1000 / args.iterations
+        cpu.append(ms)
+        if result is None:
+            print(f"{label:<34} unsupported encoding, sent as-is")
+            continue
+        rejected = result.speech_s < STT_MIN_DURATION_S
+        out = 0 if rejected else len(result.audio)  # rejected before the API call: nothing uploaded
+        seconds_out = 0.0 if rejected else result.seconds_out
+        totals["in"] += len(data)
+        totals["out"] += out
+        totals["sec_in"] += result.seconds_in
+        totals["sec_out"] += seconds_out
+        note = "  (rejected: no speech)" if rejected else ""
+        print(f"{label:<34} {len(data) / 1e6:>6.2f}MB {out / 1e6:>6.2f}MB {result.seconds_in:>7.1f} "
+              f"{seconds_out:>7.1f} {ms:>7.2f} {(len(data) - out) / bytes_per_s * 1000:>15.0f}{note}")
+
+    if totals["in"]:
+        print(f"\ntotal: {totals['in'] / 1e6:.2f}MB -> {totals['out'] / 1e6:.2f}MB "
+              f"({1 - totals['out'] / totals['in']:.0%} fewer bytes), "
+              f"{totals['sec_in']:.1f}s -> {totals['sec_out']:.1f}s of audio transcribed "
+              f"({1 - totals['sec_out'] / totals['sec_in']:.0%} less); median CPU {statistics.median(cpu):.2f} ms/clip")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+STT upload path benchmark: temp-file write-then-reread vs the in-memory upload buffer.
+
+For 5-30 s WAV clips, runs the server-side part of /stt between "multipart parser has the
+upload" and "provider has the bytes":
+  legacy    : Starlette spool (1 MB, rolls to disk) -> read() -> NamedTemporaryFile write
+              -> reopen -> provider reads the file
+  in-memory : spool sized to STT_MAX_UPLOAD_BYTES -> open_upload() (size cap + WAV header)
+              -> provider streams the upload buffer itself
+In both cases the provider side is emulated the way httpx sends a file part (64 KB chunks).
+Reports mean latency, peak traced allocations and files created per upload.
+
+Run from backend/:
+    python -m benchmarks.stt_upload_bench
+    python -m benchmarks.stt_upload_bench --rates 48000 --iterations 200
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+
+from fastapi import UploadFile
+
+from audio_input import STT_MAX_UPLOAD_BYTES, open_upload
+from benchmarks.turn_latency import make_wav
+
+LEGACY_SPOOL_BYTES = 1024 * 1024  # Starlette's default before audio_input raised it
+CHUNK_BYTES = 64 * 1024
+
+
+def _send(f) -> int:
+    # httpx writes a file part into the request body chunk by chunk
+    sent = 0
+    for chunk in iter(lambda: f.read(CHUNK_BYTES), b""):
+        sent += len(chunk)
+    return sent
+
+
+def _spooled(data: bytes, max_size: int) -> UploadFile:
+    # What the multipart parser hands to the endpoint
+    spool = tempfile.SpooledTemporaryFile(max_size=max_size)
+    spool.write(data)
+    spool.seek(0)
+    return UploadFile(spool, filename="clip.wav")
+
+
+async def legacy_path(data: bytes) -> int:
+    upload = _spooled(data, LEGACY_SPOOL_BYTES)
+    files = 1 if upload.file._rolled else 0
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tmp:
+        audio_bytes = await upload.read()
+        tmp.write(audio_bytes)
+        tmp_path = tmp.name
+    try:
+        with open(tmp_path, "rb") as f:
+            _send(f)
+    finally:
+        os.remove(tmp_path)
+    await upload.close()
+    return files + 1
+
+
+async def in_memory_path(data: bytes) -> int:
+    upload = _spooled(data, STT_MAX_UPLOAD_BYTES)
+    files = 1 if upload.file._rolled else 0
+    f, _ = open_upload(upload)
+    _send(f)
+    await upload.close()
+    return files
+
+
+async def measure(fn, data: bytes, iterations: int):
+    files = 0
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        files += await fn(data)
+    mean_ms = (time.perf_counter() - t0) * 1000 / iterations
+
+    tracemalloc.start()
+    await fn(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return mean_ms, peak, files / iterations
+
+
+async def main_async(args):
+    print(f"{'clip':>10} {'size':>9} | {'path':<10} {'mean ms':>8} {'peak alloc':>11} {'files/upload':>12}")
+    for rate in args.rates:
+        for seconds in args.seconds:
+            data = make_wav(seconds, rate)
+            for label, fn in (("legacy", legacy_path), ("in-memory", in_memory_path)):
+                mean_ms, peak, files = await measure(fn, data, args.iterations)
+                print(f"{seconds:>4}s@{rate // 1000:>2}k {len(data) / 1e6:>7.2f}MB | {label:<10} "
+                      f"{mean_ms:>8.3f} {peak / 1e6:>9.2f}MB {files:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=int, nargs="+", default=[5, 10, 20, 30])
+    parser.add_argument("--rates", type=int, nargs="+", default=[16000, 48000])
+    parser.add_argument("--iterations", type=int, default=100)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
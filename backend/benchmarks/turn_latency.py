@@ -0,0 +1,103 @@
+"""
+End-to-end voice turn benchmark: three-call chain vs single-shot /turn.
+
+Measures the time from "visitor stopped speaking" (WAV ready on the kiosk) to
+"reply audio downloaded", for the current Unity chain (/stt -> /chat -> /tts)
+and for /turn + /audio/{id}. The kiosk link is simulated by adding a fixed
+round-trip time per request plus transfer time at the given bandwidth.
+
+Run from backend/:
+    python -m benchmarks.turn_latency
+    python -m benchmarks.turn_latency --rtt-ms 80 --bandwidth-mbps 10 --turns 20
+"""
+
+import argparse
+import asyncio
+import io
+import statistics
+import time
+import wave
+
+import httpx
+
+from benchmarks.provider_load import percentile, serve_in_background
+
+
+def make_wav(seconds: float, sample_rate: int = 16000) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(b"\x00\x00" * int(seconds * sample_rate))
+    return buf.getvalue()
+
+
+class Link:
+    """Simulated kiosk <-> server network: RTT per request + bytes / bandwidth."""
+
+    def __init__(self, rtt_ms: float, bandwidth_mbps: float):
+        self.rtt_s = rtt_ms / 1000
+        self.bytes_per_s = bandwidth_mbps * 1_000_000 / 8
+
+    async def send(self, http: httpx.AsyncClient, method: str, url: str, upload_bytes: int = 0, **kwargs):
+        resp = await http.request(method, url, **kwargs)
+        resp.raise_for_status()
+        await asyncio.sleep(self.rtt_s + (upload_bytes + len(resp.content)) / self.bytes_per_s)
+        return resp
+
+
+async def chained_turn(http, link: Link, sid: str, wav: bytes) -> float:
+    t0 = time.perf_counter()
+    stt = await link.send(http, "POST", "/stt", upload_bytes=len(wav),
+                          data={"session_id": sid, "language": "en"},
+                          files={"audio_file": ("clip.wav", wav, "audio/wav")})
+    chat = await link.send(http, "POST", "/chat", json={"session_id": sid, "user_text": stt.json()["transcript"]})
+    await link.send(http, "POST", "/tts", json={"text": chat.json()["reply_text"], "format": "mp3"})
+    return (time.perf_counter() - t0) * 1000
+
+
+async def single_shot_turn(http, link: Link, sid: str, wav: bytes) -> float:
+    t0 = time.perf_counter()
+    turn = await link.send(http, "POST", "/turn", upload_bytes=len(wav),
+                           data={"session_id": sid, "language": "en", "format": "mp3"},
+                           files={"audio_file": ("clip.wav", wav, "audio/wav")})
+    await link.send(http, "GET", turn.json()["audio_url"])
+    return (time.perf_counter() - t0) * 1000
+
+
+async def run(base_url: str, args) -> dict:
+    link = Link(args.rtt_ms, args.bandwidth_mbps)
+    wav = make_wav(args.clip_seconds)
+    results = {"chain (/stt,/chat,/tts)": [], "single-shot (/turn)": []}
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as http:
+        for i in range(args.turns):
+            for label, fn in (("chain (/stt,/chat,/tts)", chained_turn), ("single-shot (/turn)", single_shot_turn)):
+                sid = f"turn-bench-{label[:5]}-{i}"
+                await http.get("/start", params={"session_id": sid})
+                results[label].append(await fn(http, link, sid, wav))
+    return results
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=300, help="mock provider latency per call")
+    parser.add_argument("--rtt-ms", type=float, default=40, help="simulated kiosk round-trip time")
+    parser.add_argument("--bandwidth-mbps", type=float, default=20, help="simulated kiosk link bandwidth")
+    parser.add_argument("--clip-seconds", type=float, default=5, help="length of the uploaded WAV")
+    args = parser.parse_args()
+
+    base_url = serve_in_background(latency_s=args.latency_ms / 1000)
+    results = asyncio.run(run(base_url, args))
+
+    print(f"mock_latency={args.latency_ms:.0f}ms rtt={args.rtt_ms:.0f}ms bandwidth={args.bandwidth_mbps}Mbps clip={args.clip_seconds}s")
+    print(f"{'path':<24} {'p50 ms':>8} {'p99 ms':>8} {'mean ms':>8}")
+    for label, lat in results.items():
+        print(f"{label:<24} {percentile(lat, 50):>8.1f} {percentile(lat, 99):>8.1f} {statistics.mean(lat):>8.1f}")
+    saved = statistics.mean(results["chain (/stt,/chat,/tts)"]) - statistics.mean(results["single-shot (/turn)"])
+    print(f"mean end-to-end saving: {saved:.1f} ms per turn")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,195 @@
+"""
+Multi-process serving: /chat throughput vs worker count, and a graceful-drain check.
+
+Starts serve.py as a real subprocess (PROVIDER=fake, so no network; shared SQLite sessions, the
+question bank snapshot etc. in a temp dir) with 1, 2, 4 ... workers and replays generated
+conversations (benchmarks/conversations.py) over HTTP from --sessions concurrent clients.
+Reported per worker count: chat turns/s, p50/p95 /chat latency and the speedup over 1 worker.
+The app's own CPU work per turn (detection, prompts, session (de)serialisation, logging) is
+what the extra processes parallelise; the fake LLM latency only adds waiting.
+
+Drain check: with a slow fake LLM, SIGTERM the supervisor while /chat turns are in flight.
+Every in-flight turn should still complete, and after a restart the sessions are still there.
+
+Run from backend/:
+    python -m benchmarks.worker_scaling_bench
+    python -m benchmarks.worker_scaling_bench --workers 1,2,4,8 --conversations 600 --llm-latency const:50
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+from benchmarks.conversations import load_generator
+from benchmarks.provider_load import percentile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class ServerProcess:
+    """serve.py in a subprocess, every file it writes kept in workdir."""
+
+    def __init__(self, workdir: str, workers: int, llm_latency: str):
+        self.workdir = workdir
+        self.workers = workers
+        self.port = free_port()
+        self.env = {
+            **os.environ,
+            "PROVIDER": "fake", "FAKE_LLM_LATENCY": llm_latency, "OPENAI_API_KEY": "benchmark-not-used",
+            "SESSION_DB_PATH": os.path.join(workdir, "sessions.db"),
+            "FEEDBACK_LOG_PATH": os.path.join(workdir, "feedback_log.jsonl"),
+            "ANALYTICS_DB_PATH": os.path.join(workdir, "analytics.db"),
+            "TTS_CACHE_DIR": os.path.join(workdir, "tts_cache"),
+            "QUESTION_BANK_SNAPSHOT": os.path.join(workdir, "question_bank.snapshot"),
+            "AUDIO_CLIP_DIR": os.path.join(workdir, "audio_clips"),
+            "LIDAR_EVENTS_PATH": os.path.join(workdir, "lidar_events.jsonl"),
+            "ADMISSION_START_RATE": "0",  # sessions start far faster than real kiosks would
+        }
+        self.proc = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self, timeout_s: float = 60):
+        log = open(os.path.join(self.workdir, "server.log"), "ab")
+        self.proc = subprocess.Popen(
+            [sys.executable, "serve.py", "--workers", str(self.workers), "--port", str(self.port),
+             "--host", "127.0.0.1", "--log-level", "warning"],
+            cwd=BACKEND_DIR, env=self.env, stdout=log, stderr=subprocess.STDOUT)
+        log.close()
+        deadline = time.time() + timeout_s
+        ready = 0
+        while time.time() < deadline:
+            # Ready once several requests in a row succeed (workers come up one by one)
+            try:
+                httpx.get(self.url + "/", timeout=1).raise_for_status()
+                ready += 1
+                if ready >= 3 * self.workers:
+                    return
+            except httpx.HTTPError:
+                ready = 0
+                time.sleep(0.2)
+        raise RuntimeError(f"serve.py --workers {self.workers} did not come up, see {self.workdir}/server.log")
+
+    def stop(self, timeout_s: float = 60) -> float:
+        t0 = time.perf_counter()
+        self.proc.send_signal(signal.SIGTERM)
+        self.proc.wait(timeout_s)
+        return time.perf_counter() - t0
+
+
+async def throughput(url: str, conversations, sessions: int) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    limit = asyncio.Semaphore(sessions)
+
+    async def replay(http: httpx.AsyncClient, i: int, conv):
+        nonlocal errors
+        async with limit:
+            sid = f"scale-{i}"
+            await http.get("/start", params={"session_id": sid})
+            for text in conv.turns:
+                t0 = time.perf_counter()
+                r = await http.post("/chat", json={"session_id": sid, "user_text": text})
+                if r.status_code != 200:
+                    errors += 1
+                    continue
+                latencies.append((time.perf_counter() - t0) * 1000)
+
+    limits = httpx.Limits(max_connections=sessions, max_keepalive_connections=sessions)
+    async with httpx.AsyncClient(base_url=url, timeout=120, limits=limits) as http:
+        start = time.perf_counter()
+        await asyncio.gather(*[replay(http, i, c) for i, c in enumerate(conversations)])
+        elapsed = time.perf_counter() - start
+    return {"turns_per_s": len(latencies) / elapsed, "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95), "errors": errors}
+
+
+async def drain_check(server: ServerProcess, inflight: int, delay_s: float):
+    sids = [f"drain-{i}" for i in range(inflight)]
+    async with httpx.AsyncClient(base_url=server.url, timeout=120) as http:
+        for sid in sids:
+            await http.get("/start", params={"session_id": sid})
+        turns = [asyncio.ensure_future(http.post("/chat", json={"session_id": sid, "user_text": "Sandbox"}))
+                 for sid in sids]
+        await asyncio.sleep(delay_s)
+        stop = asyncio.ensure_future(asyncio.to_thread(server.stop))
+        results = await asyncio.gather(*turns, return_exceptions=True)
+        drain_s = await stop
+    ok = sum(1 for r in results if isinstance(r, httpx.Response) and r.status_code == 200)
+    print(f"drain: SIGTERM with {inflight} /chat turns in flight -> {ok}/{inflight} completed with 200, "
+          f"server exited after {drain_s:.1f} s")
+
+    server.start()
+    async with httpx.AsyncClient(base_url=server.url, timeout=120) as http:
+        stats = (await http.get("/stats")).json()
+        r = await http.post("/chat", json={"session_id": sids[0], "user_text": "Playful"})
+    server.stop()
+    print(f"restart: {stats['sessions']['sessions']} sessions in the store, "
+          f"next turn of {sids[0]}: {r.status_code} {r.json().get('reply_text', '')[:60]!r}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--sessions", type=int, default=64, help="concurrent clients")
+    parser.add_argument("--conversations", type=int, default=300)
+    parser.add_argument("--llm-latency", default="const:20", help="FakeProvider latency spec")
+    parser.add_argument("--drain-latency", default="const:2000", help="fake LLM latency during the drain check")
+    parser.add_argument("--drain-inflight", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    conversations = load_generator(os.path.join(BACKEND_DIR, "data/exhibit_questions.json"), args.seed) \
+        .conversations(args.conversations)
+    counts = [int(n) for n in args.workers.split(",")]
+    print(f"{args.conversations} conversations, {args.sessions} concurrent clients, fake LLM {args.llm_latency} ms, "
+          f"{os.cpu_count()} CPU(s) (client and server share them)")
+    print(f"{'workers':>7} {'turns/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'errors':>6} {'speedup':>8}")
+    base = None
+    for workers in counts:
+        workdir = tempfile.mkdtemp(prefix="worker_scaling_")
+        server = ServerProcess(workdir, workers, args.llm_latency)
+        try:
+            server.start()
+            result = asyncio.run(throughput(server.url, conversations, args.sessions))
+        finally:
+            if server.proc and server.proc.poll() is None:
+                server.stop()
+            shutil.rmtree(workdir, ignore_errors=True)
+        base = base or result["turns_per_s"]
+        print(f"{workers:>7} {result['turns_per_s']:>9.1f} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} "
+              f"{result['errors']:>6} {result['turns_per_s'] / base:>7.2f}x")
+
+    workdir = tempfile.mkdtemp(prefix="worker_drain_")
+    server = ServerProcess(workdir, max(counts), args.drain_latency)
+    try:
+        server.start()
+        asyncio.run(drain_check(server, args.drain_inflight, delay_s=0.3))
+    finally:
+        if server.proc and server.proc.poll() is None:
+            server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,108 @@
+# choice_replies.py
+# Deterministic fast path for choice questions: when the visitor simply picks one of the
+# declared choices, the acknowledgement + next question is rendered from a template and
+# chat_endpoint skips the LLM entirely.
+
+import os
+import re
+import zlib
+from typing import Any, Dict, List, Mapping, Optional
+
+CHOICE_FAST_PATH = os.getenv("CHOICE_FAST_PATH", "1").lower() in ("1", "true", "yes")
+# Longer answers usually carry more than the choice ("boring, but the screen was cool")
+CHOICE_MAX_WORDS = int(os.getenv("CHOICE_MAX_WORDS", "6"))
+
+# {choice}/{Choice}: the declared choice, {exhibit}: display name. An exhibit can override these
+# with an "ack_templates" list in exhibit_questions.json.
+DEFAULT_ACK_TEMPLATES = [
+    "{Choice}, got it.",
+    "Thanks, {choice} it is.",
+    "{Choice}, noted. Thank you!",
+]
+
+_NON_WORD = re.compile(r"[^\w\s']")
+_QUESTION_WORDS = {"what", "how", "why", "who", "where", "when", "which", "can", "could", "does", "is", "are"}
+_NEGATIONS = {"not", "no", "never", "neither", "nor", "isn't", "wasn't", "didn't", "don't", "doesn't"}
+
+# Process-wide so the numbers survive a rebuild of the engine on question-bank reload
+CHOICE_COUNTERS: Dict[str, int] = {
+    "choice_answers": 0, "matched": 0, "fast_path": 0,
+    "skipped_question": 0, "skipped_ambiguous": 0, "skipped_no_match": 0,
+}
+
+
+def normalize_choice_text(text: str) -> str:
+    return " ".join(_NON_WORD.sub(" ", (text or "").lower()).split())
+
+
+class ChoiceReplyEngine:
+    """
+    Built from exhibit_questions.json. match() maps an answer to exactly one declared choice
+    (whole-word, no negation, no question, at most CHOICE_MAX_WORDS words); reply() renders
+    the acknowledgement for it followed by the next question. The template is picked by a
+    hash of (question, choice), so the same answer always gets the same, TTS-cacheable text.
+    """
+
+    def __init__(self, exhibit_questions: Mapping[str, Mapping]):
+        self.counters = CHOICE_COUNTERS
+        self._choices: Dict[str, List[tuple]] = {}  # qid -> [(choice, compiled pattern)]
+        self._templates: Dict[str, List[str]] = {}  # qid -> ack templates of its exhibit
+        self._display: Dict[str, str] = {}  # qid -> exhibit display name
+        self._next_text: Dict[str, Optional[str]] = {}  # qid -> next question in pack order
+        for name, pack in exhibit_questions.items():
+            questions = pack.get("questions", [])
+            templates = pack.get("ack_templates") or DEFAULT_ACK_TEMPLATES
+            for i, q in enumerate(questions):
+                if q.get("answer_type") != "choice" or not q.get("choices"):
+                    continue
+                self._choices[q["id"]] = [
+                    (c.lower(), re.compile(rf"\b{re.escape(normalize_choice_text(c))}\b")) for c in q["choices"]
+                ]
+                self._templates[q["id"]] = list(templates)
+                self._display[q["id"]] = pack.get("display_name", name)
+                self._next_text[q["id"]] = questions[i + 1]["text"] if i + 1 < len(questions) else None
+
+    def match(self, qid: Optional[str], text: str) -> Optional[str]:
+        """The declared choice this answer picks, or None when it is not a plain choice answer."""
+        choices = self._choices.get(qid or "")
+        if not choices:
+            return None
+        self.counters["choice_answers"] += 1
+        t = normalize_choice_text(text)
+        words = t.split()
+        if "?" in text or (words and words[0] in _QUESTION_WORDS):
+            self.counters["skipped_question"] += 1
+            return None
+        hits = [choice for choice, pattern in choices if pattern.search(t)]
+        if not hits:
+            self.counters["skipped_no_match"] += 1
+            return None
+        if len(hits) > 1 or len(words) > CHOICE_MAX_WORDS or _NEGATIONS.intersection(words):
+            self.counters["skipped_ambiguous"] += 1
+            return None
+        self.counters["matched"] += 1
+        return hits[0]
+
+    def acknowledgement(self, qid: str, choice: str) -> str:
+        templates = self._templates[qid]
+        template = templates[zlib.crc32(f"{qid}\x1f{choice}".encode("utf-8")) % len(templates)]
+        return template.format(choice=choice, Choice=choice[:1].upper() + choice[1:], exhibit=self._display[qid])
+
+    def reply(self, qid: str, choice: str, next_question: str) -> str:
+        self.counters["fast_path"] += 1
+        return f"{self.acknowledgement(qid, choice)} {next_question}"
+
+    def static_texts(self) -> List[str]:
+        """Replies for the usual order (choice question, then the next one in the pack), for TTS warm-up."""
+        texts = []
+        for qid, choices in self._choices.items():
+            if self._next_text[qid]:
+                texts += [f"{self.acknowledgement(qid, choice)} {self._next_text[qid]}" for choice, _ in choices]
+        return texts
+
+    # ---------- Metrics ----------
+    def stats(self) -> Dict[str, Any]:
+        c = dict(self.counters)
+        c["enabled"] = CHOICE_FAST_PATH
+        c["trigger_rate"] = round(c["fast_path"] / c["choice_answers"], 4) if c["choice_answers"] else 0.0
+        return c
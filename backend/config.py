@@ -1,5 +1,14 @@
 # config.py
 
+# Official exhibit names (the question bank may add display names and aliases)
+EXHIBITS = [
+    "D4A","Asan.AI","Swarming bacteria","Chatbot","Circuit Flowfields",
+    "Complex calculations","Complexity Explorables","Data traces","Dresden mapping",
+    "Faces","Film Forms","Hyperuniformity","Magic Mirror","Mathematical models",
+    "Physarum","Retro Reboot","Sandbox","Seamless pattern","Server cabinet",
+    "Server kit","Time travel","Traces","VR experience"
+]
+
 # Maps simple user words to the official JSON keys
 KEYWORD_MAPPING = {
     # 1. D4A
@@ -0,0 +1,70 @@
+# conftest.py
+# Smoke-test setup: the app runs in-process over ASGI against providers.FakeProvider, with every
+# file it writes (feedback log, analytics db, TTS cache, audio clips) in a temporary directory.
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+TMP = tempfile.mkdtemp(prefix="app1-tests-")
+
+# main reads its configuration at import time
+os.environ.update({
+    "OPENAI_API_KEY": "test-not-used",
+    "PROVIDER": "fake",
+    "EXHIBIT_QUESTIONS_PATH": os.path.join(HERE, "data", "exhibit_questions.json"),
+    "FEEDBACK_LOG_PATH": os.path.join(TMP, "feedback_log.jsonl"),
+    "ANALYTICS_DB_PATH": os.path.join(TMP, "analytics.db"),
+    "ANALYTICS_INGEST_INTERVAL_S": "0",
+    "TTS_CACHE_DIR": os.path.join(TMP, "tts_cache"),
+    "AUDIO_CLIP_DIR": "",
+    "SESSION_BACKEND": "memory",
+    "QUESTION_BANK_POLL_S": "0",
+    "QUESTION_BANK_SNAPSHOT": "",
+    "LIDAR_EVENTS_PATH": "",
+    "ADMISSION_START_RATE": "0",
+})
+sys.path.insert(0, HERE)
+
+import httpx  # noqa: E402
+
+import main  # noqa: E402
+import providers  # noqa: E402
+from providers import FakeProvider  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def fake_provider():
+    return FakeProvider(llm_latency="const:0", stt_latency="const:0", tts_latency="const:0", token_ms=0)
+
+
+@pytest.fixture
+def question_bank_file(tmp_path, monkeypatch):
+    """A copy of the question bank the app loads from, to edit for hot-reload tests; restored afterwards."""
+    path = tmp_path / "exhibit_questions.json"
+    path.write_bytes(open(main.QUESTIONS_PATH, "rb").read())
+    monkeypatch.setattr(main, "QUESTIONS_PATH", str(path))
+    main.load_exhibit_questions()
+    yield path
+    monkeypatch.undo()
+    main.load_exhibit_questions()
+
+
+@pytest.fixture
+async def client(fake_provider):
+    """The app with startup/shutdown run around each test (asyncio primitives bind to the test's loop)."""
+    providers.set_provider(fake_provider)
+    await main.startup_event()
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as c:
+            yield c
+    finally:
+        await main.shutdown_event()
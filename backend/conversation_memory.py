@@ -0,0 +1,140 @@
+# conversation_memory.py
+# Token-budgeted conversation history for the interview LLM call: recent turns verbatim, older
+# turns folded into a compact local summary, so per-turn input cost stays flat in long sessions.
+
+import os
+import re
+from collections import deque
+from enum import IntEnum
+from operator import itemgetter
+from typing import Any, Deque, Dict, Iterable, List, Tuple, Union
+
+from prompts import estimate_tokens
+
+# ============ CONFIGURATION ============
+# History tokens sent per LLM call (the static prompt prefix and turn delta come on top)
+MEMORY_TOKEN_BUDGET = int(os.getenv("MEMORY_TOKEN_BUDGET", "500"))
+MEMORY_SUMMARY_TOKENS = int(os.getenv("MEMORY_SUMMARY_TOKENS", "120"))
+# Always kept verbatim, whatever the budget says
+MEMORY_MIN_RECENT = int(os.getenv("MEMORY_MIN_RECENT", "4"))
+# Once over budget, compact down to this share of it. Between compactions the history is
+# append-only, which keeps it inside the provider's cached prompt prefix.
+MEMORY_LOW_WATERMARK = 0.6
+# Role/formatting tokens the provider adds per message
+MESSAGE_OVERHEAD_TOKENS = 4
+SUMMARY_LINE_CHARS = 120
+
+# Process-wide, reported under "memory" in /stats
+MEMORY_COUNTERS: Dict[str, int] = {"calls": 0, "history_tokens": 0, "max_history_tokens": 0, "summarized_messages": 0}
+
+_QUESTION = re.compile(r"[^.!?]*\?")
+
+
+class Role(IntEnum):
+    """Message roles; one byte in the session encoding, the API name via ROLE_NAMES."""
+    SYSTEM = 0
+    USER = 1
+    ASSISTANT = 2
+
+
+ROLE_NAMES = tuple(r.name.lower() for r in Role)  # Role -> "system" / "user" / "assistant"
+ROLES_BY_NAME = {name: Role(i) for i, name in enumerate(ROLE_NAMES)}
+
+
+def _clip(text: str, limit: int = SUMMARY_LINE_CHARS) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 3].rstrip() + "..."
+
+
+class ConversationMemory:
+    """
+    Recent messages live in a deque with their token counts, so appends and evictions are
+    O(1). When the total passes the budget, the oldest messages are folded into the summary,
+    except that the last assistant message (it holds the question being answered) and the
+    MEMORY_MIN_RECENT newest messages are never evicted.
+    """
+
+    __slots__ = ("budget", "summary_budget", "turns", "summary", "tokens", "summary_tokens")
+
+    def __init__(self, budget: int = MEMORY_TOKEN_BUDGET, summary_budget: int = MEMORY_SUMMARY_TOKENS):
+        self.budget = budget
+        self.summary_budget = summary_budget
+        self.turns: Deque[Tuple[Role, str, int]] = deque()  # (role, content, tokens)
+        self.summary: Deque[Tuple[str, int]] = deque()  # (line, tokens)
+        self.tokens = 0
+        self.summary_tokens = 0
+
+    def __len__(self) -> int:
+        return len(self.turns)
+
+    def append(self, role: Union[Role, str], content: str):
+        if isinstance(role, str):
+            role = ROLES_BY_NAME[role]
+        tokens = estimate_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+        self.turns.append((role, content, tokens))
+        self.tokens += tokens
+        if self.tokens + self.summary_tokens > self.budget:
+            self._compact()
+
+    def _evictable(self) -> int:
+        keep_from = max(0, len(self.turns) - MEMORY_MIN_RECENT)
+        for i in range(len(self.turns) - 1, -1, -1):
+            if self.turns[i][0] is Role.ASSISTANT:
+                return min(keep_from, i)
+        return keep_from
+
+    def _compact(self):
+        target = int(self.budget * MEMORY_LOW_WATERMARK)
+        evictable = self._evictable()
+        while evictable and self.tokens + self.summary_tokens > target:
+            role, content, tokens = self.turns.popleft()
+            self.tokens -= tokens
+            evictable -= 1
+            self._summarize(role, content)
+            MEMORY_COUNTERS["summarized_messages"] += 1
+
+    def _summarize(self, role: Role, content: str):
+        if role is Role.USER:
+            line = f"Visitor said: {_clip(content)}"
+        elif role is Role.ASSISTANT:
+            # What the guide asked is what matters later; the small talk around it is not
+            questions = _QUESTION.findall(content)
+            if not questions:
+                return
+            line = f"Guide asked: {_clip(questions[-1].strip())}"
+        else:
+            line = _clip(content)
+        tokens = estimate_tokens(line) + 1
+        self.summary.append((line, tokens))
+        self.summary_tokens += tokens
+        while self.summary_tokens > self.summary_budget and len(self.summary) > 1:
+            self.summary_tokens -= self.summary.popleft()[1]
+
+    def history(self) -> List[Dict[str, str]]:
+        """Messages for the next LLM call (summary first, then recent turns); counted in MEMORY_COUNTERS."""
+        messages = []
+        if self.summary:
+            messages.append({"role": "system", "content": "Earlier in this conversation:\n" + "\n".join(l for l, _ in self.summary)})
+        messages += [{"role": ROLE_NAMES[role], "content": content} for role, content, _ in self.turns]
+        tokens = self.tokens + self.summary_tokens
+        MEMORY_COUNTERS["calls"] += 1
+        MEMORY_COUNTERS["history_tokens"] += tokens
+        MEMORY_COUNTERS["max_history_tokens"] = max(MEMORY_COUNTERS["max_history_tokens"], tokens)
+        return messages
+
+    # ---------- Session store ----------
+    @classmethod
+    def restore(cls, turns: Iterable[Tuple[Role, str, int]], summary: Iterable[Tuple[str, int]]) -> "ConversationMemory":
+        memory = cls()
+        memory.turns.extend(turns)
+        memory.summary.extend(summary)
+        memory.tokens = sum(map(itemgetter(2), memory.turns))
+        memory.summary_tokens = sum(map(itemgetter(1), memory.summary))
+        return memory
+
+
+def memory_stats() -> Dict[str, Any]:
+    c = dict(MEMORY_COUNTERS)
+    c["avg_history_tokens"] = round(c["history_tokens"] / c["calls"], 1) if c["calls"] else 0.0
+    c["budget"] = MEMORY_TOKEN_BUDGET
+    return c
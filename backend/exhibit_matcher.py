@@ -0,0 +1,105 @@
+# exhibit_matcher.py
+# One-pass exhibit detection: every exhibit name, display name and keyword is indexed as a
+# tuple of words at load time, and an utterance is matched with dict lookups over its tokens.
+
+import re
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+# Official names outweigh loose keywords ("faces" the exhibit vs "watch" the verb)
+NAME_WEIGHT = 3.0
+KEYWORD_WEIGHT = 1.0
+# Multi-word keywords ("machine learning", "try on") are far less ambiguous than single words
+PHRASE_BONUS = 0.5
+
+
+# Words may carry inner dots/hyphens/apostrophes: "asan.ai", "t-shirt", "didn't"
+_TOKEN = re.compile(r"\w+(?:[.'\-]\w+)*")
+
+
+class ExhibitMatcher:
+    """
+    Compiled multi-pattern matcher over word tokens.
+
+    Every term is indexed as a tuple of words at build time, so matching is one left-to-right
+    pass over the utterance with dict lookups. Terms only match whole words ("ai" does not
+    match "again" or "chair"), a plain plural is accepted ("circuits", "boxes"), and at each
+    position the longest phrase wins ("data traces" over "traces", "server kit" over "server"),
+    so matches never overlap.
+    """
+
+    def __init__(self, terms: Dict[str, Tuple[str, float]]):
+        # word tuple -> (exhibit, weight)
+        self._phrases: Dict[Tuple[str, ...], Tuple[str, float]] = {}
+        # first word -> phrase lengths starting with it, longest first
+        self._lengths: Dict[str, List[int]] = {}
+        for term, hit in terms.items():
+            words = tuple(_TOKEN.findall(term))
+            if not words:
+                continue
+            self._phrases[words] = hit
+            lengths = self._lengths.setdefault(words[0], [])
+            if len(words) not in lengths:
+                lengths.append(len(words))
+                lengths.sort(reverse=True)
+
+    def _singular(self, word: str) -> str:
+        if word in self._lengths or not word.endswith("s"):
+            return word
+        for stem in (word[:-1], word[:-2] if word.endswith("es") else None):
+            if stem and stem in self._lengths:
+                return stem
+        return word
+
+    @classmethod
+    def build(
+        cls,
+        exhibit_questions: Mapping[str, Mapping],
+        exhibit_names: Iterable[str],
+        keyword_mapping: Mapping[str, str],
+    ) -> "ExhibitMatcher":
+        terms: Dict[str, Tuple[str, float]] = {}
+
+        def add(term: str, exhibit: str, weight: float):
+            term = " ".join(term.lower().split())
+            if not term:
+                return
+            if len(term.split()) > 1:
+                weight += PHRASE_BONUS
+            # Keep the strongest mapping if a term is listed twice
+            if term not in terms or terms[term][1] < weight:
+                terms[term] = (exhibit, weight)
+
+        for keyword, exhibit in keyword_mapping.items():
+            add(keyword, exhibit, KEYWORD_WEIGHT)
+        for name in exhibit_names:
+            add(name, name, NAME_WEIGHT)
+        for name, data in exhibit_questions.items():
+            add(name, name, NAME_WEIGHT)
+            if data.get("display_name"):
+                add(data["display_name"], name, NAME_WEIGHT)
+        return cls(terms)
+
+    def candidates(self, text: str) -> List[Tuple[str, float]]:
+        """All exhibits mentioned in the text with their summed scores, best first."""
+        if not text or not self._phrases:
+            return []
+        words = [self._singular(w) for w in _TOKEN.findall(text.lower())]
+        scores: Dict[str, float] = {}
+        first_seen: Dict[str, int] = {}
+        i, n = 0, len(words)
+        while i < n:
+            step = 1
+            for length in self._lengths.get(words[i], ()):
+                hit = self._phrases.get(tuple(words[i:i + length])) if length > 1 else self._phrases.get((words[i],))
+                if hit:
+                    exhibit, weight = hit
+                    scores[exhibit] = scores.get(exhibit, 0.0) + weight
+                    first_seen.setdefault(exhibit, i)
+                    step = length
+                    break
+            i += step
+        return sorted(scores.items(), key=lambda kv: (-kv[1], first_seen[kv[0]]))
+
+    def best(self, text: str) -> Optional[str]:
+        found = self.candidates(text)
+        return found[0][0] if found else None
@@ -0,0 +1,168 @@
+# feedback_log.py
+# Batched background writer for data/feedback_log.jsonl: the request path only enqueues,
+# a dedicated thread batches, appends, rotates and fsyncs on shutdown.
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+try:
+    import fcntl  # POSIX: serialise appends/rotation across uvicorn workers
+except ImportError:  # Windows dev machines: single process, no lock needed
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# ============ CONFIGURATION ============
+FEEDBACK_BATCH_SIZE = int(os.getenv("FEEDBACK_BATCH_SIZE", "256"))
+FEEDBACK_FLUSH_INTERVAL_S = float(os.getenv("FEEDBACK_FLUSH_INTERVAL_S", "1.0"))
+FEEDBACK_QUEUE_MAX = int(os.getenv("FEEDBACK_QUEUE_MAX", "100000"))
+# Rotation: 0 disables the corresponding trigger
+FEEDBACK_ROTATE_BYTES = int(os.getenv("FEEDBACK_ROTATE_BYTES", str(50 * 1024 * 1024)))
+FEEDBACK_ROTATE_INTERVAL_S = float(os.getenv("FEEDBACK_ROTATE_INTERVAL_S", "86400"))
+
+
+class FeedbackLogWriter:
+    """
+    enqueue() is O(1) and never touches the filesystem. The writer thread flushes when
+    batch_size events are waiting or flush_interval_s has passed, writing each batch with
+    a single append. stop() drains the queue and fsyncs.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        batch_size: int = FEEDBACK_BATCH_SIZE,
+        flush_interval_s: float = FEEDBACK_FLUSH_INTERVAL_S,
+        rotate_bytes: int = FEEDBACK_ROTATE_BYTES,
+        rotate_interval_s: float = FEEDBACK_ROTATE_INTERVAL_S,
+        queue_max: int = FEEDBACK_QUEUE_MAX,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.rotate_bytes = rotate_bytes
+        self.rotate_interval_s = rotate_interval_s
+        self._queue: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=queue_max)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._fd: Optional[int] = None
+        self._lock_fd: Optional[int] = None
+        self._opened_at = 0.0
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+
+    # ---------- Producer side ----------
+    def start(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="feedback-log-writer", daemon=True)
+                self._thread.start()
+
+    def enqueue(self, event: Dict[str, Any]):
+        if self._thread is None:
+            self.start()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+            logger.error("Feedback log queue full, dropping event")
+
+    def stop(self, timeout: float = 10.0):
+        """Flush everything still queued, fsync and close."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    # ---------- Writer thread ----------
+    def _run(self):
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + self.flush_interval_s
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                if item is None:
+                    stopping = True
+                else:
+                    batch.append(item)
+            except queue.Empty:
+                pass
+            if batch and (stopping or len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._write(batch)
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval_s
+        self._close(fsync=True)
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def _open(self):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if fcntl and self._lock_fd is None:
+            self._lock_fd = os.open(self.path + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._opened_at = time.time()
+
+    def _close(self, fsync: bool = False):
+        if self._fd is not None:
+            try:
+                if fsync:
+                    os.fsync(self._fd)
+            finally:
+                os.close(self._fd)
+                self._fd = None
+
+    def _reopen_if_rotated(self):
+        # Another worker may have rotated the file under us
+        try:
+            if self._fd is not None and os.fstat(self._fd).st_ino == os.stat(self.path).st_ino:
+                return
+        except FileNotFoundError:
+            pass
+        self._close()
+        self._open()
+
+    def _maybe_rotate(self):
+        size = os.fstat(self._fd).st_size
+        too_big = self.rotate_bytes and size >= self.rotate_bytes
+        too_old = self.rotate_interval_s and size and time.time() - self._opened_at >= self.rotate_interval_s
+        if not (too_big or too_old):
+            return
+        self._close(fsync=True)
+        os.replace(self.path, f"{self.path}.{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}")
+        self.rotations += 1
+        self._open()
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        data = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in batch).encode("utf-8")
+        try:
+            if self._fd is None:
+                self._open()
+            if fcntl:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+            try:
+                self._reopen_if_rotated()
+                self._maybe_rotate()
+                os.write(self._fd, data)  # one O_APPEND write per batch: lines never interleave
+            finally:
+                if fcntl:
+                    fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+            self.written += len(batch)
+        except Exception as e:
+            self.dropped += len(batch)
+            logger.error(f"Log failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"queued": self._queue.qsize(), "written": self.written,
+                "dropped": self.dropped, "rotations": self.rotations}
@@ -0,0 +1,227 @@
+# intent.py
+# Local intent engine: decides "which exhibit is this about?" and "SWITCH or STAY?"
+# in-process, so chat_endpoint only pays for an LLM round trip when it is unsure.
+
+import difflib
+import math
+import os
+import re
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+# Below this confidence the caller falls back to the LLM classifier / validator
+INTENT_CONFIDENCE_THRESHOLD = float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", "0.6"))
+
+_WORD = re.compile(r"[a-z0-9]+(?:[.'\-][a-z0-9]+)*")
+
+STOPWORDS = {
+    "a", "about", "all", "also", "am", "an", "and", "any", "are", "as", "at", "be", "been", "but",
+    "by", "can", "could", "did", "do", "does", "don't", "for", "from", "had", "has", "have", "he",
+    "her", "here", "how", "i", "i'd", "i'm", "if", "in", "into", "is", "it", "it's", "its", "just",
+    "let", "let's", "like", "maybe", "me", "more", "my", "no", "not", "now", "of", "ok", "okay",
+    "on", "one", "or", "please", "really", "review", "say", "see", "she", "so", "some", "sure",
+    "talk", "tell", "that", "the", "them", "then", "there", "these", "they", "thing", "think",
+    "this", "those", "to", "too", "us", "very", "want", "was", "we", "well", "were", "what",
+    "when", "where", "which", "who", "why", "will", "with", "would", "yeah", "yes", "you", "your",
+    "exhibit", "exhibition", "display", "installation", "station",
+}
+
+# "let's do the sandbox instead" -> the visitor wants to move on
+SWITCH_CUES = (
+    "switch", "instead", "change to", "move on", "go to", "talk about", "what about", "how about",
+    "let's do", "lets do", "review the", "rather", "next one", "can we", "i want to", "i'd like to",
+)
+# "it reminds me of the sandbox" -> the visitor is still talking about the current exhibit
+STAY_CUES = (
+    "like the", "than the", "compared", "similar", "reminds", "remind", "same as", "as well as",
+    "just like", "better than", "worse than", "unlike",
+)
+
+
+# Process-wide so the numbers survive a rebuild of the engine on question-bank reload
+INTENT_COUNTERS: Dict[str, int] = {
+    "classify_total": 0, "classify_local": 0, "classify_llm_fallback": 0,
+    "switch_total": 0, "switch_local": 0, "switch_llm_fallback": 0,
+}
+
+
+def _stem(word: str) -> str:
+    if len(word) > 4 and word.endswith("es") and not word.endswith("ses"):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def content_words(text: str) -> List[str]:
+    return [_stem(w) for w in _WORD.findall((text or "").lower()) if w not in STOPWORDS]
+
+
+class IntentEngine:
+    """
+    Offline classifier built from exhibit_questions.json + KEYWORD_MAPPING.
+
+    - Fuzzy term matching (difflib) catches STT misspellings and split words
+      ("sand box", "hyper uniformity", "physarium").
+    - A small TF-IDF index over display_name, one_liner and keywords catches
+      descriptions ("the one that tracked my eyes").
+    Every decision carries a confidence in [0, 1]; callers only go to the LLM
+    when it is below INTENT_CONFIDENCE_THRESHOLD.
+    """
+
+    def __init__(
+        self,
+        exhibit_questions: Mapping[str, Mapping],
+        exhibit_names: Iterable[str],
+        keyword_mapping: Mapping[str, str],
+        threshold: float = INTENT_CONFIDENCE_THRESHOLD,
+    ):
+        self.threshold = threshold
+        docs: Dict[str, List[str]] = {name: [] for name in exhibit_names}
+        # fuzzy vocabulary: single term (spaces removed) -> exhibit
+        self._terms: Dict[str, str] = {}
+
+        for name in list(docs) + list(exhibit_questions):
+            docs.setdefault(name, [])
+            self._add_term(name, name)
+        for name, data in exhibit_questions.items():
+            display = data.get("display_name") or name
+            self._add_term(display, name)
+            docs[name] += content_words(display) * 2 + content_words(data.get("one_liner", ""))
+        for keyword, name in keyword_mapping.items():
+            docs.setdefault(name, [])
+            docs[name] += content_words(keyword) * 2
+            if len(keyword) >= 4:
+                self._add_term(keyword, name)
+        for name in docs:
+            docs[name] += content_words(name) * 2
+
+        # TF-IDF vectors, L2-normalised
+        df: Dict[str, int] = {}
+        for words in docs.values():
+            for w in set(words):
+                df[w] = df.get(w, 0) + 1
+        n_docs = max(len(docs), 1)
+        self._idf = {w: math.log((1 + n_docs) / (1 + c)) + 1 for w, c in df.items()}
+        self._vectors: Dict[str, Dict[str, float]] = {}
+        for name, words in docs.items():
+            vec: Dict[str, float] = {}
+            for w in words:
+                vec[w] = vec.get(w, 0.0) + self._idf[w]
+            norm = math.sqrt(sum(v * v for v in vec.values())) or 1.0
+            self._vectors[name] = {w: v / norm for w, v in vec.items()}
+        self._vocab = list(self._terms)
+        self.counters = INTENT_COUNTERS
+
+    def _add_term(self, term: str, exhibit: str):
+        key = re.sub(r"[^a-z0-9]", "", term.lower())
+        if key:
+            self._terms.setdefault(key, exhibit)
+
+    # ---------- Exhibit classification ----------
+    def _fuzzy(self, words: Sequence[str]) -> Tuple[Optional[str], float]:
+        probes = [w for w in words if len(w) >= 4]
+        probes += [a + b for a, b in zip(words, words[1:])]  # "sand box" -> "sandbox"
+        best, best_ratio = None, 0.0
+        for probe in probes:
+            key = re.sub(r"[^a-z0-9]", "", probe)
+            for match in difflib.get_close_matches(key, self._vocab, n=1, cutoff=0.8):
+                ratio = difflib.SequenceMatcher(None, key, match).ratio()
+                if ratio > best_ratio:
+                    best, best_ratio = self._terms[match], ratio
+        return best, best_ratio
+
+    def _similarities(self, words: Sequence[str]) -> List[Tuple[str, float]]:
+        query: Dict[str, float] = {}
+        for w in words:
+            if w in self._idf:
+                query[w] = query.get(w, 0.0) + self._idf[w]
+        norm = math.sqrt(sum(v * v for v in query.values()))
+        if not norm:
+            return []
+        sims = []
+        for name, vec in self._vectors.items():
+            score = sum(q * vec.get(w, 0.0) for w, q in query.items()) / norm
+            if score > 0:
+                sims.append((name, score))
+        sims.sort(key=lambda kv: -kv[1])
+        return sims
+
+    def classify_exhibit(self, text: str) -> Tuple[Optional[str], float]:
+        """Best exhibit for free text (None = no exhibit meant) and a confidence."""
+        words = content_words(text)
+        if not words:
+            # "yes", "okay sure", "I don't know" -> nothing to classify
+            return None, 0.95
+
+        fuzzy, ratio = self._fuzzy(words)
+        if fuzzy and ratio >= 0.85:
+            return fuzzy, ratio
+
+        sims = self._similarities(words)
+        if not sims:
+            # No word overlaps any exhibit description at all
+            return None, 0.8
+        best, s1 = sims[0]
+        s2 = sims[1][1] if len(sims) > 1 else 0.0
+        if s1 >= 0.25 and s1 - s2 >= 0.1:
+            return best, min(0.95, 0.5 + s1)
+        if fuzzy:
+            return fuzzy, ratio - 0.2
+        # Weak, ambiguous overlap: let the LLM decide
+        return best, s1
+
+    def resolve_exhibit(self, text: str) -> Tuple[Optional[str], bool]:
+        """Counted wrapper for chat_endpoint: returns (exhibit, needs_llm)."""
+        self.counters["classify_total"] += 1
+        exhibit, confidence = self.classify_exhibit(text)
+        if confidence < self.threshold:
+            self.counters["classify_llm_fallback"] += 1
+            return None, True
+        self.counters["classify_local"] += 1
+        return exhibit, False
+
+    # ---------- SWITCH / STAY ----------
+    def decide_switch(
+        self,
+        text: str,
+        current: str,
+        detected: str,
+        detected_score: float,
+        current_choices: Sequence[str] = (),
+    ) -> Tuple[str, float]:
+        """'SWITCH' or 'STAY' when a different exhibit than the current one was detected."""
+        t = " ".join((text or "").lower().split())
+        stay_cue = any(c in t for c in STAY_CUES)
+        switch_cue = any(c in t for c in SWITCH_CUES)
+        named = detected_score >= 3.0  # the exhibit's own name, not just a loose keyword
+
+        # The "keyword" is actually an answer option of the current question ("swarm" for Traces)
+        if any(re.search(rf"\b{re.escape(c.lower())}\b", t) for c in current_choices):
+            if not (named and switch_cue):
+                return "STAY", 0.9
+        if stay_cue and not switch_cue:
+            return "STAY", 0.85
+        if switch_cue and not stay_cue:
+            return "SWITCH", 0.9 if named else 0.75
+        if not named and not switch_cue:
+            # A loose keyword inside an answer ("it was so loud", "I had a good time")
+            return "STAY", 0.75
+        return ("SWITCH", 0.5) if named else ("STAY", 0.5)
+
+    def resolve_switch(self, *args, **kwargs) -> Tuple[Optional[str], bool]:
+        """Counted wrapper for chat_endpoint: returns (decision, needs_llm)."""
+        self.counters["switch_total"] += 1
+        decision, confidence = self.decide_switch(*args, **kwargs)
+        if confidence < self.threshold:
+            self.counters["switch_llm_fallback"] += 1
+            return None, True
+        self.counters["switch_local"] += 1
+        return decision, False
+
+    # ---------- Metrics ----------
+    def stats(self) -> Dict[str, float]:
+        c = dict(self.counters)
+        decisions = c["classify_total"] + c["switch_total"]
+        fallbacks = c["classify_llm_fallback"] + c["switch_llm_fallback"]
+        c["fallback_rate"] = round(fallbacks / decisions, 4) if decisions else 0.0
+        return c
@@ -0,0 +1,245 @@
+# lidar.py
+# LiDAR visit ranking: dwell-time events from the tracking system (POST /lidar/events or a
+# tailed JSONL file) feed time-decayed per-exhibit totals with an incrementally maintained
+# top-k, globally, per zone and per session. Reads are a cached tuple, O(1) per request.
+
+import json
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# ============ CONFIGURATION ============
+# Dwell time counts half as much after this long, so the ranking follows the day's crowd
+LIDAR_HALF_LIFE_S = float(os.getenv("LIDAR_HALF_LIFE_S", "3600"))
+LIDAR_TOP_K = int(os.getenv("LIDAR_TOP_K", "3"))
+LIDAR_MAX_SESSIONS = int(os.getenv("LIDAR_MAX_SESSIONS", "5000"))
+# Static fallback ranking (["Faces", "Sandbox", ...]) used until live events arrive
+LIDAR_STATS_PATH = os.getenv("LIDAR_STATS_PATH", "data/lidar_stats.json")
+LIDAR_FILE_CHECK_S = float(os.getenv("LIDAR_FILE_CHECK_S", "5"))
+# Optional JSONL the tracking system appends to; tailed by the server (empty disables). When set, POST
+# /lidar/events appends there too, so every worker process sees every event (serve.py sets it for --workers > 1)
+LIDAR_EVENTS_PATH = os.getenv("LIDAR_EVENTS_PATH", "")
+LIDAR_TAIL_INTERVAL_S = float(os.getenv("LIDAR_TAIL_INTERVAL_S", "1.0"))
+
+# Rebase the forward-decay weights before exp() gets anywhere near overflow
+_MAX_EXPONENT = 300.0
+
+
+class DecayedRanking:
+    """
+    Exponentially time-decayed dwell totals with a cached top-k.
+
+    Forward decay: an event at time t is stored with weight dwell * e^(rate * (t - t0)). The
+    decayed total at any later time is the stored sum times e^(-rate * (now - t0)), the same
+    factor for every exhibit, so the order never changes without an event. An event only
+    raises its own exhibit, so the top-k is updated from (top-k + that exhibit) in O(k).
+    """
+
+    def __init__(self, half_life_s: float = LIDAR_HALF_LIFE_S, k: int = LIDAR_TOP_K, t0: Optional[float] = None):
+        self.rate = math.log(2) / half_life_s
+        self.k = k
+        self.t0 = time.time() if t0 is None else t0
+        self._scores: Dict[str, float] = {}
+        self._top: Tuple[str, ...] = ()
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def add(self, exhibit: str, dwell_s: float, ts: float):
+        exponent = self.rate * (ts - self.t0)
+        if exponent > _MAX_EXPONENT:
+            self._rebase(ts)
+            exponent = 0.0
+        self._scores[exhibit] = self._scores.get(exhibit, 0.0) + dwell_s * math.exp(exponent)
+        if exhibit in self._top or len(self._top) < self.k or self._scores[exhibit] > self._scores[self._top[-1]]:
+            candidates = set(self._top)
+            candidates.add(exhibit)
+            self._top = tuple(sorted(candidates, key=self._scores.__getitem__, reverse=True)[:self.k])
+
+    def _rebase(self, ts: float):
+        factor = math.exp(-self.rate * (ts - self.t0))
+        self._scores = {name: score * factor for name, score in self._scores.items()}
+        self.t0 = ts
+
+    def top(self) -> Tuple[str, ...]:
+        return self._top
+
+    def scores(self, now: Optional[float] = None) -> List[Tuple[str, float]]:
+        """Decayed dwell seconds per exhibit at `now`, best first (O(n log n), for the API)."""
+        factor = math.exp(-self.rate * ((time.time() if now is None else now) - self.t0))
+        return sorted(((name, score * factor) for name, score in self._scores.items()), key=lambda kv: -kv[1])
+
+
+class LidarRankings:
+    """
+    Global, per-zone and per-session (LRU-bounded) rankings fed by ingest(). suggestions()
+    prefers the most specific ranking that already has k exhibits, then the static file, and
+    returns None when nothing is known.
+    """
+
+    def __init__(
+        self,
+        stats_path: str = LIDAR_STATS_PATH,
+        half_life_s: float = LIDAR_HALF_LIFE_S,
+        k: int = LIDAR_TOP_K,
+        max_sessions: int = LIDAR_MAX_SESSIONS,
+    ):
+        self.stats_path = stats_path
+        self.half_life_s = half_life_s
+        self.k = k
+        self.max_sessions = max_sessions
+        self.overall = DecayedRanking(half_life_s, k)
+        self.zones: Dict[str, DecayedRanking] = {}
+        self.sessions: "OrderedDict[str, DecayedRanking]" = OrderedDict()
+        self._file_top: Optional[Tuple[str, ...]] = None
+        self._file_sig: Optional[Tuple[int, int]] = None
+        self._file_checked = 0.0
+        self.counters: Dict[str, int] = {
+            "events": 0, "rejected": 0, "queries": 0,
+            "from_session": 0, "from_zone": 0, "from_overall": 0, "from_file": 0, "none": 0,
+        }
+
+    # ---------- Ingestion ----------
+    def ingest(self, exhibit: str, dwell_s: float, ts: Optional[float] = None,
+               zone: Optional[str] = None, session_id: Optional[str] = None):
+        ts = time.time() if ts is None else ts
+        self.overall.add(exhibit, dwell_s, ts)
+        if zone:
+            ranking = self.zones.get(zone)
+            if ranking is None:
+                ranking = self.zones[zone] = DecayedRanking(self.half_life_s, self.k, ts)
+            ranking.add(exhibit, dwell_s, ts)
+        if session_id:
+            ranking = self.sessions.get(session_id)
+            if ranking is None:
+                ranking = self.sessions[session_id] = DecayedRanking(self.half_life_s, self.k, ts)
+                while len(self.sessions) > self.max_sessions:
+                    self.sessions.popitem(last=False)
+            else:
+                self.sessions.move_to_end(session_id)
+            ranking.add(exhibit, dwell_s, ts)
+        self.counters["events"] += 1
+
+    def validate(self, e: Any, resolve: Callable[[str], Optional[str]]) -> Optional[Dict[str, Any]]:
+        """The event with its exhibit resolved and ts filled in, or None (counted as rejected)."""
+        exhibit = resolve(str(e.get("exhibit") or "")) if isinstance(e, dict) else None
+        dwell = 0.0
+        if exhibit is not None:
+            try:
+                dwell = float(e.get("dwell_s", 0))
+                ts = float(e["ts"]) if e.get("ts") is not None else time.time()
+            except (TypeError, ValueError):
+                dwell = 0.0
+        if not dwell > 0:  # also catches NaN
+            self.counters["rejected"] += 1
+            return None
+        return {"exhibit": exhibit, "dwell_s": dwell, "ts": ts, "zone": e.get("zone"), "session_id": e.get("session_id")}
+
+    def ingest_many(self, events: Iterable[Dict[str, Any]], resolve: Callable[[str], Optional[str]]) -> int:
+        """Validated batch ingest; resolve maps a tracker label to an exhibit name (None = unknown)."""
+        accepted = 0
+        for e in events:
+            event = self.validate(e, resolve)
+            if event is not None:
+                self.ingest(**event)
+                accepted += 1
+        return accepted
+
+    # ---------- Read path ----------
+    def suggestions(self, session_id: Optional[str] = None, zone: Optional[str] = None) -> Optional[Tuple[str, ...]]:
+        self.counters["queries"] += 1
+        for source, ranking in (("from_session", self.sessions.get(session_id or "")),
+                                ("from_zone", self.zones.get(zone or "")),
+                                ("from_overall", self.overall)):
+            if ranking is not None and len(ranking.top()) >= self.k:
+                self.counters[source] += 1
+                return ranking.top()
+        top = self._static_top()
+        self.counters["from_file" if top else "none"] += 1
+        return top
+
+    def _static_top(self) -> Optional[Tuple[str, ...]]:
+        # The file is only re-checked every LIDAR_FILE_CHECK_S and only re-parsed when it changed
+        now = time.monotonic()
+        if now - self._file_checked < LIDAR_FILE_CHECK_S and self._file_checked:
+            return self._file_top
+        self._file_checked = now
+        try:
+            st = os.stat(self.stats_path)
+        except OSError:
+            self._file_sig, self._file_top = None, None
+            return None
+        sig = (st.st_mtime_ns, st.st_size)
+        if sig != self._file_sig:
+            self._file_sig = sig
+            try:
+                with open(self.stats_path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                # Assuming JSON is like: ["Faces", "Sandbox", "VR"]
+                self._file_top = tuple(data[:self.k]) if isinstance(data, list) and len(data) >= self.k else None
+            except (OSError, ValueError) as e:
+                logger.error(f"Failed to read LiDAR file: {e}")
+                self._file_top = None
+        return self._file_top
+
+    def ranking(self, session_id: Optional[str] = None, zone: Optional[str] = None) -> List[Tuple[str, float]]:
+        if session_id:
+            ranking = self.sessions.get(session_id)
+        elif zone:
+            ranking = self.zones.get(zone)
+        else:
+            ranking = self.overall
+        return ranking.scores() if ranking is not None else []
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters, "exhibits": len(self.overall), "zones": len(self.zones),
+                "sessions": len(self.sessions), "top": list(self.overall.top())}
+
+
+def append_events(path: str, events: List[Dict[str, Any]]):
+    """One O_APPEND write for the batch, so lines from several workers never interleave."""
+    if not events:
+        return
+    data = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in events).encode("utf-8")
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, data)
+    finally:
+        os.close(fd)
+
+
+class EventTail:
+    """Reads lines appended to a JSONL file since the last call; starts over if it was truncated or rotated."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.offset = 0
+        self._inode: Optional[int] = None
+        self.bad_lines = 0
+
+    def read_new(self) -> List[Dict[str, Any]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return []
+        if st.st_ino != self._inode or st.st_size < self.offset:
+            self._inode, self.offset = st.st_ino, 0
+        if st.st_size == self.offset:
+            return []
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            chunk = f.read(st.st_size - self.offset)
+        end = chunk.rfind(b"\n") + 1  # a half-written last line waits for the next call
+        self.offset += end
+        events = []
+        for line in chunk[:end].splitlines():
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                self.bad_lines += 1
+        return events
@@ -1,25 +1,51 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
-from fastapi.responses import JSONResponse, Response
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Header, Request
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
-from collections import deque
-from config import KEYWORD_MAPPING
+from typing import Optional, List, Dict, Any, AsyncIterator, Mapping, Tuple, Union
+from collections import deque, OrderedDict
+import config
+from config import EXHIBITS, KEYWORD_MAPPING
+from exhibit_matcher import ExhibitMatcher
+from intent import IntentEngine
+from question_bank import (QuestionBank, FileWatcher, load_question_bank, load_snapshot, QUESTION_BANK_POLL_S,
+                           QUESTION_BANK_SNAPSHOT, QUESTIONS_PATH)
+from choice_replies import ChoiceReplyEngine, CHOICE_FAST_PATH
+from answer_cache import AnswerCache, ANSWER_COUNTERS
+from session_store import SessionStore, create_session_store
+from session_state import SessionState
+from feedback_log import FeedbackLogWriter
+from analytics import FeedbackAnalytics, ANALYTICS_DB_PATH, ANALYTICS_INGEST_INTERVAL_S
+from prompts import PromptTemplates, PromptParts, PromptStats
+from conversation_memory import Role, memory_stats
+from lidar import LidarRankings, EventTail, append_events, LIDAR_EVENTS_PATH, LIDAR_TAIL_INTERVAL_S
+from prefetch import PrefetchSlot, PrefetchSlots, SPECULATIVE_PREFETCH, PREFETCH_MAX_CHOICES, normalize_answer
+from tts_cache import TTSCache, cache_key, TTS_CACHE_MAX_AGE_S
+from audio_input import UploadLimitMiddleware, keep_uploads_in_memory, open_upload, STT_MIN_DURATION_S
+from admission import (AdmissionController, AdmissionMiddleware, SessionLocks, TurnCoalescer, turn_key,
+                       PRIORITY_ACTIVE, PRIORITY_NEW)
+from metrics import (MetricsMiddleware, span, mark_turn, record_llm_call, record_path, render_metrics,
+                     PROFILER, PROFILER_ALLOWED)
+import audio_preprocess
+from audio_preprocess import STT_PREPROCESS, PreprocessResult
+import asyncio
+import hashlib
+import io
 import json
+import sqlite3
 from datetime import datetime
 import logging
 import random
 import time
-import tempfile
+import uuid
 import os
 
 from dotenv import load_dotenv
 load_dotenv()
 
-from openai import OpenAI
-
-# ---------- OpenAI ----------
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+from providers import get_provider, close_provider, ProviderTimeout, TTS_MODEL
+from resilience import ProviderUnavailable
+from streaming import speak_stream
 
 # ---------- Logging ----------
 logging.basicConfig(level=logging.INFO)
@@ -30,194 +56,281 @@ app = FastAPI(
     version="1.4.0",
     description="Full Backend: Unified Chat Logic + STT/TTS + Global Context",
 )
+# Every route taking a file upload goes here: the in-memory spool below applies app-wide
+app.add_middleware(UploadLimitMiddleware, paths=["/stt", "/turn"])
+keep_uploads_in_memory()
+# Bounded work + priority queue for the kiosk routes: running conversations before new ones, 429 when full
+ADMISSION = AdmissionController()
+app.add_middleware(AdmissionMiddleware, controller=ADMISSION, priorities={
+    "/start": PRIORITY_NEW, "/chat": PRIORITY_ACTIVE, "/chat/stream": PRIORITY_ACTIVE, "/stt": PRIORITY_ACTIVE,
+    "/turn": PRIORITY_ACTIVE, "/tts": PRIORITY_ACTIVE, "/audio/": PRIORITY_ACTIVE})
+app.add_middleware(MetricsMiddleware)  # outermost: spans, Server-Timing, request latency (incl. 413s)
 
 #============ LOAD EXHIBIT QUESTIONS ============
-QUESTIONS_PATH = os.getenv("EXHIBIT_QUESTIONS_PATH", "data/exhibit_questions.json")
 FEEDBACK_LOG_PATH = os.getenv("FEEDBACK_LOG_PATH", "data/feedback_log.jsonl")
 
-EXHIBIT_QUESTIONS: Dict[str, Any] = {}
+# Immutable snapshot (validated + indexed); read-only views of it are kept below for the prompt code
+QUESTION_BANK = QuestionBank({}, KEYWORD_MAPPING, [])
+EXHIBIT_QUESTIONS: Mapping[str, Any] = QUESTION_BANK.exhibits
 GLOBAL_KB_STR: str = ""  # Stores the full text description of the museum
+QUESTION_BANK_STATS: Dict[str, Any] = {"reloads": 0, "reload_errors": 0, "last_error": None, "load_ms": 0.0}
+
+def _build_question_bank(reload_config: bool = False, empty: bool = False):
+    """Snapshot + everything derived from it. Pure CPU/file work, safe to run in a thread."""
+    start = time.perf_counter()
+    if empty:
+        bank = QuestionBank({}, KEYWORD_MAPPING, EXHIBITS)
+    elif QUESTION_BANK_SNAPSHOT:
+        bank = load_snapshot(QUESTION_BANK_SNAPSHOT)  # validated and versioned once by the serve.py supervisor
+    else:
+        bank = load_question_bank(QUESTIONS_PATH, EXHIBITS, QUESTION_BANK.version + 1, reload_config)
+    engines = (
+        ExhibitMatcher.build(bank.exhibits, EXHIBITS, bank.keyword_mapping),
+        IntentEngine(bank.exhibits, EXHIBITS, bank.keyword_mapping),
+        ChoiceReplyEngine(bank.exhibits),
+        PromptTemplates(bank.kb),
+        AnswerCache(bank.aliases, bank.content_hash),
+    )
+    return bank, engines, (time.perf_counter() - start) * 1000
+
+def _install_question_bank(bank: QuestionBank, engines: Tuple, load_ms: float):
+    # No await in here: every turn sees either the old or the new bank, never a mix
+    global QUESTION_BANK, EXHIBIT_QUESTIONS, GLOBAL_KB_STR, EXHIBIT_MATCHER, INTENT_ENGINE, CHOICE_ENGINE, PROMPTS
+    global ANSWER_CACHE
+    EXHIBIT_MATCHER, INTENT_ENGINE, CHOICE_ENGINE, PROMPTS, answer_cache = engines
+    # Cached answers come from the knowledge base; they only carry over when the bank content did not change
+    if answer_cache.content_hash == ANSWER_CACHE.content_hash:
+        answer_cache = ANSWER_CACHE
+    else:
+        ANSWER_COUNTERS["invalidated"] += len(ANSWER_CACHE)
+    ANSWER_CACHE = answer_cache
+    QUESTION_BANK, EXHIBIT_QUESTIONS, GLOBAL_KB_STR = bank, bank.exhibits, bank.kb
+    QUESTION_BANK_STATS["load_ms"] = round(load_ms, 2)
 
 def load_exhibit_questions():
-    global EXHIBIT_QUESTIONS, GLOBAL_KB_STR
     try:
-        with open(QUESTIONS_PATH, "r", encoding="utf-8") as f:
-            EXHIBIT_QUESTIONS = json.load(f)
-        
-        # === NEW: Build Knowledge Base for the LLM ===
-        # This helps the bot know what "Faces" or "Sandbox" actually is.
-        kb_lines = []
-        for name, data in EXHIBIT_QUESTIONS.items():
-            desc = data.get("one_liner", "An interactive display.")
-            kb_lines.append(f"- {name}: {desc}")
-        GLOBAL_KB_STR = "\n".join(kb_lines)
-        
-        logger.info(f"Loaded exhibit questions: {len(EXHIBIT_QUESTIONS)} exhibits")
+        _install_question_bank(*_build_question_bank())
+        logger.info(f"Loaded exhibit questions: {len(EXHIBIT_QUESTIONS)} exhibits (version {QUESTION_BANK.version})")
     except Exception as e:
-        EXHIBIT_QUESTIONS = {}
-        GLOBAL_KB_STR = ""
+        _install_question_bank(*_build_question_bank(empty=True))
         logger.warning(f"Using empty question bank. Error: {e}")
 
-def log_feedback_event(event: Dict[str, Any]):
+async def reload_question_bank() -> bool:
+    """Re-read exhibit_questions.json and config.KEYWORD_MAPPING; an invalid edit keeps the current bank."""
     try:
-        os.makedirs(os.path.dirname(FEEDBACK_LOG_PATH), exist_ok=True)
-        event["ts"] = datetime.now().isoformat()
-        with open(FEEDBACK_LOG_PATH, "a", encoding="utf-8") as f:
-            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+        built = await asyncio.to_thread(_build_question_bank, True)
     except Exception as e:
-        logger.error(f"Log failed: {e}")
+        QUESTION_BANK_STATS["reload_errors"] += 1
+        QUESTION_BANK_STATS["last_error"] = str(e)
+        logger.error(f"Question bank reload failed, keeping version {QUESTION_BANK.version}: {e}")
+        return False
+    _install_question_bank(*built)
+    QUESTION_BANK_STATS["reloads"] += 1
+    QUESTION_BANK_STATS["last_error"] = None
+    logger.info(f"Question bank reloaded: version {QUESTION_BANK.version} ({QUESTION_BANK.content_hash}), "
+                f"{len(EXHIBIT_QUESTIONS)} exhibits in {built[2]:.1f} ms")
+    return True
+
+async def _watch_question_bank(watcher: FileWatcher):
+    while True:
+        await asyncio.sleep(QUESTION_BANK_POLL_S)
+        if watcher.changed():
+            await reload_question_bank()
+
+# Batched background writer (flushes on size/interval, rotates, fsyncs on shutdown)
+FEEDBACK_WRITER = FeedbackLogWriter(FEEDBACK_LOG_PATH)
+
+def log_feedback_event(event: Dict[str, Any]):
+    event["ts"] = datetime.now().isoformat()
+    FEEDBACK_WRITER.enqueue(event)
+
+# Indexed copy of the feedback log + running aggregates for /analytics (opened on startup)
+ANALYTICS: Optional[FeedbackAnalytics] = None
+
+async def _ingest_analytics():
+    while True:
+        await asyncio.sleep(ANALYTICS_INGEST_INTERVAL_S)
+        try:
+            await asyncio.to_thread(ANALYTICS.ingest)
+        except (OSError, sqlite3.Error) as e:
+            logger.error(f"Feedback analytics ingest failed: {e}")
 
 # ============ CONFIGURATION ============
 MAX_USER_TURNS = int(os.getenv("MAX_USER_TURNS", "5")) 
 MAX_OUTPUT_TOKENS = 150
+DEFAULT_VOICE = "coral"
+DEFAULT_AUDIO_FORMAT = "mp3"
 
-EXHIBITS = [
-    "D4A","Asan.AI","Swarming bacteria","Chatbot","Circuit Flowfields",
-    "Complex calculations","Complexity Explorables","Data traces","Dresden mapping",
-    "Faces","Film Forms","Hyperuniformity","Magic Mirror","Mathematical models",
-    "Physarum","Retro Reboot","Sandbox","Seamless pattern","Server cabinet",
-    "Server kit","Time travel","Traces","VR experience"
+# ============ FIXED TEXTS ============
+# Kept here (not inline) so warm_tts_cache.py can pre-synthesize every one of them
+# 1. Short, engaging hooks (Randomized)
+START_HOOKS = [
+    "Your feedback helps shape the future of this exhibition.",
+    "We use your thoughts to help researchers understand visitor experiences.",
+    "I'm collecting data to help developers improve their exhibit.",
+    "Your perspective helps us bridge the gap between data and people.",
+    "I am the digital memory of this space, learning from every visitor.",
+    "Your honest critique helps us make Data Spaces better for everyone."
 ]
+# 2. Standard Instruction (Constant)
+START_INSTRUCTION = "Tap the button below and just say 'Yes' to begin."
+
+SELECT_EXPLICIT_TEXT = "Understood. Which specific exhibit would you like to discuss? (e.g. Faces, VR, Sandbox)"
+SELECT_GENERIC_TEXT = "It seems I'm having trouble matching that to an exhibit. Would you like to give a review for ANY exhibit? If so, just say the name."
+FORCE_END_TEXT = "It looks like you might be done for now. Thank you for visiting Data Spaces!"
+OVERALL_IMPROVE_TEXT = "If you could change one thing about the whole exhibition, what would it be?"
+ASK_RESTART_TEXT = "Would you like to review another exhibit? If yes, tell me which one."
+EXHIBIT_DONE_TEXT = "That is all for this exhibit. Would you like to review another one?"
+# No LiDAR ranking (no events yet, no stats file): ask without claiming to know where they were
+SELECT_NO_LIDAR_TEXT = "Which exhibit would you like to talk about? For example Faces, the VR experience or the Sandbox."
 
 # Smart Keyword Mapping (The Fix)
+# Compiled once; rebuilt with the JSON names/display names in load_exhibit_questions()
+EXHIBIT_MATCHER = ExhibitMatcher.build({}, EXHIBITS, KEYWORD_MAPPING)
+INTENT_ENGINE = IntentEngine({}, EXHIBITS, KEYWORD_MAPPING)
+# Template replies for plain choice answers (no LLM call)
+CHOICE_ENGINE = ChoiceReplyEngine({})
+# Answer parts of earlier LLM replies to factual questions, per exhibit (no LLM call on a hit)
+ANSWER_CACHE = AnswerCache({})
 
 # ============ UNIFIED PROMPT GENERATOR (THE LOGIC FIX) ============
+# Static prefix (persona, KB, rules, example) is rebuilt in load_exhibit_questions(); turns only
+# render the delta that goes after the conversation history
+PROMPTS = PromptTemplates(GLOBAL_KB_STR)
+PROMPT_STATS = PromptStats()
+
 def build_unified_system_prompt(
     target_question: str, 
     current_exhibit: str, 
     one_liner: str, 
     is_closing: bool = False,
     transition_note: Optional[str] = None  # <--- NEW ARGUMENT
-) -> str:
-    
-    # 1. Base Persona
-    prompt = f"""
-You are the embodied subconscious of the 'Data Spaces' exhibition. 
-Your goal is to collect specific feedback from the visitor.
-
-Global Exhibition Knowledge (Use this to answer factual questions):
-{GLOBAL_KB_STR}
-
-Context:
-- Current Topic: {current_exhibit if current_exhibit else "General (No exhibit selected)"}
-"""
-
-    # 2. CLOSING LOGIC
-    if is_closing:
-        prompt += """
-Current Status: CONVERSATION ENDING.
-Task:
-1. Review the conversation history.
-2. Generate a 2-sentence closing.
-   - If they gave feedback, summarize it ("Thanks for your thoughts on the VR").
-   - If not, just say thanks.
-3. End politely. Do NOT ask any new questions.
-"""
-        return prompt
-
-    # 3. INTERVIEW LOGIC (STRICTER NOW)
-    prompt += f"""
-Current Status: ACTIVE INTERVIEW.
-
-Your Mandatory Goal:
-You MUST get an answer to this specific question: 
->>> "{target_question}"
-
-INSTRUCTIONS:
-1. **Answer First:** If the user asked a question (e.g., "How does it work?"), answer it clearly using the 'Global Exhibition Knowledge' above.
-2. **Transition Immediately:** After answering, you MUST asks the Target Question above.
-3. **Negative Constraints:** - Do NOT ask "Do you want to know more?"
-   - Do NOT ask "Is there anything else?"
-   - Do NOT ask "Does that make sense?"
-   - ONLY ask the Target Question.
-
-Example Interaction:
-User: "What is Faces?"
-You: "Faces uses LiDAR sensors to track your eyes. Did seeing that feel playful or creepy?" 
-(Notice how you answered, then immediately pivoted to the feedback question).
-"""
-    
-    # === NEW: Inject the Transition Instruction ===
-    if transition_note:
-        prompt += f"\n**SPECIAL TRANSITION:** {transition_note}\n"
-    # ==============================================
+) -> PromptParts:
+    # one_liner is already part of the knowledge base in the static prefix
+    return PROMPTS.render(target_question, current_exhibit, is_closing=is_closing, transition_note=transition_note)
 
-    return prompt
+LLM_FALLBACK_REPLY = "I'm having trouble connecting to my memory. What did you say?"
+# Spoken instead of an LLM reply when the provider fails on a closing turn
+CLOSING_FALLBACK_TEXT = "Thank you so much for your feedback. Enjoy the rest of Data Spaces!"
 
-def call_llm(system_prompt: str, history: List[Dict[str, str]]) -> str:
-    messages = [{"role": "system", "content": system_prompt}] + history
+def _llm_messages(system_prompt: Union[str, PromptParts], history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    if isinstance(system_prompt, PromptParts):
+        return system_prompt.messages(history)
+    return [{"role": "system", "content": system_prompt}] + history
+
+async def call_llm(system_prompt: Union[str, PromptParts], history: List[Dict[str, str]],
+                   fallback: Optional[str] = LLM_FALLBACK_REPLY, purpose: str = "reply") -> Optional[str]:
+    """The reply, or `fallback` when the provider failed (after retries) or its circuit is open."""
+    messages = _llm_messages(system_prompt, history)
+    usage: Dict[str, int] = {}
+    provider = get_provider()
+    # A duplicate request is only worth it for the reply the visitor is waiting on (hedging is
+    # ResilientProvider's; a bare or mock provider takes no hedge argument)
+    hedge = {"hedge": True} if purpose == "reply" and getattr(provider, "hedge", False) else {}
+    start = time.perf_counter()
     try:
-        resp = client.responses.create(
-            model=MODEL,
-            input=messages,
-            max_output_tokens=MAX_OUTPUT_TOKENS,
-            temperature=0.7 
+        reply = await provider.complete(
+            messages, max_output_tokens=MAX_OUTPUT_TOKENS, temperature=0.7, usage=usage, cache_key=PROMPTS.cache_key,
+            **hedge
         )
-        return (resp.output_text or "").strip()
     except Exception as e:
         logger.error(f"LLM Error: {e}")
-        return "I'm having trouble connecting to my memory. What did you say?"
+        record_llm_call(purpose, ok=False)
+        return fallback
+    PROMPT_STATS.record("complete", messages, usage, time.perf_counter() - start)
+    record_llm_call(purpose, ok=True, usage=usage)
+    return reply
+
+async def stream_llm(system_prompt: Union[str, PromptParts], history: List[Dict[str, str]],
+                     fallback: str = LLM_FALLBACK_REPLY) -> AsyncIterator[str]:
+    messages = _llm_messages(system_prompt, history)
+    usage: Dict[str, int] = {}
+    start = time.perf_counter()
+    ttft = None
+    try:
+        with span("reply"):
+            async for delta in get_provider().stream_complete(
+                messages, max_output_tokens=MAX_OUTPUT_TOKENS, temperature=0.7, usage=usage, cache_key=PROMPTS.cache_key
+            ):
+                if ttft is None:
+                    ttft = time.perf_counter() - start
+                yield delta
+    except Exception as e:
+        logger.error(f"LLM Stream Error: {e}")
+        record_llm_call("stream", ok=False)
+        # The canned reply only replaces a reply that never started: after half a sentence the
+        # visitor would hear it tacked on, so the stream just ends with what was sent
+        if ttft is None:
+            yield fallback
+        return
+    PROMPT_STATS.record("stream", messages, usage, time.perf_counter() - start, ttft)
+    record_llm_call("stream", ok=True, usage=usage)
 
 # ============ SESSION MANAGEMENT ============
-SESSION_STORE: Dict[str, Dict[str, Any]] = {}
-
-def _get_session(session_id: str) -> Dict[str, Any]:
-    if session_id not in SESSION_STORE:
-        SESSION_STORE[session_id] = {
-            "messages": [],
-            "selected_exhibit": None,
-            "asked_qids": set(),
-            "last_qid": None,
-            "turn_count": 0,
-            "selection_attempts": 0  # <--- NEW: Initialize counter
-        }
-    return SESSION_STORE[session_id]
+# Bounded LRU + idle TTL in memory, or a shared SQLite file (SESSION_BACKEND=sqlite)
+SESSION_STORE: SessionStore = create_session_store()
+# A session's turn (load -> plan -> LLM -> save) runs alone; duplicates of a running turn share its result
+SESSION_LOCKS = SessionLocks()
+TURNS = TurnCoalescer()
+
+async def _session_io(fn, *args):
+    # SQLite waits on disk and on other workers' write lock (up to its busy timeout): never on the loop
+    if SESSION_STORE.blocking:
+        return await asyncio.to_thread(fn, *args)
+    return fn(*args)
+
+async def _get_session(session_id: str) -> SessionState:
+    s = await _session_io(SESSION_STORE.get, session_id)
+    if s is None:
+        s = SessionState(session_id)
+        await _session_io(SESSION_STORE.put, session_id, s)
+    return s
 
-def _append_message(session_id: str, role: str, content: str):
-    s = _get_session(session_id)
-    # Memory Window: Keep last 10 messages
-    if len(s["messages"]) >= 10:
-        s["messages"].pop(0)
-    s["messages"].append({"role": role, "content": content})
+async def _save_session(session_id: str, s: SessionState):
+    await _session_io(SESSION_STORE.put, session_id, s)
+
+def _push_message(s: SessionState, role: Role, content: str):
+    # Memory: stays within MEMORY_TOKEN_BUDGET, older turns are summarized locally
+    s.memory.append(role, content)
 
 def detect_exhibit_from_text(text: str) -> Optional[str]:
-    t = (text or "").lower()
-    # 1. Check loaded JSON keys (Best source)
-    for name in EXHIBIT_QUESTIONS.keys():
-        if name.lower() in t: return name
-    # 2. Check simple list (Fallback)
-    for name in EXHIBITS:
-        if name.lower() in t: return name
-    # 3. Check Smart Keywords (The Fix)
-    for keyword, official_name in KEYWORD_MAPPING.items():
-        if keyword in t:
-            return official_name
-    return None
+    # Single pass over the text: JSON names, EXHIBITS and KEYWORD_MAPPING are all in the matcher
+    return EXHIBIT_MATCHER.best(text)
+
+def _find_question(exhibit: Optional[str], qid: Optional[str]) -> Optional[Dict[str, Any]]:
+    return QUESTION_BANK.question(qid, exhibit or "")
 
-def get_next_question_logic(session: Dict[str, Any]) -> Dict[str, Any]:
-    exhibit = session.get("selected_exhibit")
+def get_next_question_logic(session: SessionState) -> Dict[str, Any]:
+    exhibit = session.selected_exhibit
     
     # CASE 1: No exhibit selected
     if not exhibit:
         # === EXCEPTION: User explicitly asked to choose manually ===
-        if session.get("force_open_choice"):
-            session["force_open_choice"] = False  # Reset flag immediately (one-time use)
+        if session.force_open_choice:
+            session.force_open_choice = False  # Reset flag immediately (one-time use)
             # We do NOT increment "selection_attempts" because this is a valid request.
             return {
                 "id": "select_exhibit_explicit",
-                "text": "Understood. Which specific exhibit would you like to discuss? (e.g. Faces, VR, Sandbox)",
+                "text": SELECT_EXPLICIT_TEXT,
                 "one_liner": "The user wants to select an exhibit manually.",
                 "end_conversation": False
             }
         # ===========================================================
 
         # Standard Failure Logic (The Counter)
-        session["selection_attempts"] = session.get("selection_attempts", 0) + 1
-        attempts = session["selection_attempts"]
+        session.selection_attempts += 1
+        attempts = session.selection_attempts
 
         # Attempts 1 & 2: Push the LiDAR Suggestions
         if attempts <= 2:
-            suggestions = get_lidar_suggestions() 
+            suggestions = get_lidar_suggestions(session.session_id, session.zone)
+            if not suggestions:
+                return {
+                    "id": "select_exhibit_open",
+                    "text": SELECT_NO_LIDAR_TEXT,
+                    "one_liner": "The user has not picked an exhibit yet.",
+                    "end_conversation": False
+                }
             return {
                 "id": "select_exhibit_lidar",
                 "text": f"Hey, I noticed you spent the most time at the {suggestions}. Would you like to review one of them?",
@@ -229,7 +342,7 @@ def get_next_question_logic(session: Dict[str, Any]) -> Dict[str, Any]:
         elif attempts == 3:
             return {
                 "id": "select_exhibit_generic",
-                "text": "It seems I'm having trouble matching that to an exhibit. Would you like to give a review for ANY exhibit? If so, just say the name.",
+                "text": SELECT_GENERIC_TEXT,
                 "one_liner": "I am trying to help the user start a review.",
                 "end_conversation": False
             }
@@ -238,25 +351,25 @@ def get_next_question_logic(session: Dict[str, Any]) -> Dict[str, Any]:
         else:
              return {
                 "id": "force_end",
-                "text": "It looks like you might be done for now. Thank you for visiting Data Spaces!",
+                "text": FORCE_END_TEXT,
                 "one_liner": "The user is not engaging. End the conversation politely.",
                 "end_conversation": True
             }
 
     # CASE 2: Overall
     if exhibit == "overall exhibition":
-        if "overall_improve" not in session["asked_qids"]:
+        if not session.has_asked("overall_improve"):
             return {
                 "id": "overall_improve",
-                "text": "If you could change one thing about the whole exhibition, what would it be?",
+                "text": OVERALL_IMPROVE_TEXT,
                 "one_liner": "This is Data Spaces.",
                 "end_conversation": False
             }
         else:
-            session["selected_exhibit"] = None 
+            session.selected_exhibit = None
             return {
                 "id": "ask_restart",
-                "text": "Would you like to review another exhibit? If yes, tell me which one.",
+                "text": ASK_RESTART_TEXT,
                 "one_liner": None,
                 "end_conversation": False
             }
@@ -265,41 +378,116 @@ def get_next_question_logic(session: Dict[str, Any]) -> Dict[str, Any]:
     pack = EXHIBIT_QUESTIONS.get(exhibit, {})
     # Default one-liner if missing from JSON
     one_liner = pack.get("one_liner", f"The {exhibit} is an interactive installation.") 
-    questions = pack.get("questions", [])
 
-    for q in questions:
-        if q["id"] not in session["asked_qids"]:
-            return {
-                "id": q["id"],
-                "text": q["text"],
-                "one_liner": one_liner,
-                "end_conversation": False
-            }
+    q = QUESTION_BANK.next_question(exhibit, session.asked)
+    if q:
+        return {
+            "id": q["id"],
+            "text": q["text"],
+            "one_liner": one_liner,
+            "end_conversation": False
+        }
 
     # CASE 4: No questions left
-    session["selected_exhibit"] = None 
+    session.selected_exhibit = None
     return {
         "id": "ask_restart",
-        "text": "That is all for this exhibit. Would you like to review another one?",
+        "text": EXHIBIT_DONE_TEXT,
         "one_liner": one_liner,
         "end_conversation": False
     }
 
-def get_lidar_suggestions() -> str:
+# ============ LIDAR RANKING ============
+# Time-decayed dwell rankings fed by POST /lidar/events (and LIDAR_EVENTS_PATH if set);
+# data/lidar_stats.json is the fallback until events arrive
+LIDAR = LidarRankings()
+
+def get_lidar_suggestions(session_id: Optional[str] = None, zone: Optional[str] = None) -> Optional[str]:
     """
-    Simulates fetching the 'Top 3 Visited Exhibits' from the LiDAR backend.
+    The 'Top 3 Visited Exhibits' for this visitor (or zone, or the whole floor), or None.
     """
-    # 1. Try to read from a real file (Future Proofing)
-    lidar_path = "data/lidar_stats.json" 
-    if os.path.exists(lidar_path):
+    top = LIDAR.suggestions(session_id, zone)
+    if not top:
+        return None
+    return ", ".join(top[:-1]) + " and " + top[-1] if len(top) > 1 else top[0]
+
+async def _tail_lidar_events(tail: EventTail):
+    while True:
+        await asyncio.sleep(LIDAR_TAIL_INTERVAL_S)
         try:
-            with open(lidar_path, "r") as f:
-                data = json.load(f)
-                # Assuming JSON is like: ["Faces", "Sandbox", "VR"]
-                if data and len(data) >= 3:
-                    return ", ".join(data[:3])
-        except Exception as e:
-            logger.error(f"Failed to read LiDAR file: {e}")
+            events = await asyncio.to_thread(tail.read_new)
+        except OSError as e:
+            logger.error(f"LiDAR event tail failed: {e}")
+            continue
+        if events:
+            LIDAR.ingest_many(events, QUESTION_BANK.exhibit_for_alias)
+
+# ============ AUDIO CLIP STORE ============
+# Short-lived synthesized replies from /turn, fetched once by the kiosk via /audio/{id}
+AUDIO_CLIP_TTL_S = int(os.getenv("AUDIO_CLIP_TTL_S", "120"))
+AUDIO_CLIP_MAX = int(os.getenv("AUDIO_CLIP_MAX", "256"))
+# With several workers the /audio fetch can land on another process: keep clips in a shared directory
+# ("" = in this process's memory; serve.py sets data/audio_clips for --workers > 1)
+AUDIO_CLIP_DIR = os.getenv("AUDIO_CLIP_DIR", "")
+AUDIO_CLIPS: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+AUDIO_MEDIA_TYPES = {"mp3": "audio/mpeg", "wav": "audio/wav", "opus": "audio/ogg", "aac": "audio/aac", "flac": "audio/flac"}
+_AUDIO_CLIP_SWEPT = 0.0
+
+def _sweep_audio_clip_dir(now: float):
+    for entry in os.scandir(AUDIO_CLIP_DIR):
+        try:
+            if entry.stat().st_mtime + AUDIO_CLIP_TTL_S < now:
+                os.remove(entry.path)
+        except FileNotFoundError:
+            pass  # swept by another worker
+
+def _write_audio_clip_file(clip_id: str, audio: bytes, fmt: str, sweep: bool):
+    """Blocking (mkdir, directory scan, write + rename): run it in a thread."""
+    os.makedirs(AUDIO_CLIP_DIR, exist_ok=True)
+    if sweep:
+        _sweep_audio_clip_dir(time.time())
+    tmp = os.path.join(AUDIO_CLIP_DIR, f".{clip_id}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(audio)
+    ext = fmt if fmt in AUDIO_MEDIA_TYPES else "bin"  # fmt comes from the request: never a path part
+    os.replace(tmp, os.path.join(AUDIO_CLIP_DIR, f"{clip_id}.{ext}"))
+
+def _read_audio_clip_file(clip_id: str) -> Optional[Dict[str, Any]]:
+    """Blocking (stat + read): run it in a thread."""
+    for fmt in (*AUDIO_MEDIA_TYPES, "bin"):
+        path = os.path.join(AUDIO_CLIP_DIR, f"{clip_id}.{fmt}")
+        try:
+            if os.stat(path).st_mtime + AUDIO_CLIP_TTL_S < time.time():
+                return None
+            with open(path, "rb") as f:
+                return {"audio": f.read(), "format": fmt}
+        except FileNotFoundError:
+            continue
+    return None
+
+async def _store_audio_clip(audio: bytes, fmt: str) -> str:
+    global _AUDIO_CLIP_SWEPT
+    now = time.time()
+    clip_id = uuid.uuid4().hex
+    if AUDIO_CLIP_DIR:
+        # Throttled here on the loop, so concurrent /turn calls do not all scan the directory
+        sweep = now - _AUDIO_CLIP_SWEPT >= AUDIO_CLIP_TTL_S / 4
+        if sweep:
+            _AUDIO_CLIP_SWEPT = now
+        await asyncio.to_thread(_write_audio_clip_file, clip_id, audio, fmt, sweep)
+        return clip_id
+    while AUDIO_CLIPS and (len(AUDIO_CLIPS) >= AUDIO_CLIP_MAX or next(iter(AUDIO_CLIPS.values()))["expires"] < now):
+        AUDIO_CLIPS.popitem(last=False)
+    AUDIO_CLIPS[clip_id] = {"audio": audio, "format": fmt, "expires": now + AUDIO_CLIP_TTL_S}
+    return clip_id
+
+async def _load_audio_clip(clip_id: str) -> Optional[Dict[str, Any]]:
+    if not AUDIO_CLIP_DIR:
+        clip = AUDIO_CLIPS.get(clip_id)
+        return clip if clip and clip["expires"] >= time.time() else None
+    if len(clip_id) != 32 or not all(c in "0123456789abcdef" for c in clip_id):
+        return None  # only our own ids reach the filesystem
+    return await asyncio.to_thread(_read_audio_clip_file, clip_id)
 
 # ============ MODELS ============
 class ChatRequest(BaseModel):
@@ -318,12 +506,31 @@ class STTResponse(BaseModel):
     confidence: float
     language: str
     processing_time_ms: int
+    # Only set when preprocessing trimmed/downsampled the clip before transcription
+    bytes_saved: Optional[int] = None
+    seconds_saved: Optional[float] = None
+
+class LidarEvent(BaseModel):
+    exhibit: str  # exhibit name, display name or keyword
+    dwell_s: float
+    ts: Optional[float] = None  # unix seconds; default: now
+    zone: Optional[str] = None
+    session_id: Optional[str] = None  # kiosk session the tracker paired this visitor with
+
+class LidarEventsRequest(BaseModel):
+    events: List[LidarEvent]
 
 class TTSRequest(BaseModel):
     text: str
     voice: Optional[str] = None
     format: Optional[str] = None 
 
+class TurnResponse(BaseModel):
+    transcript: str
+    reply_text: str
+    audio_url: str
+    processing_time_ms: int
+
 class HealthResponse(BaseModel):
     status: str
     service: str
@@ -331,65 +538,324 @@ class HealthResponse(BaseModel):
     timestamp: str
 
 # ============ ENDPOINTS ============
+_QUESTION_BANK_WATCHER: Optional["asyncio.Task[None]"] = None
+_LIDAR_TAIL: Optional["asyncio.Task[None]"] = None
+_ANALYTICS_INGEST: Optional["asyncio.Task[None]"] = None
+
 @app.on_event("startup")
 async def startup_event():
     logger.info("Starting Exhibit Feedback Chatbot API...")
     load_exhibit_questions()
+    if STT_PREPROCESS and not audio_preprocess.available():
+        logger.warning("STT_PREPROCESS=1 but NumPy is not installed: /stt and /turn forward clips unprocessed "
+                       "(pip install -r requirements-audio.txt)")
+    await asyncio.to_thread(TTS_CACHE.load)
+    FEEDBACK_WRITER.start()
+    global _QUESTION_BANK_WATCHER
+    if QUESTION_BANK_POLL_S > 0:
+        # Baseline taken now, so edits made before the task first runs are not missed
+        watcher = FileWatcher([QUESTION_BANK_SNAPSHOT] if QUESTION_BANK_SNAPSHOT else [QUESTIONS_PATH, config.__file__])
+        _QUESTION_BANK_WATCHER = asyncio.create_task(_watch_question_bank(watcher))
+    global _LIDAR_TAIL
+    if LIDAR_EVENTS_PATH:
+        _LIDAR_TAIL = asyncio.create_task(_tail_lidar_events(EventTail(LIDAR_EVENTS_PATH)))
+    global ANALYTICS, _ANALYTICS_INGEST
+    ANALYTICS = await asyncio.to_thread(FeedbackAnalytics, ANALYTICS_DB_PATH, FEEDBACK_LOG_PATH)
+    if ANALYTICS_INGEST_INTERVAL_S > 0:
+        _ANALYTICS_INGEST = asyncio.create_task(_ingest_analytics())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    for task in (_QUESTION_BANK_WATCHER, _LIDAR_TAIL, _ANALYTICS_INGEST):
+        if task is not None:
+            task.cancel()
+    PROFILER.stop()
+    await close_provider()
+    FEEDBACK_WRITER.stop()
+    await _session_io(SESSION_STORE.close)
+    if ANALYTICS is not None:
+        await asyncio.to_thread(ANALYTICS.close)  # waits for a running ingest
 
 @app.get("/", response_model=HealthResponse)
 async def root():
     return HealthResponse(status="healthy", service="App1", version="1.4.0", timestamp=datetime.now().isoformat())
 
+@app.get("/stats")
+async def stats_endpoint():
+    # Local decision counters; fallback_rate = share of decisions that still needed the LLM
+    provider = get_provider()
+    sessions = await _session_io(SESSION_STORE.stats)
+    # SQLite queries + log file stats: off the event loop like every other analytics call
+    analytics = await asyncio.to_thread(ANALYTICS.stats) if ANALYTICS is not None else None
+    return {"intent": INTENT_ENGINE.stats(), "choice_fast_path": CHOICE_ENGINE.stats(),
+            "answer_cache": ANSWER_CACHE.stats(),
+            "question_bank": {**QUESTION_BANK.stats(), **QUESTION_BANK_STATS, "watching": _QUESTION_BANK_WATCHER is not None},
+            "sessions": sessions, "feedback_log": FEEDBACK_WRITER.stats(),
+            "tts_cache": TTS_CACHE.stats(),
+            "llm": {**PROMPT_STATS.stats(), "prompt_prefix_tokens": PROMPTS.prefix_tokens},
+            "memory": memory_stats(), "prefetch": PREFETCH.stats(), "lidar": LIDAR.stats(),
+            "analytics": analytics,
+            "admission": {**ADMISSION.stats(), "session_locks": SESSION_LOCKS.stats(), "coalescing": TURNS.stats()},
+            "provider": {"backend": getattr(provider, "name", type(provider).__name__),
+                         **(provider.stats() if hasattr(provider, "stats") else {})}}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Prometheus text format: request / stage latency histograms, LLM calls and tokens, decision paths."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+def _require_profiler():
+    if not PROFILER_ALLOWED:
+        raise HTTPException(status_code=404, detail="Not Found")
+
+@app.post("/debug/profiler/start")
+async def profiler_start_endpoint(interval_ms: Optional[float] = None):
+    """Starts sampling the event loop thread (PROFILER_ALLOWED=1 only); restarting clears the samples."""
+    _require_profiler()
+    PROFILER.start(interval_ms)
+    return PROFILER.stats()
+
+@app.post("/debug/profiler/stop")
+async def profiler_stop_endpoint():
+    _require_profiler()
+    await asyncio.to_thread(PROFILER.stop)
+    return PROFILER.stats()
+
+@app.get("/debug/profiler", response_class=PlainTextResponse)
+async def profiler_endpoint(limit: Optional[int] = None):
+    """Collapsed stacks ("frame;frame count"), e.g. for flamegraph.pl or speedscope."""
+    _require_profiler()
+    return PlainTextResponse(PROFILER.collapsed(limit))
+
 @app.get("/start", response_model=StartResponse)
-async def start_endpoint(session_id: str):
-    # Reset session logic
-    if session_id in SESSION_STORE:
-        del SESSION_STORE[session_id]
-    
-    # 1. Short, engaging hooks (Randomized)
-    hooks = [
-        "Your feedback helps shape the future of this exhibition.",
-        "We use your thoughts to help researchers understand visitor experiences.",
-        "I'm collecting data to help developers improve their exhibit.",
-        "Your perspective helps us bridge the gap between data and people.",
-        "I am the digital memory of this space, learning from every visitor.",
-        "Your honest critique helps us make Data Spaces better for everyone."
-    ]
-    
-    # 2. Standard Instruction (Constant)
-    instruction = "Tap the button below and just say 'Yes' to begin."
-    
-    # 3. Combine them
-    reply = f"{random.choice(hooks)} {instruction}"
-    
-    # Save to history so the bot knows it started the convo
-    _append_message(session_id, "assistant", reply)
+async def start_endpoint(session_id: str, zone: Optional[str] = None):
+    # Hook + instruction (every combination is pre-synthesized by warm_tts_cache.py)
+    reply = f"{random.choice(START_HOOKS)} {START_INSTRUCTION}"
+
+    # A reset waits for a turn still running on the old conversation
+    async with SESSION_LOCKS.hold(session_id):
+        # Reset session logic
+        await _session_io(SESSION_STORE.delete, session_id)
+        PREFETCH.discard(session_id)
+
+        # Save to history so the bot knows it started the convo
+        s = await _get_session(session_id)
+        s.zone = zone  # kiosk location, picks the zone's LiDAR ranking
+        _push_message(s, Role.ASSISTANT, reply)
+        await _save_session(session_id, s)
+        _schedule_prefetch(session_id, s)
     
     return StartResponse(reply_text=reply)
 
+@app.post("/lidar/events")
+async def lidar_events_endpoint(request: LidarEventsRequest):
+    """Dwell-time events from the tracking system; unknown exhibits and non-positive dwell are rejected."""
+    if not LIDAR_EVENTS_PATH:
+        accepted = LIDAR.ingest_many((e.dict() for e in request.events), QUESTION_BANK.exhibit_for_alias)
+        return {"accepted": accepted, "rejected": len(request.events) - accepted}
+    # Shared event file: every worker's tail (this one included) ingests them within LIDAR_TAIL_INTERVAL_S
+    events = [v for e in request.events if (v := LIDAR.validate(e.dict(), QUESTION_BANK.exhibit_for_alias))]
+    await asyncio.to_thread(append_events, LIDAR_EVENTS_PATH, events)
+    return {"accepted": len(events), "rejected": len(request.events) - len(events)}
+
+@app.get("/lidar/ranking")
+async def lidar_ranking_endpoint(session_id: Optional[str] = None, zone: Optional[str] = None):
+    ranking = LIDAR.ranking(session_id, zone)
+    return {"ranking": [{"exhibit": name, "score": round(score, 2)} for name, score in ranking],
+            "suggestions": LIDAR.suggestions(session_id, zone)}
+
+def _analytics() -> FeedbackAnalytics:
+    if ANALYTICS is None:
+        raise HTTPException(status_code=503, detail="Analytics store not open")
+    return ANALYTICS
+
+@app.post("/analytics/ingest")
+async def analytics_ingest_endpoint():
+    """Ingests what the feedback log gained since the last run (also done every ANALYTICS_INGEST_INTERVAL_S)."""
+    store = _analytics()
+    lines = await asyncio.to_thread(store.ingest)
+    return {"lines": lines, **await asyncio.to_thread(store.stats)}
+
+@app.get("/analytics/overview")
+async def analytics_overview_endpoint(since: Optional[str] = None, until: Optional[str] = None):
+    """Event counts per exhibit and type; since/until are inclusive YYYY-MM-DD days."""
+    return await asyncio.to_thread(_analytics().overview, since, until)
+
+@app.get("/analytics/daily")
+async def analytics_daily_endpoint(exhibit: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None):
+    return {"days": await asyncio.to_thread(_analytics().daily, exhibit, since, until)}
+
+@app.get("/analytics/exhibits/{exhibit}")
+async def analytics_exhibit_endpoint(exhibit: str, since: Optional[str] = None, until: Optional[str] = None):
+    """Answers per question (within since/until) and all-time choice distributions."""
+    return await asyncio.to_thread(_analytics().exhibit, exhibit, since, until)
+
+@app.get("/analytics/questions/{question_id}")
+async def analytics_question_endpoint(question_id: str, recent: int = 20):
+    return await asyncio.to_thread(_analytics().question, question_id, max(0, min(recent, 200)))
+
 @app.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(request: ChatRequest):
-    s = _get_session(request.session_id)
+async def chat_endpoint(request: ChatRequest, idempotency_key: Optional[str] = Header(None)):
+    reply = await run_chat_turn(request.session_id, request.user_text, idempotency_key=idempotency_key)
+    return ChatResponse(reply_text=reply)
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(
+    request: ChatRequest,
+    audio: bool = True,
+    voice: Optional[str] = None,
+    format: Optional[str] = None,
+    idempotency_key: Optional[str] = Header(None),
+):
+    """
+    Server-Sent Events version of /chat. Emits `token` events while the reply is generated,
+    an `audio` event (base64) per finished sentence, and a final `done` event.
+    A duplicate of a running turn (or an Idempotency-Key retry) streams that turn's reply instead.
+    """
+    session_id = request.session_id
+    if audio:
+        format = _audio_format(format)
+    synthesize = (lambda text: synthesize_speech(text, voice, format)) if audio else None
+    key, ttl_s = turn_key("chat", session_id, request.user_text.encode(), idempotency_key)
+    existing = TURNS.lookup(key)
+    if existing is not None:
+        source = _replay(await asyncio.shield(existing))
+        return StreamingResponse(_sse_events(source, synthesize), media_type="text/event-stream",
+                                 headers={"Cache-Control": "no-cache"})
+
+    # The session lock is held until the stream has finished the turn (or failed / was dropped)
+    pending = TURNS.begin(key)
+    try:
+        await SESSION_LOCKS.acquire(session_id)
+    except BaseException as e:
+        TURNS.fail(key, pending, e)
+        raise
+    released = False
+
+    def release(error: Optional[BaseException] = None):
+        nonlocal released
+        if not released:
+            released = True
+            SESSION_LOCKS.release(session_id)
+            TURNS.fail(key, pending, error or ConnectionError("Chat stream closed before the reply finished"))
+
+    try:
+        turn = await _prepare_chat_turn(session_id, request.user_text)
+    except BaseException as e:
+        release(e)
+        raise
+    if turn["ready_reply"] is not None:
+        source = _replay(turn["ready_reply"])
+    else:
+        source = stream_llm(turn["system_prompt"], turn["history"], fallback=_fallback_reply(turn))
+
+    async def finish(reply: str):
+        await _finish_chat_turn(session_id, turn, reply, voice, format)
+        TURNS.finish(key, pending, reply, ttl_s)
+
+    async def events():
+        try:
+            async for event in _sse_events(source, synthesize, finish):
+                yield event
+        finally:
+            release()
+
+    # background runs on a client disconnect too, also when the generator never started
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"},
+                             background=BackgroundTask(release))
+
+async def _sse_events(source: AsyncIterator[str], synthesize, on_done=None) -> AsyncIterator[str]:
+    try:
+        async for event in speak_stream(source, synthesize):
+            if event["event"] == "done" and on_done is not None:
+                await on_done(event["reply_text"])
+            yield f"event: {event['event']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+    except Exception as e:
+        detail = e.detail if isinstance(e, HTTPException) else str(e)
+        logger.error(f"Chat stream failed: {detail}")
+        yield f"event: error\ndata: {json.dumps({'event': 'error', 'detail': detail})}\n\n"
+
+async def _replay(text: str) -> AsyncIterator[str]:
+    yield text
+
+async def run_chat_turn(session_id: str, user_text: str, voice: Optional[str] = None, fmt: Optional[str] = None,
+                        idempotency_key: Optional[str] = None) -> str:
+    """
+    One visitor turn: update state, pick the next question and generate the reply. Turns of one
+    session run one at a time; a duplicate (same text while the first is running, or a retry
+    with the same Idempotency-Key) gets the first one's reply without running again.
+    """
+    key, ttl_s = turn_key("chat", session_id, user_text.encode(), idempotency_key)
+    return await TURNS.run(key, ttl_s, lambda: _run_chat_turn(session_id, user_text, voice, fmt))
+
+async def _run_chat_turn(session_id: str, user_text: str, voice: Optional[str], fmt: Optional[str]) -> str:
+    async with SESSION_LOCKS.hold(session_id):
+        turn = await _prepare_chat_turn(session_id, user_text)
+        reply = turn["ready_reply"]
+        if reply is None:
+            with span("reply"):
+                reply = await call_llm(turn["system_prompt"], turn["history"], fallback=_fallback_reply(turn))
+        await _finish_chat_turn(session_id, turn, reply, voice, fmt)
+    return reply
+
+async def _prepare_chat_turn(session_id: str, user_text: str) -> Dict[str, Any]:
+    """Everything before the reply generation. Returns the system prompt, question plan and history."""
+    mark_turn()
+    with span("session_load"):
+        s = await _get_session(session_id)
+    answering_qid = s.last_qid
+    turn = await _plan_chat_turn(session_id, s, user_text)
+    with span("session_save"):
+        await _save_session(session_id, s)
+    turn["ready_reply"] = _choice_reply(turn, answering_qid)
+    if turn["ready_reply"] is not None:
+        record_path("choice_fast_path")
+    with span("prefetch_wait"):
+        prefetched = await _take_prefetched(session_id, s, turn, answering_qid, user_text)
+    if turn["ready_reply"] is None:
+        turn["ready_reply"] = prefetched
+        if prefetched is not None:
+            record_path("prefetch_reply")
+    if turn["ready_reply"] is None:
+        turn["ready_reply"] = _cached_answer_reply(turn, s, user_text)
+    turn["history"] = s.memory.history() if turn["ready_reply"] is None else []
+    return turn
+
+async def _plan_chat_turn(session_id: str, s: SessionState, user_text: str) -> Dict[str, Any]:
     transition_note = None
-    user_text = request.user_text
 
     # 1. Update History
-    _append_message(request.session_id, "user", user_text)
+    _push_message(s, Role.USER, user_text)
     
     # 2. Logging
-    if s["last_qid"] and s["last_qid"] not in ["select_exhibit", "ask_restart"]:
-        log_feedback_event({
-            "session_id": request.session_id,
-            "exhibit": s.get("selected_exhibit", "unknown"),
-            "question_id": s["last_qid"],
+    choice = None
+    if s.last_qid and s.last_qid not in ["select_exhibit", "ask_restart"]:
+        event = {
+            "session_id": session_id,
+            "exhibit": s.selected_exhibit,
+            "question_id": s.last_qid,
             "answer": user_text
-        })
+        }
+        # A plain pick of one of the declared choices is logged normalized (and may skip the LLM)
+        choice = CHOICE_ENGINE.match(s.last_qid, user_text)
+        if choice:
+            event["choice"] = choice
+        with span("feedback_log"):
+            log_feedback_event(event)
         
     # 3. Detect Switch
-    detected = detect_exhibit_from_text(user_text)
+    with span("detect"):
+        candidates = EXHIBIT_MATCHER.candidates(user_text)
+        detected, detected_score = candidates[0] if candidates else (None, 0.0)
+        # If Python missed the keyword, the local intent engine tries first (fuzzy + KB similarity)
+        needs_llm = False
+        if not detected and not s.selected_exhibit:
+            detected, needs_llm = INTENT_ENGINE.resolve_exhibit(user_text)
+            if detected:
+                logger.info(f"Intent engine detected exhibit: {detected}")
     # === NEW: LLM Fallback Detection (The Fix) ===
-    # If Python missed the keyword, let's ask the LLM to verify if an exhibit was mentioned.
-    if not detected and not s["selected_exhibit"]:
+    # Only when the intent engine is unsure, ask the LLM to verify if an exhibit was mentioned.
+    if needs_llm:
         # Quick prompt to classify the user's intent
         classification_prompt = f"""
         You are a classifier. 
@@ -401,12 +867,15 @@ async def chat_endpoint(request: ChatRequest):
         Output: Return ONLY the exact exhibit name. If unsure or no match, return "None".
         """
         # We reuse your existing call_llm function for consistency
-        suspected = call_llm(classification_prompt, [])
+        record_path("classifier_llm")
+        with span("classifier_llm"):
+            suspected = await call_llm(classification_prompt, [], fallback="None", purpose="classifier")
         
-        # Clean up response (remove punctuation/spaces)
-        suspected = suspected.strip().strip(".\"")
+        # Clean up response (remove punctuation/spaces); the alias index also accepts
+        # "sandbox" or a display name, not just the exact key
+        suspected = QUESTION_BANK.exhibit_for_alias(suspected.strip().strip(".\""))
         
-        if suspected in EXHIBITS:
+        if suspected:
             detected = suspected
             logger.info(f"LLM Fallback detected exhibit: {detected}")
     # ===============================================
@@ -417,32 +886,42 @@ async def chat_endpoint(request: ChatRequest):
         # Keywords that imply "I want to choose something else"
         nav_keywords = ["another", "other", "different", "something else", "review one", "switch"]
         if any(k in user_text.lower() for k in nav_keywords):
-            s["force_open_choice"] = True
+            s.force_open_choice = True
             logger.info("User explicitly asked to choose an exhibit.")
     # =======================================================
 
     # B. NEW: Intent Validation (The Fix for your issue)
     # If we have a current exhibit AND the detected one is different, check INTENT.
-    current_ex = s.get("selected_exhibit")
+    current_ex = s.selected_exhibit
     
     if current_ex and detected and detected != current_ex:
-        # Ask LLM if this is a real switch
-        validation_prompt = f"""
-        Context: The user is currently discussing '{current_ex}'.
-        User Input: "{request.user_text}"
-        Detected Keyword: Refers to '{detected}'.
-        Task: Determine if the user wants to SWITCH to '{detected}' or STAY on '{current_ex}' (referencing comparison).
-        Output: Return exactly "SWITCH" or "STAY".
-        """
-        decision = call_llm(validation_prompt, [])  # Pass empty history for speed
-        logger.info(f"Switch Validation: {decision}")
+        # Decide locally first; the answer options of the question being answered count as STAY cues
+        last_q = _find_question(current_ex, s.last_qid)
+        with span("switch_check"):
+            decision, needs_llm = INTENT_ENGINE.resolve_switch(
+                user_text, current_ex, detected, detected_score,
+                current_choices=(last_q or {}).get("choices", []),
+            )
+        if needs_llm:
+            # Ask LLM if this is a real switch
+            validation_prompt = f"""
+            Context: The user is currently discussing '{current_ex}'.
+            User Input: "{user_text}"
+            Detected Keyword: Refers to '{detected}'.
+            Task: Determine if the user wants to SWITCH to '{detected}' or STAY on '{current_ex}' (referencing comparison).
+            Output: Return exactly "SWITCH" or "STAY".
+            """
+            with span("switch_llm"):
+                decision = await call_llm(validation_prompt, [], fallback="STAY", purpose="switch")  # Pass empty history for speed
+        record_path("switch_llm" if needs_llm else "switch_local")
+        logger.info(f"Switch Validation: {decision} ({'llm' if needs_llm else 'local'})")
         
         if "stay" in decision.lower():
             # CASE: STAY
             # We ignore the new keyword, BUT we tell the LLM to acknowledge the choice.
             detected = current_ex 
             transition_note = (
-                f"The user mentioned '{request.user_text}' but we are sticking to '{current_ex}'. "
+                f"The user mentioned '{user_text}' but we are sticking to '{current_ex}'. "
                 "Start your reply with: 'Okay, let's stick to this exhibit for now...'"
             )
         else:
@@ -454,97 +933,358 @@ async def chat_endpoint(request: ChatRequest):
             )
 
     if detected:
-        if detected != s["selected_exhibit"]:
-            s["selected_exhibit"] = detected
-            s["selection_attempts"] = 0  # <--- NEW: Reset counter if they pick one!
-            log_feedback_event({"session_id": request.session_id, "type": "select", "exhibit": detected})
+        if detected != s.selected_exhibit:
+            s.selected_exhibit = detected
+            s.selection_attempts = 0  # <--- NEW: Reset counter if they pick one!
+            PREFETCH.discard(session_id)  # speculated for the previous exhibit
+            log_feedback_event({"session_id": session_id, "type": "select", "exhibit": detected})
     elif "overall" in user_text.lower():
-        s["selected_exhibit"] = "overall exhibition"
+        s.selected_exhibit = "overall exhibition"
 
-    s["turn_count"] += 1
+    s.turn_count += 1
 
     # 4. Closing Check
     forced_stop = any(x in user_text.lower() for x in ["bye", "stop", "exit", "quit"])
-    if s["turn_count"] > MAX_USER_TURNS or forced_stop:
+    if s.turn_count > MAX_USER_TURNS or forced_stop:
         prompt = build_unified_system_prompt("", None, None, is_closing=True)
-        reply = call_llm(prompt, s["messages"])
-        _append_message(request.session_id, "assistant", reply)
-        return ChatResponse(reply_text=reply)
+        return {"system_prompt": prompt, "plan": None}
 
     # 5. Get Next Question Logic
-    plan = get_next_question_logic(s)
+    with span("plan"):
+        plan = get_next_question_logic(s)
     
     # === NEW: Check for Forced Exit Logic ===
     if plan.get("end_conversation"):
         prompt = build_unified_system_prompt("", None, None, is_closing=True)
-        reply = call_llm(prompt, s["messages"])
-        _append_message(request.session_id, "assistant", reply)
-        return ChatResponse(reply_text=reply)
+        return {"system_prompt": prompt, "plan": None}
     # ========================================
 
     # 6. Generate Response
-    system_prompt = build_unified_system_prompt(
-        target_question=plan["text"],
-        current_exhibit=s.get("selected_exhibit"),
-        one_liner=plan["one_liner"],
-        is_closing=False,
-        transition_note=transition_note
-    )
-    
-    reply = call_llm(system_prompt, s["messages"])
-    
+    with span("prompt"):
+        system_prompt = build_unified_system_prompt(
+            target_question=plan["text"],
+            current_exhibit=s.selected_exhibit,
+            one_liner=plan["one_liner"],
+            is_closing=False,
+            transition_note=transition_note
+        )
+    return {"system_prompt": system_prompt, "plan": plan, "choice": choice, "switched": transition_note is not None}
+
+def _choice_reply(turn: Dict[str, Any], answered_qid: Optional[str]) -> Optional[str]:
+    """Acknowledgement + next question from templates when the answer was a plain choice."""
+    if not CHOICE_FAST_PATH or not turn.get("choice") or not turn["plan"] or turn.get("switched"):
+        return None
+    return CHOICE_ENGINE.reply(answered_qid, turn["choice"], turn["plan"]["text"])
+
+def _cached_answer_reply(turn: Dict[str, Any], s: SessionState, user_text: str) -> Optional[str]:
+    """A factual question answered before (same exhibit, same or near-identical wording) + this turn's question."""
+    if not turn["plan"] or turn.get("switched"):
+        return None
+    key = ANSWER_CACHE.key(s.selected_exhibit, user_text)
+    if key is None:
+        return None
+    answer = ANSWER_CACHE.get(key)
+    if answer is None:
+        # Stored by _finish_chat_turn into this cache, not into one installed by a reload meanwhile
+        turn["answer_cache"] = (ANSWER_CACHE, key)
+        return None
+    record_path("answer_cache")
+    return ANSWER_CACHE.reply(answer, turn["plan"]["text"])
+
+def _fallback_reply(turn: Dict[str, Any]) -> str:
+    """Canned reply when the LLM is down: the planned question as written, so the survey carries on."""
+    return turn["plan"]["text"] if turn["plan"] else CLOSING_FALLBACK_TEXT
+
+async def _finish_chat_turn(session_id: str, turn: Dict[str, Any], reply: str,
+                            voice: Optional[str] = None, fmt: Optional[str] = None):
+    s = await _get_session(session_id)
+    plan = turn["plan"]
+
     # 7. Update State
-    s["last_qid"] = plan["id"]
-    if plan["id"] not in ["select_exhibit", "ask_restart"]:
-        s["asked_qids"].add(plan["id"])
-    _append_message(request.session_id, "assistant", reply)
+    if plan:
+        s.last_qid = plan["id"]
+        if plan["id"] not in ["select_exhibit", "ask_restart"]:
+            s.mark_asked(plan["id"])
+    _push_message(s, Role.ASSISTANT, reply)
+    await _save_session(session_id, s)
+    if "answer_cache" in turn and reply != _fallback_reply(turn):
+        cache, key = turn["answer_cache"]
+        cache.put(key, reply)
+    if plan:
+        _schedule_prefetch(session_id, s, voice, fmt)
 
-    return ChatResponse(reply_text=reply)
+# ============ SPECULATIVE PREFETCH ============
+# Opt-in (SPECULATIVE_PREFETCH=1). Right after a reply, while it plays and the visitor records
+# the answer, the next turn is planned on a copy of the session: the next question's audio is
+# synthesized and, for choice questions, the reply to each declared choice is generated.
+PREFETCH = PrefetchSlots()
+
+def _schedule_prefetch(session_id: str, s: SessionState, voice: Optional[str] = None, fmt: Optional[str] = None):
+    """s: the session as just saved (the caller still holds its lock)."""
+    if not SPECULATIVE_PREFETCH:
+        return
+    if s.turn_count + 1 > MAX_USER_TURNS:
+        return  # the next turn is the closing one
+    # get_next_question_logic mutates counters and flags, so plan on a copy
+    shadow = s.copy()
+    shadow.turn_count += 1
+    plan = get_next_question_logic(shadow)
+    if plan.get("end_conversation"):
+        return
+    parts = build_unified_system_prompt(plan["text"], shadow.selected_exhibit, plan["one_liner"])
+    slot = PrefetchSlot(s.last_qid, plan, parts.delta)
+    slot.tasks.append(asyncio.create_task(_prefetch_audio(plan["text"], voice, fmt)))
+
+    question = _find_question(s.selected_exhibit, s.last_qid)
+    # With the choice fast path on, plain choice answers never reach the LLM anyway
+    if question and question.get("answer_type") == "choice" and not CHOICE_FAST_PATH:
+        history = s.memory.history()
+        for choice in question.get("choices", [])[:PREFETCH_MAX_CHOICES]:
+            key = normalize_answer(choice)
+            task = asyncio.create_task(
+                _prefetch_reply(slot, key, parts, history + [{"role": "user", "content": choice}], voice, fmt))
+            slot.replies[key] = task
+            slot.tasks.append(task)
+    PREFETCH.put(session_id, slot)
+
+async def _prefetch_audio(text: str, voice: Optional[str], fmt: Optional[str]):
+    try:
+        await synthesize_speech(text, voice, fmt)
+        PREFETCH.audio_prefetched += 1
+    except HTTPException as e:
+        logger.warning(f"Prefetch TTS failed: {e.detail}")
+
+async def _prefetch_reply(slot: PrefetchSlot, key: str, parts: PromptParts, history: List[Dict[str, str]],
+                          voice: Optional[str], fmt: Optional[str]) -> Optional[str]:
+    start = time.perf_counter()
+    reply = await call_llm(parts, history, fallback=None, purpose="prefetch")
+    if reply is None:
+        return None
+    slot.reply_s[key] = time.perf_counter() - start
+    slot.tasks.append(asyncio.create_task(_prefetch_audio(reply, voice, fmt)))
+    return reply
+
+async def _take_prefetched(session_id: str, s: SessionState, turn: Dict[str, Any],
+                           answering_qid: Optional[str], user_text: str) -> Optional[str]:
+    """The speculated reply if this turn planned exactly what the slot predicted, else None."""
+    slot = PREFETCH.take(session_id)
+    if slot is None:
+        return None
+    plan = turn["plan"]
+    if (plan is None or plan["id"] != slot.plan["id"] or slot.answering_qid != answering_qid
+            or turn["system_prompt"].delta != slot.delta):
+        PREFETCH.record_miss(slot)
+        return None
+    PREFETCH.record_hit()
+    task = slot.replies.get(normalize_answer(user_text))
+    if task is None or task.cancelled():
+        return None
+    start = time.perf_counter()
+    reply = await task
+    if reply is None:
+        return None
+    PREFETCH.record_reply_hit(slot.reply_s.get(normalize_answer(user_text), 0.0) - (time.perf_counter() - start))
+    logger.info(f"Prefetch hit for {session_id}: reply served without waiting for the LLM")
+    return reply
 
 # STT / TTS Endpoints
+def _upload_digest(audio_file: UploadFile) -> bytes:
+    """Content hash of an upload (read in chunks, left rewound), to recognise a re-sent recording."""
+    f, digest = audio_file.file, hashlib.blake2b(digest_size=16)
+    f.seek(0)
+    for chunk in iter(lambda: f.read(1 << 16), b""):
+        digest.update(chunk)
+    f.seek(0)
+    return digest.digest()
+
+async def transcribe_upload(
+    audio_file: UploadFile, language: str, preprocess: Optional[bool] = None
+) -> Tuple[str, Optional[PreprocessResult]]:
+    with span("stt_read"):
+        audio, info = open_upload(audio_file)
+    filename = os.path.basename(audio_file.filename or "") or "audio.wav"
+    if not os.path.splitext(filename)[1]:
+        filename += ".wav"  # the provider infers the format from the extension
+    content_type = audio_file.content_type or "audio/wav"
+
+    # Optional: trim silence, downmix and resample to 16 kHz (WAV only, needs NumPy)
+    prep = None
+    if preprocess and not audio_preprocess.available():
+        raise HTTPException(status_code=501, detail="STT preprocessing needs NumPy (pip install -r requirements-audio.txt)")
+    # STT_PREPROCESS=1 without NumPy was logged at startup; those clips go up unprocessed
+    if info is not None and (STT_PREPROCESS if preprocess is None else preprocess) and audio_preprocess.available():
+        with span("stt_preprocess"):
+            prep = await asyncio.to_thread(audio_preprocess.preprocess_wav, audio.read(), info)
+        if prep is not None:
+            if prep.speech_s < STT_MIN_DURATION_S:
+                raise HTTPException(status_code=422, detail="No speech detected")
+            # A buffer like the upload itself, so every backend gets the same (name, file, type) tuple
+            audio, filename, content_type = io.BytesIO(prep.audio), os.path.splitext(filename)[0] + ".wav", "audio/wav"
+        else:
+            audio.seek(0)
+
+    try:
+        # The in-memory upload buffer is streamed into the provider request: no temp file, no copy
+        with span("stt_provider"):
+            transcript = await get_provider().transcribe((filename, audio, content_type), language=language)
+    except ProviderUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ProviderTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return transcript, prep
+
+def static_tts_texts() -> List[str]:
+    """Every fixed line the kiosk may speak: /start replies, fixed prompts and all question texts."""
+    texts = [f"{hook} {START_INSTRUCTION}" for hook in START_HOOKS]
+    texts += [SELECT_EXPLICIT_TEXT, SELECT_GENERIC_TEXT, FORCE_END_TEXT, OVERALL_IMPROVE_TEXT,
+              ASK_RESTART_TEXT, EXHIBIT_DONE_TEXT, SELECT_NO_LIDAR_TEXT, LLM_FALLBACK_REPLY,
+              CLOSING_FALLBACK_TEXT]
+    for pack in EXHIBIT_QUESTIONS.values():
+        texts += [q["text"] for q in pack.get("questions", []) if q.get("text")]
+    texts += CHOICE_ENGINE.static_texts()
+    return list(dict.fromkeys(texts))
+
+# Content-addressed (text, voice, format, model) audio cache, shared on disk by all workers
+TTS_CACHE = TTSCache()
+# Identical misses arriving together (e.g. several kiosks on /start) share one provider call
+_TTS_INFLIGHT: Dict[str, "asyncio.Future[bytes]"] = {}
+
+async def _synthesize_cached(key: str, text: str, voice: str, fmt: str) -> bytes:
+    pending = _TTS_INFLIGHT.get(key)
+    if pending is not None:
+        return await asyncio.shield(pending)
+    pending = asyncio.get_running_loop().create_future()
+    _TTS_INFLIGHT[key] = pending
+    try:
+        try:
+            with span("tts_provider"):
+                audio = await get_provider().synthesize(text, voice=voice, fmt=fmt)
+        except ProviderUnavailable as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        except ProviderTimeout as e:
+            raise HTTPException(status_code=504, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        try:
+            await asyncio.to_thread(TTS_CACHE.put, key, fmt, audio)
+        except OSError as e:
+            logger.error(f"TTS cache write failed: {e}")
+        pending.set_result(audio)
+        return audio
+    except BaseException as e:
+        if isinstance(e, HTTPException):
+            pending.set_exception(e)
+            pending.exception()  # mark retrieved when nobody else was waiting
+        else:
+            pending.cancel()
+        raise
+    finally:
+        _TTS_INFLIGHT.pop(key, None)
+
+def tts_model() -> str:
+    """Part of the TTS cache key, so clips from different backends (e.g. PROVIDER=fake) never mix."""
+    return getattr(get_provider(), "tts_model", TTS_MODEL)
+
+def _audio_format(fmt: Optional[str]) -> str:
+    """The requested audio format, or 400: it becomes part of the cache key and of a file name."""
+    fmt = fmt or DEFAULT_AUDIO_FORMAT
+    if fmt not in AUDIO_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported audio format {fmt!r}; use one of {', '.join(AUDIO_MEDIA_TYPES)}")
+    return fmt
+
+async def synthesize_speech(text: str, voice: Optional[str] = None, fmt: Optional[str] = None) -> bytes:
+    voice, fmt = voice or DEFAULT_VOICE, _audio_format(fmt)
+    key = cache_key(text, voice, fmt, tts_model())
+    with span("tts_cache"):
+        audio = TTS_CACHE.get_memory(key)
+        if audio is None:
+            audio = await asyncio.to_thread(TTS_CACHE.read, key, fmt)
+    if audio is not None:
+        return audio
+    return await _synthesize_cached(key, text, voice, fmt)
+
 @app.post("/stt", response_model=STTResponse)
 async def stt_endpoint(
     session_id: str = Form("default_session"),
     language: str = Form("en"),
-    audio_file: UploadFile = File(..., description="WAV audio file")
+    preprocess: Optional[bool] = Form(None),
+    audio_file: UploadFile = File(..., description="WAV audio file"),
+    idempotency_key: Optional[str] = Header(None),
 ):
     start = time.time()
-    suffix = os.path.splitext(audio_file.filename or "audio.wav")[1] or ".wav"
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        audio_bytes = await audio_file.read()
-        tmp.write(audio_bytes)
-        tmp_path = tmp.name
+    # A re-sent recording (retry, double tap) shares the running transcription
+    key, ttl_s = turn_key(f"stt:{language}", session_id, _upload_digest(audio_file), idempotency_key)
+    transcript, prep = await TURNS.run(key, ttl_s, lambda: transcribe_upload(audio_file, language, preprocess))
+    ms = int((time.time() - start) * 1000)
+    saved = {"bytes_saved": prep.bytes_saved, "seconds_saved": round(prep.seconds_saved, 3)} if prep else {}
+    return STTResponse(transcript=transcript, confidence=1.0, language=language, processing_time_ms=ms, **saved)
 
-    try:
-        with open(tmp_path, "rb") as f:
-            tr = client.audio.transcriptions.create(
-                model=os.getenv("OPENAI_STT_MODEL", "gpt-4o-mini-transcribe"),
-                file=f,
-                language=language
-            )
-        ms = int((time.time() - start) * 1000)
-        return STTResponse(transcript=(tr.text or "").strip(), confidence=1.0, language=language, processing_time_ms=ms)
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        try: os.remove(tmp_path)
-        except: pass
+async def _tts_response(http_request: Request, text: str, voice: Optional[str], fmt: Optional[str]) -> Response:
+    text = (text or "").strip()
+    if not text: raise HTTPException(status_code=400, detail="Missing text")
+    voice, fmt = voice or DEFAULT_VOICE, _audio_format(fmt)
+    key = cache_key(text, voice, fmt, tts_model())
+    # Same text/voice/format/model -> same bytes, so clients may keep the clip indefinitely
+    headers = {"ETag": f'"{key}"', "Cache-Control": f"public, max-age={TTS_CACHE_MAX_AGE_S}, immutable"}
+    if headers["ETag"] in http_request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    media_type = AUDIO_MEDIA_TYPES[fmt]
+
+    with span("tts_cache"):
+        audio = TTS_CACHE.get_memory(key)
+        path = await asyncio.to_thread(TTS_CACHE.get_path, key, fmt) if audio is None else None
+    if audio is None:
+        if path is not None:
+            return FileResponse(path, media_type=media_type, headers=headers)
+        audio = await _synthesize_cached(key, text, voice, fmt)
+    return Response(content=audio, media_type=media_type, headers=headers)
 
 @app.post("/tts")
-async def tts_endpoint(request: TTSRequest):
-    text = (request.text or "").strip()
-    if not text: raise HTTPException(status_code=400, detail="Missing text")
-    try:
-        audio = client.audio.speech.create(
-            model=os.getenv("OPENAI_TTS_MODEL", "gpt-4o-mini-tts"),
-            voice=request.voice or "coral",
-            input=text,
-            response_format=request.format or "mp3"
-        )
-        audio_bytes = audio if isinstance(audio, (bytes, bytearray)) else audio.read()
-        return Response(content=audio_bytes, media_type="audio/mpeg")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+async def tts_endpoint(request: TTSRequest, http_request: Request):
+    return await _tts_response(http_request, request.text, request.voice, request.format)
+
+# Cacheable variant for clients/proxies that only cache GETs
+@app.get("/tts")
+async def tts_get_endpoint(http_request: Request, text: str, voice: Optional[str] = None, format: Optional[str] = None):
+    return await _tts_response(http_request, text, voice, format)
+
+# Single-shot voice turn: STT -> chat -> TTS in one request
+@app.post("/turn", response_model=TurnResponse)
+async def turn_endpoint(
+    session_id: str = Form(...),
+    language: str = Form("en"),
+    voice: Optional[str] = Form(None),
+    format: Optional[str] = Form(None),
+    preprocess: Optional[bool] = Form(None),
+    audio_file: UploadFile = File(..., description="WAV audio file"),
+    idempotency_key: Optional[str] = Header(None),
+):
+    start = time.time()
+    fmt = _audio_format(format)  # before any work: the reply audio is synthesized last
+    key, ttl_s = turn_key(f"stt:{language}", session_id, _upload_digest(audio_file), idempotency_key)
+    transcript, _ = await TURNS.run(key, ttl_s, lambda: transcribe_upload(audio_file, language, preprocess))
+    if not transcript:
+        raise HTTPException(status_code=422, detail="No speech detected")
+
+    reply = await run_chat_turn(session_id, transcript, voice, fmt, idempotency_key)
+    clip_id = await _store_audio_clip(await synthesize_speech(reply, voice, fmt), fmt)
+
+    ms = int((time.time() - start) * 1000)
+    return TurnResponse(
+        transcript=transcript,
+        reply_text=reply,
+        audio_url=f"/audio/{clip_id}",
+        processing_time_ms=ms,
+    )
+
+@app.get("/audio/{clip_id}")
+async def audio_endpoint(clip_id: str):
+    clip = await _load_audio_clip(clip_id)
+    if clip is None:
+        raise HTTPException(status_code=404, detail="Audio clip expired or unknown")
+    return Response(content=clip["audio"], media_type=AUDIO_MEDIA_TYPES.get(clip["format"], "application/octet-stream"))
 
 if __name__ == "__main__":
     import uvicorn
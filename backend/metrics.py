@@ -0,0 +1,287 @@
+# metrics.py
+# Lightweight request tracing and Prometheus-style metrics: span() times a stage of the current
+# request (keyword detection, classifier call, reply, TTS, ...) into a per-stage histogram and
+# the request's Server-Timing header; counters/histograms are rendered as text on /metrics.
+# An optional sampling profiler can be switched on at runtime (collapsed stacks, flamegraph-ready).
+
+import bisect
+import contextvars
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# ============ CONFIGURATION ============
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1").lower() in ("1", "true", "yes")
+SERVER_TIMING = os.getenv("SERVER_TIMING", "1").lower() in ("1", "true", "yes")
+# The /debug/profiler endpoints exist only when this is set (the kiosk network is not trusted)
+PROFILER_ALLOWED = os.getenv("PROFILER_ALLOWED", "0").lower() in ("1", "true", "yes")
+PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "5"))
+PROFILER_MAX_STACKS = int(os.getenv("PROFILER_MAX_STACKS", "20000"))
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 4, 6)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, str]) -> Labels:
+    return tuple(sorted(labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels, extra: str = "") -> str:
+    parts = [f'{k}="{_escape(str(v))}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+# ---------- Registry ----------
+class CounterMetric:
+    def __init__(self, name: str, help_text: str):
+        self.name, self.help = name, help_text
+        self.values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = _labels(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_format_labels(k)} {v:g}" for k, v in sorted(self.values.items())]
+        return lines
+
+
+class HistogramMetric:
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name, self.help = name, help_text
+        self.buckets = tuple(buckets)
+        self.series: Dict[Labels, List[float]] = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels: str):
+        key = _labels(labels)
+        row = self.series.get(key)
+        if row is None:
+            row = self.series[key] = [0.0] * (len(self.buckets) + 2)
+        idx = bisect.bisect_left(self.buckets, value)
+        if idx < len(self.buckets):
+            row[idx] += 1  # cumulated when rendering
+        row[-2] += value
+        row[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, row in sorted(self.series.items()):
+            cumulative = 0.0
+            for bound, n in zip(self.buckets, row):
+                cumulative += n
+                le = 'le="%g"' % bound
+                lines.append(f"{self.name}_bucket{_format_labels(key, le)} {cumulative:g}")
+            inf = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_format_labels(key, inf)} {row[-1]:g}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {row[-2]:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {row[-1]:g}")
+        return lines
+
+
+REQUEST_SECONDS = HistogramMetric("kiosk_http_request_seconds", "HTTP request latency until the response is sent")
+STAGE_SECONDS = HistogramMetric("kiosk_stage_seconds", "Time spent per request stage")
+LLM_CALLS_PER_TURN = HistogramMetric("kiosk_llm_calls_per_turn", "LLM calls made by one chat turn", COUNT_BUCKETS)
+LLM_CALLS = CounterMetric("kiosk_llm_calls_total", "LLM calls by purpose and outcome (ok / fallback)")
+LLM_TOKENS = CounterMetric("kiosk_llm_tokens_total", "LLM tokens reported by the provider (input / cached / output)")
+PATHS = CounterMetric("kiosk_path_total", "Decision paths taken (LLM fallbacks, fast paths, canned replies)")
+REGISTRY = (REQUEST_SECONDS, STAGE_SECONDS, LLM_CALLS_PER_TURN, LLM_CALLS, LLM_TOKENS, PATHS)
+
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+# ---------- Tracing ----------
+class Trace:
+    """Stages of one request, in completion order."""
+
+    __slots__ = ("start", "spans", "llm_calls", "turn")
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.spans: List[Tuple[str, float]] = []
+        self.llm_calls = 0
+        self.turn = False  # set by chat turns, so LLM calls per turn are only observed for them
+
+    def server_timing(self) -> str:
+        parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.spans]
+        parts.append(f"total;dur={(time.perf_counter() - self.start) * 1000:.1f}")
+        return ", ".join(parts)
+
+
+_TRACE: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("trace", default=None)
+
+
+def current_trace() -> Optional[Trace]:
+    return _TRACE.get()
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Times a stage of the current request; works around sync and async code alike."""
+    if not METRICS_ENABLED:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - t0
+        STAGE_SECONDS.observe(seconds, stage=stage)
+        trace = _TRACE.get()
+        if trace is not None:
+            trace.spans.append((stage, seconds))
+
+
+def mark_turn():
+    trace = _TRACE.get()
+    if trace is not None:
+        trace.turn = True
+
+
+def record_llm_call(purpose: str, ok: bool, usage: Optional[Dict[str, int]] = None):
+    if not METRICS_ENABLED:
+        return
+    LLM_CALLS.inc(purpose=purpose, outcome="ok" if ok else "fallback")
+    for kind in ("input_tokens", "cached_tokens", "output_tokens"):
+        if usage and usage.get(kind):
+            LLM_TOKENS.inc(usage[kind], kind=kind.replace("_tokens", ""))
+    trace = _TRACE.get()
+    if trace is not None:
+        trace.llm_calls += 1
+
+
+def record_path(path: str):
+    if METRICS_ENABLED:
+        PATHS.inc(path=path)
+
+
+def _route_template(scope) -> str:
+    if "endpoint" not in scope:
+        return "unmatched"  # 404s: do not turn arbitrary paths into label values
+    path = scope["path"]
+    for name, value in scope.get("path_params", {}).items():
+        path = path.replace(str(value), "{" + name + "}")
+    return path
+
+
+class MetricsMiddleware:
+    """
+    Opens a Trace per HTTP request, adds Server-Timing (stages finished before the response
+    starts; a stream's later stages only reach the histograms) and records request latency.
+    """
+
+    def __init__(self, app, skip_paths: Sequence[str] = ("/metrics",)):
+        self.app = app
+        self.skip_paths = set(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED or scope["path"] in self.skip_paths:
+            return await self.app(scope, receive, send)
+        trace = Trace()
+        token = _TRACE.set(trace)
+        status = 500
+
+        async def timed_send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if SERVER_TIMING:
+                    message = {**message, "headers": list(message.get("headers", [])) +
+                               [(b"server-timing", trace.server_timing().encode("latin-1"))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            _TRACE.reset(token)
+            REQUEST_SECONDS.observe(time.perf_counter() - trace.start, route=_route_template(scope),
+                                    method=scope["method"], status=str(status))
+            if trace.turn:
+                LLM_CALLS_PER_TURN.observe(trace.llm_calls)
+
+
+# ---------- Sampling profiler ----------
+class SamplingProfiler:
+    """
+    Samples the event-loop thread's stack every interval from a background thread and counts
+    collapsed stacks ("file:func;file:func N", the input format of flamegraph.pl / speedscope).
+    Costs one sys._current_frames() per sample, nothing while stopped.
+    """
+
+    def __init__(self, max_stacks: int = PROFILER_MAX_STACKS):
+        self.max_stacks = max_stacks
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.dropped = 0
+        self.interval_s = PROFILER_INTERVAL_MS / 1000
+        self.started_at: Optional[float] = None
+        self._target: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval_ms: Optional[float] = None, target_thread: Optional[int] = None):
+        if self.running:
+            return
+        if interval_ms:
+            self.interval_s = max(0.001, interval_ms / 1000)
+        self._target = target_thread or threading.get_ident()
+        self.stacks.clear()
+        self.samples = self.dropped = 0
+        self.started_at = time.time()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self._target)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            stack = ";".join(reversed(names))
+            if stack in self.stacks or len(self.stacks) < self.max_stacks:
+                self.stacks[stack] += 1
+            else:
+                self.dropped += 1
+            self.samples += 1
+
+    def collapsed(self, limit: Optional[int] = None) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common(limit))
+
+    def stats(self) -> Dict[str, object]:
+        return {"running": self.running, "interval_ms": self.interval_s * 1000, "samples": self.samples,
+                "stacks": len(self.stacks), "dropped": self.dropped, "started_at": self.started_at}
+
+
+PROFILER = SamplingProfiler()
@@ -0,0 +1,114 @@
+# prefetch.py
+# Speculative prefetch: while the visitor is still recording, the next turn's static parts
+# (next question audio, replies to the declared choices) are rendered into a per-session slot.
+
+import asyncio
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+# ============ CONFIGURATION ============
+SPECULATIVE_PREFETCH = os.getenv("SPECULATIVE_PREFETCH", "0").lower() in ("1", "true", "yes")
+PREFETCH_MAX_CHOICES = int(os.getenv("PREFETCH_MAX_CHOICES", "4"))
+PREFETCH_MAX_SLOTS = int(os.getenv("PREFETCH_MAX_SLOTS", "1024"))
+# A slot older than this is stale (the visitor walked away mid-answer)
+PREFETCH_TTL_S = float(os.getenv("PREFETCH_TTL_S", "60"))
+
+_NON_WORD = re.compile(r"[^\w\s]")
+
+
+def normalize_answer(text: str) -> str:
+    return " ".join(_NON_WORD.sub(" ", text.lower()).split())
+
+
+class PrefetchSlot:
+    """
+    What the server expects the next turn to look like: the question being
+    answered, the planned next question with its prompt delta, and one reply task per choice.
+    """
+
+    def __init__(self, answering_qid: Optional[str], plan: Dict[str, Any], delta: str):
+        self.answering_qid = answering_qid
+        self.plan = plan
+        self.delta = delta
+        self.replies: Dict[str, "asyncio.Task[Optional[str]]"] = {}  # normalized choice -> reply
+        self.reply_s: Dict[str, float] = {}  # normalized choice -> generation time
+        self.tasks: List["asyncio.Task[Any]"] = []
+        self.created = time.monotonic()
+
+    def cancel(self):
+        for task in self.tasks:
+            task.cancel()
+
+
+class PrefetchSlots:
+    """
+    One slot per session, LRU-bounded. Slots hold running tasks, so they stay in this process
+    and are not part of the (possibly shared) session store; with several workers a slot only
+    hits when the same worker serves the turn. take() removes the slot either way.
+    """
+
+    def __init__(self, max_slots: int = PREFETCH_MAX_SLOTS, ttl_s: float = PREFETCH_TTL_S):
+        self.max_slots = max_slots
+        self.ttl_s = ttl_s
+        self._slots: "OrderedDict[str, PrefetchSlot]" = OrderedDict()
+        self.started = 0
+        self.discarded = 0
+        self.turns = 0  # turns that found a slot
+        self.hits = 0  # the turn planned exactly what the slot predicted
+        self.misses = 0
+        self.reply_hits = 0  # ...and its reply came from the slot (no LLM wait)
+        self.saved_s = 0.0
+        self.audio_prefetched = 0
+
+    def put(self, session_id: str, slot: PrefetchSlot):
+        self.discard(session_id)
+        self._slots[session_id] = slot
+        self.started += 1
+        while len(self._slots) > self.max_slots:
+            _, old = self._slots.popitem(last=False)
+            old.cancel()
+            self.discarded += 1
+
+    def discard(self, session_id: str):
+        """Drop the slot, e.g. when the visitor switches exhibits or restarts."""
+        slot = self._slots.pop(session_id, None)
+        if slot is not None:
+            slot.cancel()
+            self.discarded += 1
+
+    def take(self, session_id: str) -> Optional[PrefetchSlot]:
+        slot = self._slots.pop(session_id, None)
+        if slot is None:
+            return None
+        if time.monotonic() - slot.created > self.ttl_s:
+            slot.cancel()
+            self.discarded += 1
+            return None
+        self.turns += 1
+        return slot
+
+    def record_hit(self):
+        self.hits += 1
+
+    def record_reply_hit(self, saved_s: float):
+        self.reply_hits += 1
+        self.saved_s += max(0.0, saved_s)
+
+    def record_miss(self, slot: PrefetchSlot):
+        self.misses += 1
+        slot.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": SPECULATIVE_PREFETCH, "slots": len(self._slots), "started": self.started,
+            "discarded": self.discarded, "turns": self.turns, "hits": self.hits, "misses": self.misses,
+            "reply_hits": self.reply_hits,
+            "hit_rate": round(self.hits / self.turns, 4) if self.turns else 0.0,
+            "reply_hit_rate": round(self.reply_hits / self.turns, 4) if self.turns else 0.0,
+            "saved_ms_total": round(self.saved_s * 1000, 1),
+            "saved_ms_per_turn": round(self.saved_s * 1000 / self.turns, 1) if self.turns else 0.0,
+            "audio_prefetched": self.audio_prefetched,
+        }
@@ -0,0 +1,125 @@
+# prompts.py
+# Prompt-template engine for the interview LLM call. Everything that never changes between turns
+# (persona, exhibition knowledge, rules, example) is rendered once per question-bank load into a
+# byte-stable prefix; each turn only adds a short delta at the very end, so the provider's prompt
+# cache can reuse the prefix (and the conversation so far) across turns and sessions.
+
+import hashlib
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token for English; good enough for budgets and logging
+    return (len(text) + 3) // 4
+
+
+# Rule and example text is the original per-turn prompt's, verbatim; only the order changed (the
+# parts that vary per turn moved to the delta). Edits here change what the model is told.
+PERSONA = """You are the embodied subconscious of the 'Data Spaces' exhibition. 
+Your goal is to collect specific feedback from the visitor."""
+
+KNOWLEDGE_HEADER = "Global Exhibition Knowledge (Use this to answer factual questions):"
+
+INTERVIEW_RULES = """When the Current Status is ACTIVE INTERVIEW:
+INSTRUCTIONS:
+1. **Answer First:** If the user asked a question (e.g., "How does it work?"), answer it clearly using the 'Global Exhibition Knowledge' above.
+2. **Transition Immediately:** After answering, you MUST ask the Target Question given in the final system message.
+3. **Negative Constraints:** - Do NOT ask "Do you want to know more?"
+   - Do NOT ask "Is there anything else?"
+   - Do NOT ask "Does that make sense?"
+   - ONLY ask the Target Question.
+
+Example Interaction:
+User: "What is Faces?"
+You: "Faces uses LiDAR sensors to track your eyes. Did seeing that feel playful or creepy?" 
+(Notice how you answered, then immediately pivoted to the feedback question)."""
+
+CLOSING_RULES = """When the Current Status is CONVERSATION ENDING:
+Task:
+1. Review the conversation history.
+2. Generate a 2-sentence closing.
+   - If they gave feedback, summarize it ("Thanks for your thoughts on the VR").
+   - If not, just say thanks.
+3. End politely. Do NOT ask any new questions."""
+
+
+class PromptParts(NamedTuple):
+    prefix: str  # identical for every turn of every session (until the question bank changes)
+    delta: str  # this turn only: topic, status, target question, transition
+
+    def messages(self, history: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        # Static prefix, then the (append-only) conversation, then the per-turn delta, so the
+        # longest possible leading part of the input repeats byte-for-byte between calls
+        return [{"role": "system", "content": self.prefix}, *history, {"role": "system", "content": self.delta}]
+
+
+class PromptTemplates:
+    """Built by load_exhibit_questions(); render() only formats the per-turn delta."""
+
+    def __init__(self, global_kb: str):
+        self.prefix = "\n\n".join((PERSONA, f"{KNOWLEDGE_HEADER}\n{global_kb}", INTERVIEW_RULES, CLOSING_RULES))
+        self.prefix_tokens = estimate_tokens(self.prefix)
+        # Routes requests sharing this prefix to the same provider cache shard
+        self.cache_key = "data-spaces-" + hashlib.sha256(self.prefix.encode("utf-8")).hexdigest()[:16]
+
+    def render(
+        self,
+        target_question: str,
+        current_exhibit: Optional[str],
+        is_closing: bool = False,
+        transition_note: Optional[str] = None,
+    ) -> PromptParts:
+        # Same wording as the per-turn part of the original prompt
+        lines = [f"Context:\n- Current Topic: {current_exhibit if current_exhibit else 'General (No exhibit selected)'}\n"]
+        if is_closing:
+            lines.append("Current Status: CONVERSATION ENDING.")
+        else:
+            lines.append("Current Status: ACTIVE INTERVIEW.\n")
+            lines.append(f'Your Mandatory Goal:\nYou MUST get an answer to this specific question: \n>>> "{target_question}"')
+            if transition_note:
+                lines.append(f"\n**SPECIAL TRANSITION:** {transition_note}")
+        return PromptParts(self.prefix, "\n".join(lines))
+
+
+class PromptStats:
+    """Per-call input/cached token counts and latency, logged and aggregated for /stats."""
+
+    def __init__(self):
+        self.calls = 0
+        self.input_tokens = 0
+        self.cached_tokens = 0
+        self.estimated_calls = 0  # provider reported no usage; input tokens estimated locally
+        self.ttft_ms_total = 0.0
+        self.ttft_calls = 0
+
+    def record(self, kind: str, messages: List[Dict[str, str]], usage: Dict[str, int],
+               latency_s: float, ttft_s: Optional[float] = None):
+        if "input_tokens" in usage:
+            input_tokens, cached = usage["input_tokens"], usage.get("cached_tokens", 0)
+        else:
+            input_tokens, cached = sum(estimate_tokens(m["content"]) for m in messages), 0
+            self.estimated_calls += 1
+        self.calls += 1
+        self.input_tokens += input_tokens
+        self.cached_tokens += cached
+        if ttft_s is not None:
+            self.ttft_ms_total += ttft_s * 1000
+            self.ttft_calls += 1
+        ratio = cached / input_tokens if input_tokens else 0.0
+        ttft = f" ttft_ms={ttft_s * 1000:.0f}" if ttft_s is not None else ""
+        logger.info(f"LLM {kind}: input_tokens={input_tokens} cached_tokens={cached} "
+                    f"cached_ratio={ratio:.2f} latency_ms={latency_s * 1000:.0f}{ttft}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "input_tokens": self.input_tokens,
+            "cached_tokens": self.cached_tokens,
+            "cached_ratio": round(self.cached_tokens / self.input_tokens, 4) if self.input_tokens else 0.0,
+            "avg_input_tokens": round(self.input_tokens / self.calls, 1) if self.calls else 0.0,
+            "avg_ttft_ms": round(self.ttft_ms_total / self.ttft_calls, 1) if self.ttft_calls else None,
+            "estimated_calls": self.estimated_calls,
+        }
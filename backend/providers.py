@@ -0,0 +1,427 @@
+# providers.py
+# Async provider layer: every LLM / STT / TTS round trip goes through here so the FastAPI
+# event loop is never blocked by a slow model call. Backends: OpenAI, a local
+# OpenAI-compatible server (offline galleries) and a deterministic in-process fake.
+
+import asyncio
+import io
+import logging
+import os
+import random
+import wave
+import zlib
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# ============ CONFIGURATION ============
+# Backend: "openai", "local" (OpenAI-compatible server, e.g. llama.cpp / vLLM / Ollama +
+# a Whisper/TTS server) or "fake" (in-process, no network, for load tests and CI)
+PROVIDER = os.getenv("PROVIDER", "openai").lower()
+
+MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+STT_MODEL = os.getenv("OPENAI_STT_MODEL", "gpt-4o-mini-transcribe")
+TTS_MODEL = os.getenv("OPENAI_TTS_MODEL", "gpt-4o-mini-tts")
+
+# Max in-flight calls per operation (protects the provider + our own pool)
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "16"))
+STT_CONCURRENCY = int(os.getenv("STT_CONCURRENCY", "8"))
+TTS_CONCURRENCY = int(os.getenv("TTS_CONCURRENCY", "8"))
+
+# Per-call deadlines in seconds (queueing for a slot is not counted)
+LLM_TIMEOUT_S = float(os.getenv("LLM_TIMEOUT_S", "20"))
+STT_TIMEOUT_S = float(os.getenv("STT_TIMEOUT_S", "30"))
+TTS_TIMEOUT_S = float(os.getenv("TTS_TIMEOUT_S", "30"))
+# Wrap the provider in retries / hedging / circuit breaker (see resilience.py)
+PROVIDER_RESILIENCE = os.getenv("PROVIDER_RESILIENCE", "1").lower() in ("1", "true", "yes")
+
+# Shared HTTP connection pool for all three operations
+HTTP_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "64"))
+
+# Local backend: the LLM goes through /chat/completions (what local servers implement)
+LOCAL_BASE_URL = os.getenv("LOCAL_BASE_URL", "http://127.0.0.1:8080/v1")
+LOCAL_API_KEY = os.getenv("LOCAL_API_KEY", "local")
+LOCAL_LLM_MODEL = os.getenv("LOCAL_LLM_MODEL", "local-llm")
+LOCAL_STT_MODEL = os.getenv("LOCAL_STT_MODEL", "whisper-1")
+LOCAL_TTS_MODEL = os.getenv("LOCAL_TTS_MODEL", "tts-1")
+
+# Fake backend: latency per call as "const:MS", "uniform:MIN_MS:MAX_MS" or "lognormal:MEDIAN_MS:SIGMA"
+FAKE_LLM_LATENCY = os.getenv("FAKE_LLM_LATENCY", "lognormal:800:0.35")
+FAKE_STT_LATENCY = os.getenv("FAKE_STT_LATENCY", "lognormal:400:0.3")
+FAKE_TTS_LATENCY = os.getenv("FAKE_TTS_LATENCY", "lognormal:300:0.3")
+FAKE_TOKEN_MS = float(os.getenv("FAKE_TOKEN_MS", "15"))  # between streamed words
+FAKE_SEED = int(os.getenv("FAKE_SEED", "0"))
+
+
+class ProviderError(Exception):
+    """Raised when a provider call fails."""
+
+
+class ProviderTimeout(ProviderError):
+    """Raised when a provider call exceeds its deadline."""
+
+
+def _cache_kwargs(cache_key: Optional[str]) -> Dict[str, str]:
+    # Requests with the same key and prefix are routed to the same prompt-cache shard
+    return {"prompt_cache_key": cache_key} if cache_key else {}
+
+
+def _fill_usage(usage: Optional[Dict[str, int]], reported: Any):
+    if usage is None or reported is None:
+        return
+    usage["input_tokens"] = reported.input_tokens
+    usage["output_tokens"] = reported.output_tokens
+    details = getattr(reported, "input_tokens_details", None)
+    usage["cached_tokens"] = getattr(details, "cached_tokens", 0) or 0
+
+
+class OpenAIProvider:
+    """
+    Pooled AsyncOpenAI client with a concurrency limit and a deadline per operation.
+    """
+
+    name = "openai"
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        llm_concurrency: int = LLM_CONCURRENCY,
+        stt_concurrency: int = STT_CONCURRENCY,
+        tts_concurrency: int = TTS_CONCURRENCY,
+        base_url: Optional[str] = None,
+        llm_model: str = MODEL,
+        stt_model: str = STT_MODEL,
+        tts_model: str = TTS_MODEL,
+    ):
+        self.llm_model, self.stt_model, self.tts_model = llm_model, stt_model, tts_model
+        self.client = AsyncOpenAI(
+            api_key=api_key or os.getenv("OPENAI_API_KEY"),
+            base_url=base_url,  # None: OPENAI_BASE_URL or the public API
+            max_retries=0,  # deadlines are enforced here, not by silent SDK retries
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+                )
+            ),
+        )
+        self._limits = {
+            "llm": asyncio.Semaphore(llm_concurrency),
+            "stt": asyncio.Semaphore(stt_concurrency),
+            "tts": asyncio.Semaphore(tts_concurrency),
+        }
+        self._timeouts = {"llm": LLM_TIMEOUT_S, "stt": STT_TIMEOUT_S, "tts": TTS_TIMEOUT_S}
+
+    async def _run(self, op: str, coro):
+        async with self._limits[op]:
+            try:
+                return await asyncio.wait_for(coro, timeout=self._timeouts[op])
+            except asyncio.TimeoutError:
+                raise ProviderTimeout(f"{op} call exceeded {self._timeouts[op]}s")
+
+    # ---------- Operations ----------
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        max_output_tokens: int,
+        temperature: float = 0.7,
+        usage: Optional[Dict[str, int]] = None,
+        cache_key: Optional[str] = None,
+    ) -> str:
+        """usage (optional) is filled with input/cached/output token counts."""
+        resp = await self._run("llm", self.client.responses.create(
+            model=self.llm_model,
+            input=messages,
+            max_output_tokens=max_output_tokens,
+            temperature=temperature,
+            **_cache_kwargs(cache_key),
+        ))
+        _fill_usage(usage, resp.usage)
+        return (resp.output_text or "").strip()
+
+    async def stream_complete(
+        self,
+        messages: List[Dict[str, str]],
+        max_output_tokens: int,
+        temperature: float = 0.7,
+        usage: Optional[Dict[str, int]] = None,
+        cache_key: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """Yields text deltas as the model produces them. The deadline covers the whole stream."""
+        async with self._limits["llm"]:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self._timeouts["llm"]
+            try:
+                stream = await asyncio.wait_for(self.client.responses.create(
+                    model=self.llm_model,
+                    input=messages,
+                    max_output_tokens=max_output_tokens,
+                    temperature=temperature,
+                    stream=True,
+                    **_cache_kwargs(cache_key),
+                ), timeout=self._timeouts["llm"])
+                events = stream.__aiter__()
+                while True:
+                    try:
+                        event = await asyncio.wait_for(events.__anext__(), timeout=max(0.0, deadline - loop.time()))
+                    except StopAsyncIteration:
+                        break
+                    if event.type == "response.output_text.delta":
+                        yield event.delta
+                    elif event.type == "response.completed":
+                        _fill_usage(usage, event.response.usage)
+            except asyncio.TimeoutError:
+                raise ProviderTimeout(f"llm stream exceeded {self._timeouts['llm']}s")
+
+    async def transcribe(self, file: Any, language: str) -> str:
+        tr = await self._run("stt", self.client.audio.transcriptions.create(
+            model=self.stt_model,
+            file=file,
+            language=language,
+        ))
+        return (tr.text or "").strip()
+
+    async def synthesize(self, text: str, voice: str, fmt: str) -> bytes:
+        audio = await self._run("tts", self.client.audio.speech.create(
+            model=self.tts_model,
+            voice=voice,
+            input=text,
+            response_format=fmt,
+        ))
+        return audio if isinstance(audio, (bytes, bytearray)) else audio.read()
+
+    async def aclose(self):
+        await self.client.close()
+
+
+def _fill_chat_usage(usage: Optional[Dict[str, int]], reported: Any):
+    if usage is None or reported is None:
+        return
+    usage["input_tokens"] = reported.prompt_tokens
+    usage["output_tokens"] = reported.completion_tokens
+    details = getattr(reported, "prompt_tokens_details", None)
+    usage["cached_tokens"] = getattr(details, "cached_tokens", 0) or 0
+
+
+class LocalProvider(OpenAIProvider):
+    """
+    OpenAI-compatible server on the gallery network (llama.cpp, vLLM or Ollama for the LLM,
+    a Whisper / TTS server for audio). Same pooling and deadlines as OpenAIProvider; the LLM
+    goes through /chat/completions because few local servers implement /responses.
+    """
+
+    name = "local"
+
+    def __init__(self, base_url: str = LOCAL_BASE_URL, api_key: str = LOCAL_API_KEY, **kwargs):
+        kwargs.setdefault("llm_model", LOCAL_LLM_MODEL)
+        kwargs.setdefault("stt_model", LOCAL_STT_MODEL)
+        kwargs.setdefault("tts_model", LOCAL_TTS_MODEL)
+        super().__init__(api_key=api_key, base_url=base_url, **kwargs)
+
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        max_output_tokens: int,
+        temperature: float = 0.7,
+        usage: Optional[Dict[str, int]] = None,
+        cache_key: Optional[str] = None,
+    ) -> str:
+        """cache_key is not sent: local servers reuse a matching prompt prefix on their own."""
+        resp = await self._run("llm", self.client.chat.completions.create(
+            model=self.llm_model,
+            messages=messages,
+            max_tokens=max_output_tokens,
+            temperature=temperature,
+        ))
+        _fill_chat_usage(usage, resp.usage)
+        return (resp.choices[0].message.content or "").strip() if resp.choices else ""
+
+    async def stream_complete(
+        self,
+        messages: List[Dict[str, str]],
+        max_output_tokens: int,
+        temperature: float = 0.7,
+        usage: Optional[Dict[str, int]] = None,
+        cache_key: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        async with self._limits["llm"]:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self._timeouts["llm"]
+            try:
+                stream = await asyncio.wait_for(self.client.chat.completions.create(
+                    model=self.llm_model,
+                    messages=messages,
+                    max_tokens=max_output_tokens,
+                    temperature=temperature,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                ), timeout=self._timeouts["llm"])
+                chunks = stream.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout=max(0.0, deadline - loop.time()))
+                    except StopAsyncIteration:
+                        break
+                    _fill_chat_usage(usage, chunk.usage)
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            except asyncio.TimeoutError:
+                raise ProviderTimeout(f"llm stream exceeded {self._timeouts['llm']}s")
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """"const:800", "uniform:400:1200" or "lognormal:800:0.35" (ms) -> sampler returning seconds."""
+    kind, _, rest = spec.strip().partition(":")
+    try:
+        args = [float(x) for x in rest.split(":")] if rest else []
+    except ValueError:
+        args = []
+    if kind == "const" and len(args) == 1:
+        return lambda rng: args[0] / 1000
+    if kind == "uniform" and len(args) == 2:
+        return lambda rng: rng.uniform(args[0], args[1]) / 1000
+    if kind == "lognormal" and len(args) == 2:
+        return lambda rng: args[0] * rng.lognormvariate(0.0, args[1]) / 1000
+    raise ValueError(f"bad latency spec {spec!r} (const:MS, uniform:MIN_MS:MAX_MS or lognormal:MEDIAN_MS:SIGMA)")
+
+
+FAKE_REPLIES = [
+    "That's great to hear. What did you like most about it?",
+    "Thanks, that helps a lot. Was anything confusing or hard to use?",
+    "Interesting! How long did you spend there?",
+    "Good to know. Would you recommend it to a friend?",
+]
+FAKE_TRANSCRIPTS = ["I liked the sandbox", "It was fun", "The colours were great", "A bit confusing", "Yes"]
+
+
+class FakeProvider:
+    """
+    In-process stand-in for load tests and CI: no network, replies picked by a hash of the
+    input (same request -> same reply), latencies drawn from a seeded distribution per
+    operation. Audio is silence: a real WAV for fmt="wav", zero bytes otherwise.
+    """
+
+    name = "fake"
+    llm_model, stt_model, tts_model = "fake-llm", "fake-stt", "fake-tts"
+
+    def __init__(
+        self,
+        llm_latency: str = FAKE_LLM_LATENCY,
+        stt_latency: str = FAKE_STT_LATENCY,
+        tts_latency: str = FAKE_TTS_LATENCY,
+        token_ms: float = FAKE_TOKEN_MS,
+        seed: int = FAKE_SEED,
+    ):
+        self._latency = {"llm": parse_latency(llm_latency), "stt": parse_latency(stt_latency),
+                         "tts": parse_latency(tts_latency)}
+        self._rng = {op: random.Random(f"{seed}:{op}") for op in self._latency}
+        self._limits = {
+            "llm": asyncio.Semaphore(LLM_CONCURRENCY),
+            "stt": asyncio.Semaphore(STT_CONCURRENCY),
+            "tts": asyncio.Semaphore(TTS_CONCURRENCY),
+        }
+        self.token_s = token_ms / 1000
+        self.calls = {op: 0 for op in self._latency}
+
+    async def _wait(self, op: str):
+        self.calls[op] += 1
+        await asyncio.sleep(self._latency[op](self._rng[op]))
+
+    @staticmethod
+    def _reply(messages: List[Dict[str, str]]) -> str:
+        last = messages[-1]["content"] if messages else ""
+        return FAKE_REPLIES[zlib.crc32(last.encode("utf-8")) % len(FAKE_REPLIES)]
+
+    @staticmethod
+    def _fill_usage(usage: Optional[Dict[str, int]], messages: List[Dict[str, str]], reply: str):
+        if usage is not None:
+            usage["input_tokens"] = sum(len(m["content"]) for m in messages) // 4
+            usage["output_tokens"] = len(reply) // 4
+            usage["cached_tokens"] = 0
+
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        max_output_tokens: int,
+        temperature: float = 0.7,
+        usage: Optional[Dict[str, int]] = None,
+        cache_key: Optional[str] = None,
+    ) -> str:
+        async with self._limits["llm"]:
+            await self._wait("llm")
+        reply = self._reply(messages)
+        self._fill_usage(usage, messages, reply)
+        return reply
+
+    async def stream_complete(
+        self,
+        messages: List[Dict[str, str]],
+        max_output_tokens: int,
+        temperature: float = 0.7,
+        usage: Optional[Dict[str, int]] = None,
+        cache_key: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        async with self._limits["llm"]:
+            await self._wait("llm")
+            reply = self._reply(messages)
+            for i, word in enumerate(reply.split(" ")):
+                if i:
+                    await asyncio.sleep(self.token_s)
+                yield word if i == 0 else " " + word
+        self._fill_usage(usage, messages, reply)
+
+    async def transcribe(self, file: Any, language: str) -> str:
+        # (name, file or bytes, content type) like the OpenAI client accepts, or the bare file / bytes
+        content = file[1] if isinstance(file, tuple) else file
+        data = bytes(content) if isinstance(content, (bytes, bytearray)) else content.read()
+        async with self._limits["stt"]:
+            await self._wait("stt")
+        return FAKE_TRANSCRIPTS[zlib.crc32(data) % len(FAKE_TRANSCRIPTS)]
+
+    async def synthesize(self, text: str, voice: str, fmt: str) -> bytes:
+        async with self._limits["tts"]:
+            await self._wait("tts")
+        frames = 16 * 60 * len(text)  # ~60 ms of 16 kHz audio per character
+        if fmt != "wav":
+            return b"\x00" * (frames * 2)
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(16000)
+            w.writeframes(b"\x00\x00" * frames)
+        return buf.getvalue()
+
+    async def aclose(self):
+        pass
+
+
+# ============ ACTIVE PROVIDER ============
+PROVIDERS = {"openai": OpenAIProvider, "local": LocalProvider, "fake": FakeProvider}
+_provider: Optional[Any] = None
+
+def make_provider(name: str):
+    if name not in PROVIDERS:
+        raise ValueError(f"PROVIDER must be one of {', '.join(PROVIDERS)}, got {name!r}")
+    return PROVIDERS[name]()
+
+def get_provider():
+    global _provider
+    if _provider is None:
+        _provider = make_provider(PROVIDER)
+        if PROVIDER_RESILIENCE:
+            from resilience import ResilientProvider  # resilience imports the errors from here
+            _provider = ResilientProvider(_provider)
+    return _provider
+
+async def close_provider() -> None:
+    if _provider is not None:
+        await _provider.aclose()
+
+def set_provider(provider) -> None:
+    """Swap the active provider (used by benchmarks to inject a local mock; not wrapped)."""
+    global _provider
+    _provider = provider
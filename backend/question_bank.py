@@ -0,0 +1,269 @@
+# question_bank.py
+# Validated, indexed question bank: exhibit_questions.json + KEYWORD_MAPPING are loaded into an
+# immutable snapshot with precomputed lookups, and a file watcher lets the server swap in a new
+# snapshot when either file changes, without a restart.
+
+import hashlib
+import importlib
+import json
+import os
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from pydantic import BaseModel, ValidationError, validator
+
+# ============ CONFIGURATION ============
+QUESTIONS_PATH = os.getenv("EXHIBIT_QUESTIONS_PATH", "data/exhibit_questions.json")
+# How often the watcher stats the question bank and config.py (0 disables hot reload)
+QUESTION_BANK_POLL_S = float(os.getenv("QUESTION_BANK_POLL_S", "2.0"))
+# Set by serve.py: workers load the supervisor's validated snapshot instead of validating the JSON themselves
+QUESTION_BANK_SNAPSHOT = os.getenv("QUESTION_BANK_SNAPSHOT", "")
+
+
+class QuestionBankError(ValueError):
+    """The question bank (or keyword mapping) failed validation; the current snapshot stays live."""
+
+
+# ---------- Schema ----------
+class QuestionSchema(BaseModel):
+    id: str
+    text: str
+    answer_type: str = "open"
+    choices: List[str] = []
+
+    @validator("id", "text")
+    def _not_blank(cls, v):
+        if not v.strip():
+            raise ValueError("must not be empty")
+        return v
+
+    @validator("answer_type")
+    def _known_type(cls, v):
+        if v not in ("open", "choice"):
+            raise ValueError("must be 'open' or 'choice'")
+        return v
+
+    @validator("choices", always=True)
+    def _choices_for_choice(cls, v, values):
+        if values.get("answer_type") == "choice" and not v:
+            raise ValueError("a choice question needs at least one choice")
+        return v
+
+
+class ExhibitSchema(BaseModel):
+    display_name: Optional[str] = None
+    one_liner: Optional[str] = None
+    questions: List[QuestionSchema]
+    ack_templates: Optional[List[str]] = None
+
+    class Config:
+        extra = "allow"  # room for per-exhibit settings the server does not read yet
+
+
+def validate_bank(raw: Any, keyword_mapping: Mapping[str, str], exhibit_names: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """Schema + cross-reference checks. Returns the packs as plain dicts, raises QuestionBankError."""
+    if not isinstance(raw, dict):
+        raise QuestionBankError("exhibit_questions.json must be an object of exhibit name -> pack")
+    packs: Dict[str, Dict[str, Any]] = {}
+    seen: Dict[str, str] = {}
+    for name, pack in raw.items():
+        try:
+            packs[name] = ExhibitSchema.parse_obj(pack).dict(exclude_none=True)
+        except ValidationError as e:
+            raise QuestionBankError(f"{name}: {e}") from None
+        for q in packs[name]["questions"]:
+            if q["id"] in seen:
+                raise QuestionBankError(f"{name}: question id {q['id']!r} already used by {seen[q['id']]}")
+            seen[q["id"]] = name
+    known = set(packs) | set(exhibit_names)
+    for keyword, exhibit in keyword_mapping.items():
+        if not isinstance(keyword, str) or not isinstance(exhibit, str):
+            raise QuestionBankError(f"KEYWORD_MAPPING entries must be strings: {keyword!r} -> {exhibit!r}")
+        if exhibit not in known:
+            raise QuestionBankError(f"KEYWORD_MAPPING: {keyword!r} points to unknown exhibit {exhibit!r}")
+    return packs
+
+
+# ---------- Question ids ----------
+class QuestionIds:
+    """
+    Process-wide interning of question ids to bit positions, so the questions a session was
+    asked fit in one int bitmask. Append-only: an id keeps its bit across hot reloads, a removed
+    question's bit is just never set again. Bits are per process; stored sessions keep the ids.
+    """
+
+    def __init__(self):
+        self._bits: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._lock = threading.Lock()  # interning also happens on the reload thread
+
+    def bit(self, qid: str) -> int:
+        bit = self._bits.get(qid)
+        if bit is None:
+            with self._lock:
+                bit = self._bits.get(qid)
+                if bit is None:
+                    bit = self._bits[qid] = 1 << len(self._ids)
+                    self._ids.append(qid)
+        return bit
+
+    def mask(self, qids: Iterable[str]) -> int:
+        mask, bits = 0, self._bits
+        for qid in qids:
+            mask |= bits.get(qid) or self.bit(qid)
+        return mask
+
+    def ids(self, mask: int) -> List[str]:
+        ids, i = [], 0
+        while mask:
+            if mask & 1:
+                ids.append(self._ids[i])
+            mask >>= 1
+            i += 1
+        return ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+QUESTION_IDS = QuestionIds()
+
+
+# ---------- Snapshot ----------
+class QuestionBank:
+    """
+    One immutable version of the question bank. Built off the request path, then installed
+    with a single swap, so a turn never sees half of an old and half of a new bank. Sessions
+    only hold exhibit names and question ids, so they carry over to the next snapshot.
+    """
+
+    def __init__(self, packs: Dict[str, Dict[str, Any]], keyword_mapping: Mapping[str, str],
+                 exhibit_names: Iterable[str], version: int = 0, content_hash: str = ""):
+        self.version = version
+        self.content_hash = content_hash
+        self.loaded_at = time.time()
+        self.exhibits: Mapping[str, Dict[str, Any]] = MappingProxyType(packs)
+        self.keyword_mapping: Mapping[str, str] = MappingProxyType(dict(keyword_mapping))
+
+        questions: Dict[str, Dict[str, Any]] = {}
+        owner: Dict[str, str] = {}
+        order: Dict[str, Tuple[str, ...]] = {}
+        bits: Dict[str, Tuple[Tuple[int, Dict[str, Any]], ...]] = {}
+        for name, pack in packs.items():
+            order[name] = tuple(q["id"] for q in pack["questions"])
+            bits[name] = tuple((QUESTION_IDS.bit(q["id"]), q) for q in pack["questions"])
+            for q in pack["questions"]:
+                questions[q["id"]] = q
+                owner[q["id"]] = name
+        self.questions: Mapping[str, Dict[str, Any]] = MappingProxyType(questions)  # qid -> question
+        self.question_exhibit: Mapping[str, str] = MappingProxyType(owner)  # qid -> exhibit
+        self.exhibit_qids: Mapping[str, Tuple[str, ...]] = MappingProxyType(order)  # exhibit -> ordered qids
+        self._exhibit_bits = MappingProxyType(bits)  # exhibit -> ordered (QUESTION_IDS bit, question)
+
+        aliases: Dict[str, str] = {k.lower(): v for k, v in keyword_mapping.items()}
+        for name in exhibit_names:
+            aliases[name.lower()] = name
+        for name, pack in packs.items():
+            aliases[name.lower()] = name
+            if pack.get("display_name"):
+                aliases[pack["display_name"].lower()] = name
+        self.aliases: Mapping[str, str] = MappingProxyType(aliases)  # alias -> exhibit
+
+        # Knowledge base lines for the LLM, so it knows what "Faces" or "Sandbox" actually is
+        self.kb = "\n".join(f"- {name}: {pack.get('one_liner', 'An interactive display.')}" for name, pack in packs.items())
+
+    def question(self, qid: Optional[str], exhibit: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        q = self.questions.get(qid or "")
+        if q is None or (exhibit is not None and self.question_exhibit[q["id"]] != exhibit):
+            return None
+        return q
+
+    def next_question(self, exhibit: str, asked: int) -> Optional[Dict[str, Any]]:
+        """First question of the exhibit whose QUESTION_IDS bit is not set in asked."""
+        for bit, q in self._exhibit_bits.get(exhibit, ()):
+            if not asked & bit:
+                return q
+        return None
+
+    def exhibit_for_alias(self, alias: str) -> Optional[str]:
+        return self.aliases.get(" ".join(alias.lower().split()))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version, "content_hash": self.content_hash, "loaded_at": self.loaded_at,
+            "exhibits": len(self.exhibits), "questions": len(self.questions), "aliases": len(self.aliases),
+        }
+
+
+def load_question_bank(path: str, exhibit_names: Iterable[str], version: int = 0,
+                       reload_config: bool = False) -> QuestionBank:
+    """Read, validate and index the bank. reload_config re-imports config.py for KEYWORD_MAPPING edits."""
+    import config
+    if reload_config:
+        config = importlib.reload(config)
+    with open(path, "rb") as f:
+        data = f.read()
+    try:
+        raw = json.loads(data)
+    except ValueError as e:
+        raise QuestionBankError(f"{path}: {e}") from None
+    exhibit_names = list(exhibit_names)
+    packs = validate_bank(raw, config.KEYWORD_MAPPING, exhibit_names)
+    digest = hashlib.sha256(data + repr(sorted(config.KEYWORD_MAPPING.items())).encode("utf-8")).hexdigest()[:12]
+    return QuestionBank(packs, config.KEYWORD_MAPPING, exhibit_names, version=version, content_hash=digest)
+
+
+# ---------- Shared snapshot (multi-process serving) ----------
+def write_snapshot(bank: QuestionBank, exhibit_names: Iterable[str], path: str):
+    """Writes a validated bank for the workers; os.replace, so a worker reads either the old or the new file."""
+    data = json.dumps({
+        "version": bank.version, "content_hash": bank.content_hash, "exhibit_names": list(exhibit_names),
+        "keyword_mapping": dict(bank.keyword_mapping), "packs": {name: pack for name, pack in bank.exhibits.items()},
+    }, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def load_snapshot(path: str) -> QuestionBank:
+    """
+    Reads a snapshot written by write_snapshot: validated once by the supervisor, loaded by each worker
+    (parse + index, no schema pass); version is the supervisor's.
+    """
+    with open(path, "rb") as f:
+        raw = json.loads(f.read())
+    return QuestionBank(raw["packs"], raw["keyword_mapping"], raw["exhibit_names"],
+                        version=raw["version"], content_hash=raw["content_hash"])
+
+
+# ---------- Watching ----------
+class FileWatcher:
+    """Polls (mtime, size) of a few files; changed() is true once per edit. Cheap enough to run every second."""
+
+    def __init__(self, paths: Iterable[str]):
+        self.paths = list(paths)
+        self._signature = self._stat()
+
+    def _stat(self) -> List[Optional[Tuple[int, int]]]:
+        sig = []
+        for path in self.paths:
+            try:
+                st = os.stat(path)
+                sig.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                sig.append(None)
+        return sig
+
+    def changed(self) -> bool:
+        sig = self._stat()
+        if sig == self._signature:
+            return False
+        self._signature = sig
+        return True
@@ -0,0 +1,327 @@
+# resilience.py
+# Resilience wrapper for the provider layer: an overall deadline per operation, bounded retries
+# with exponential backoff + full jitter, optional hedged LLM requests and a circuit breaker
+# per operation, shared by /chat, /stt and /tts.
+
+import asyncio
+import logging
+import os
+import random
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional
+
+import httpx
+import openai
+
+from providers import TTS_MODEL, ProviderError, ProviderTimeout
+
+logger = logging.getLogger(__name__)
+
+# ============ CONFIGURATION ============
+# Extra attempts after the first one (only for timeouts, 429, 5xx and connection errors)
+PROVIDER_RETRIES = int(os.getenv("PROVIDER_RETRIES", "2"))
+PROVIDER_BACKOFF_BASE_S = float(os.getenv("PROVIDER_BACKOFF_BASE_S", "0.25"))
+PROVIDER_BACKOFF_MAX_S = float(os.getenv("PROVIDER_BACKOFF_MAX_S", "4"))
+# Whole operation including retries and backoff; each attempt also has its own
+# LLM/STT/TTS_TIMEOUT_S in the provider
+LLM_DEADLINE_S = float(os.getenv("LLM_DEADLINE_S", "30"))
+STT_DEADLINE_S = float(os.getenv("STT_DEADLINE_S", "45"))
+TTS_DEADLINE_S = float(os.getenv("TTS_DEADLINE_S", "45"))
+# Hedged LLM calls: a second request once the first is slower than the recent p95. Only for calls
+# that ask for it (complete(..., hedge=True)): the visitor-facing reply, not classifier/prefetch calls
+PROVIDER_HEDGE = os.getenv("PROVIDER_HEDGE", "0").lower() in ("1", "true", "yes")
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+HEDGE_DEFAULT_DELAY_S = float(os.getenv("HEDGE_DEFAULT_DELAY_S", "2.0"))
+# Circuit breaker: open after this many failed operations in a row, probe again after the cooldown
+BREAKER_FAILURES = int(os.getenv("BREAKER_FAILURES", "5"))
+BREAKER_COOLDOWN_S = float(os.getenv("BREAKER_COOLDOWN_S", "15"))
+
+
+class ProviderUnavailable(ProviderError):
+    """The circuit breaker is open: the provider is failing, calls are refused without trying."""
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (ProviderTimeout, openai.APIConnectionError, httpx.TransportError)):
+        return True  # timeouts, resets, refused connections
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code == 429 or exc.status_code >= 500
+    return False
+
+
+def backoff_delay(attempt: int, base_s: float = PROVIDER_BACKOFF_BASE_S, cap_s: float = PROVIDER_BACKOFF_MAX_S,
+                  exc: Optional[BaseException] = None) -> float:
+    """Full jitter: uniform in [0, min(cap, base * 2^attempt)], but at least a 429's Retry-After."""
+    delay = random.uniform(0, min(cap_s, base_s * (2 ** attempt)))
+    response = getattr(exc, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            delay = max(delay, min(cap_s, float(retry_after)))
+        except ValueError:
+            pass
+    return delay
+
+
+class LatencyWindow:
+    """Recent successful latencies; p95() is the hedging delay."""
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+
+    def add(self, seconds: float):
+        self._samples.append(seconds)
+
+    def p95(self) -> Optional[float]:
+        if len(self._samples) < HEDGE_MIN_SAMPLES:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failures` failed operations in a row; open -> half-open after the
+    cooldown, letting a single probe through; the probe's outcome closes or re-opens it.
+    """
+
+    def __init__(self, failures: int = BREAKER_FAILURES, cooldown_s: float = BREAKER_COOLDOWN_S):
+        self.failures = failures
+        self.cooldown_s = cooldown_s
+        self.state = "closed"
+        self._consecutive = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self.opens = 0
+        self.short_circuits = 0
+
+    def allow(self) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and time.monotonic() - self._opened_at >= self.cooldown_s:
+            self.state = "half_open"
+        if self.state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        self.short_circuits += 1
+        return False
+
+    def record_success(self):
+        self._consecutive = 0
+        self._probing = False
+        self.state = "closed"
+
+    def record_failure(self):
+        self._consecutive += 1
+        if self.state == "half_open" or self._consecutive >= self.failures:
+            if self.state != "open":
+                self.opens += 1
+            self.state = "open"
+            self._opened_at = time.monotonic()
+        self._probing = False
+
+    def release(self):
+        """The operation ended without a verdict on provider health (e.g. a 400 or a cancel)."""
+        self._probing = False
+
+
+class ResilientProvider:
+    """
+    Same interface as OpenAIProvider, wrapping any such provider (or a mock). Only failures that
+    say something about the provider's health are retried and count towards the breaker; a 400
+    goes straight back to the caller.
+    """
+
+    def __init__(self, inner: Any, retries: int = PROVIDER_RETRIES, hedge: bool = PROVIDER_HEDGE):
+        self.inner = inner
+        self.retries = retries
+        self.hedge = hedge
+        self.deadlines = {"llm": LLM_DEADLINE_S, "stt": STT_DEADLINE_S, "tts": TTS_DEADLINE_S}
+        self.breakers = {op: CircuitBreaker() for op in self.deadlines}
+        self.latency = {op: LatencyWindow() for op in self.deadlines}
+        self.counters = {op: {"calls": 0, "failures": 0, "retries": 0, "hedges": 0, "hedge_wins": 0}
+                         for op in self.deadlines}
+
+    @property
+    def name(self) -> str:
+        return getattr(self.inner, "name", type(self.inner).__name__)
+
+    @property
+    def tts_model(self) -> str:
+        return getattr(self.inner, "tts_model", TTS_MODEL)
+
+    # ---------- Core ----------
+    async def _call(self, op: str, attempt_fn: Callable[[], Awaitable[Any]]) -> Any:
+        breaker = self.breakers[op]
+        counters = self.counters[op]
+        counters["calls"] += 1
+        if not breaker.allow():
+            raise ProviderUnavailable(f"{op} provider unavailable (circuit open)")
+        try:
+            result = await asyncio.wait_for(self._retry(op, attempt_fn), timeout=self.deadlines[op])
+        except asyncio.TimeoutError:
+            counters["failures"] += 1
+            breaker.record_failure()
+            raise ProviderTimeout(f"{op} call exceeded its {self.deadlines[op]}s deadline (incl. retries)")
+        except Exception as e:
+            if is_retryable(e):
+                counters["failures"] += 1
+                breaker.record_failure()
+            else:
+                breaker.release()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        breaker.record_success()
+        return result
+
+    async def _retry(self, op: str, attempt_fn: Callable[[], Awaitable[Any]]) -> Any:
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            try:
+                result = await attempt_fn()
+            except Exception as e:
+                if not is_retryable(e) or attempt >= self.retries:
+                    raise
+                delay = backoff_delay(attempt, exc=e)
+                attempt += 1
+                self.counters[op]["retries"] += 1
+                logger.warning(f"{op} attempt {attempt} failed ({type(e).__name__}: {e}); retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+                continue
+            self.latency[op].add(time.perf_counter() - start)
+            return result
+
+    async def _hedged(self, op: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Start `call`; if it is slower than the recent p95, start a second one and take the first success."""
+        delay = self.latency[op].p95()
+        first = asyncio.ensure_future(call())
+        try:
+            done, _ = await asyncio.wait({first}, timeout=HEDGE_DEFAULT_DELAY_S if delay is None else delay)
+        except BaseException:
+            first.cancel()
+            raise
+        if done:
+            return first.result()
+        self.counters[op]["hedges"] += 1
+        second = asyncio.ensure_future(call())
+        pending = {first, second}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is second:
+                            self.counters[op]["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    # ---------- Operations ----------
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        max_output_tokens: int,
+        temperature: float = 0.7,
+        usage: Optional[Dict[str, int]] = None,
+        cache_key: Optional[str] = None,
+        hedge: bool = False,
+    ) -> str:
+        """hedge=True: this call may send a second request when slow (if hedging is enabled at all)."""
+        async def once(slot: Dict[str, int]) -> str:
+            return await self.inner.complete(messages, max_output_tokens, temperature, usage=slot, cache_key=cache_key)
+
+        async def attempt() -> str:
+            if not (hedge and self.hedge):
+                return await once(usage if usage is not None else {})
+            # Each hedged request fills its own usage dict; only the winner's is reported
+            slots: List[Dict[str, int]] = []
+
+            async def tracked():
+                slot: Dict[str, int] = {}
+                slots.append(slot)
+                return slot, await once(slot)
+
+            slot, reply = await self._hedged("llm", tracked)
+            if usage is not None:
+                usage.update(slot)
+            return reply
+
+        return await self._call("llm", attempt)
+
+    async def stream_complete(
+        self,
+        messages: List[Dict[str, str]],
+        max_output_tokens: int,
+        temperature: float = 0.7,
+        usage: Optional[Dict[str, int]] = None,
+        cache_key: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """Retried only until the first delta arrives; after that a failure goes to the caller."""
+        breaker = self.breakers["llm"]
+        counters = self.counters["llm"]
+        counters["calls"] += 1
+        if not breaker.allow():
+            raise ProviderUnavailable("llm provider unavailable (circuit open)")
+        attempt = 0
+        started = False
+        try:
+            while True:
+                try:
+                    async for delta in self.inner.stream_complete(
+                        messages, max_output_tokens, temperature, usage=usage, cache_key=cache_key
+                    ):
+                        started = True
+                        yield delta
+                    break
+                except Exception as e:
+                    if started or not is_retryable(e) or attempt >= self.retries:
+                        raise
+                    delay = backoff_delay(attempt, exc=e)
+                    attempt += 1
+                    counters["retries"] += 1
+                    await asyncio.sleep(delay)
+        except Exception as e:
+            if is_retryable(e):
+                counters["failures"] += 1
+                breaker.record_failure()
+            else:
+                breaker.release()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+        breaker.record_success()
+
+    async def transcribe(self, file: Any, language: str) -> str:
+        async def attempt() -> str:
+            # (filename, buffer, content_type): every attempt uploads from the start
+            if isinstance(file, tuple) and hasattr(file[1], "seek"):
+                file[1].seek(0)
+            return await self.inner.transcribe(file, language=language)
+
+        return await self._call("stt", attempt)
+
+    async def synthesize(self, text: str, voice: str, fmt: str) -> bytes:
+        return await self._call("tts", lambda: self.inner.synthesize(text, voice=voice, fmt=fmt))
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+    # ---------- Metrics ----------
+    def stats(self) -> Dict[str, Any]:
+        out = {}
+        for op, c in self.counters.items():
+            breaker = self.breakers[op]
+            p95 = self.latency[op].p95()
+            out[op] = {**c, "breaker": breaker.state, "breaker_opens": breaker.opens,
+                       "short_circuits": breaker.short_circuits,
+                       "p95_ms": round(p95 * 1000, 1) if p95 is not None else None}
+        return out
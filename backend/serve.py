@@ -0,0 +1,183 @@
+# serve.py
+# Production entry point: N uvicorn worker processes behind one listening socket (main.py's
+# __main__ block stays the single-process dev server with --reload).
+#
+# State that has to be the same in every worker lives behind process-safe backends: sessions in
+# SQLite (they also survive a restart), the feedback log (flock'd appends) and the analytics store
+# as before, /turn audio clips and POSTed LiDAR events in shared files. The question bank is
+# validated once here and published as a snapshot file each worker loads without re-validating; on an edit the
+# supervisor publishes a new version and every worker swaps it in.
+#
+# SIGTERM: workers stop accepting, let in-flight requests finish (up to SERVE_DRAIN_TIMEOUT_S),
+# then flush the feedback log and close the stores.
+#
+#     python serve.py --workers 4
+#     SERVE_WORKERS=4 SERVE_PORT=8000 python serve.py
+
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+
+import uvicorn
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger("serve")
+
+# ============ CONFIGURATION ============
+SERVE_HOST = os.getenv("SERVE_HOST", "0.0.0.0")
+SERVE_PORT = int(os.getenv("SERVE_PORT", "8000"))
+SERVE_WORKERS = int(os.getenv("SERVE_WORKERS", str(os.cpu_count() or 1)))
+# Longest a SIGTERM waits for in-flight requests (a /chat turn is a few LLM calls at most)
+SERVE_DRAIN_TIMEOUT_S = float(os.getenv("SERVE_DRAIN_TIMEOUT_S", "30"))
+# On top of the drain: main's shutdown handlers (feedback log flush, store close); then workers are killed
+SERVE_KILL_MARGIN_S = float(os.getenv("SERVE_KILL_MARGIN_S", "10"))
+# Shared-state defaults applied unless set in the environment
+SERVE_SHARED_DEFAULTS = {
+    "SESSION_BACKEND": "sqlite",
+    "QUESTION_BANK_SNAPSHOT": "data/question_bank.snapshot",
+    "AUDIO_CLIP_DIR": "data/audio_clips",
+    "LIDAR_EVENTS_PATH": "data/lidar_events.jsonl",
+}
+
+
+def prepare_environment(workers: int):
+    """Must run before main (or anything importing its config) is imported; workers inherit it."""
+    for key, value in SERVE_SHARED_DEFAULTS.items():
+        os.environ.setdefault(key, value)
+    if workers > 1 and os.environ["SESSION_BACKEND"] != "sqlite":
+        raise SystemExit(f"SESSION_BACKEND={os.environ['SESSION_BACKEND']} keeps sessions per process; "
+                         "use sqlite with more than one worker")
+
+
+class SnapshotPublisher:
+    """Validates the question bank in the supervisor and publishes it for the workers, now and on every edit."""
+
+    def __init__(self, questions_path: str, snapshot_path: str, exhibit_names, poll_s: float):
+        self.questions_path = questions_path
+        self.snapshot_path = snapshot_path
+        self.exhibit_names = list(exhibit_names)
+        self.poll_s = poll_s
+        self.version = 0
+        self._stop = threading.Event()
+
+    def publish(self, reload_config: bool = False) -> bool:
+        from question_bank import QuestionBankError, load_question_bank, write_snapshot
+        try:
+            bank = load_question_bank(self.questions_path, self.exhibit_names, self.version + 1, reload_config)
+        except (OSError, QuestionBankError) as e:
+            logger.error(f"Question bank not published, workers keep version {self.version}: {e}")
+            return False
+        write_snapshot(bank, self.exhibit_names, self.snapshot_path)
+        self.version = bank.version
+        logger.info(f"Published question bank version {bank.version} ({bank.content_hash}) to {self.snapshot_path}")
+        return True
+
+    def watch(self):
+        import config
+        from question_bank import FileWatcher
+        watcher = FileWatcher([self.questions_path, config.__file__])
+        while not self._stop.wait(self.poll_s):
+            if watcher.changed():
+                self.publish(reload_config=True)
+
+    def start(self):
+        if self.poll_s > 0:
+            threading.Thread(target=self.watch, name="question-bank-publisher", daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+
+def _run_worker(config: uvicorn.Config, sockets):
+    # Spawned child: fresh interpreter, so logging is set up again before serving the shared socket
+    config.configure_logging()
+    uvicorn.Server(config).run(sockets=sockets)
+
+
+class WorkerSupervisor:
+    """
+    Starts config.workers uvicorn workers on the shared sockets (public uvicorn API only: Config,
+    Server.run(sockets=...)). SIGTERM / SIGINT reach every worker at once, so all of them stop
+    accepting and drain together, and a worker that dies is replaced. A worker still alive
+    SERVE_KILL_MARGIN_S after the drain timeout is killed, so the supervisor always exits.
+    """
+
+    def __init__(self, config: uvicorn.Config, sockets):
+        self.config = config
+        self.sockets = sockets
+        self.processes = []
+        self.should_exit = threading.Event()
+        self._spawn = multiprocessing.get_context("spawn")
+
+    def _start_worker(self):
+        process = self._spawn.Process(target=_run_worker, args=(self.config, self.sockets))
+        process.start()
+        return process
+
+    def run(self):
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: self.should_exit.set())
+        self.processes = [self._start_worker() for _ in range(self.config.workers)]
+        logger.info(f"Started {len(self.processes)} workers: {[p.pid for p in self.processes]}")
+        while not self.should_exit.wait(1.0):
+            for i, process in enumerate(self.processes):
+                if not process.is_alive() and not self.should_exit.is_set():
+                    logger.error(f"Worker {process.pid} exited with {process.exitcode}, starting a new one")
+                    self.processes[i] = self._start_worker()
+        for process in self.processes:
+            process.terminate()
+        deadline = time.monotonic() + (self.config.timeout_graceful_shutdown or 0) + SERVE_KILL_MARGIN_S
+        for process in self.processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+        for process in self.processes:
+            if process.is_alive():
+                logger.error(f"Worker {process.pid} did not stop within the drain timeout, killing it")
+                process.kill()
+                process.join()
+
+
+def serve(host: str = SERVE_HOST, port: int = SERVE_PORT, workers: int = SERVE_WORKERS,
+          drain_timeout_s: float = SERVE_DRAIN_TIMEOUT_S, log_level: str = "info"):
+    prepare_environment(workers)
+    # Not main: the supervisor serves no requests, so it opens no stores, log writer or provider clients
+    from config import EXHIBITS
+    from question_bank import QUESTION_BANK_POLL_S, QUESTION_BANK_SNAPSHOT, QUESTIONS_PATH
+
+    publisher = SnapshotPublisher(QUESTIONS_PATH, QUESTION_BANK_SNAPSHOT, EXHIBITS, QUESTION_BANK_POLL_S)
+    if not publisher.publish() and not os.path.exists(QUESTION_BANK_SNAPSHOT):
+        raise SystemExit(f"No valid question bank at {QUESTIONS_PATH} and no previous snapshot")
+    publisher.start()
+    started = time.time()
+    config = uvicorn.Config("main:app", host=host, port=port, workers=workers, log_level=log_level,
+                            timeout_graceful_shutdown=drain_timeout_s)
+    try:
+        if workers > 1:
+            # Spawned workers share one socket; each drains and runs main's shutdown handlers on SIGTERM
+            WorkerSupervisor(config, sockets=[config.bind_socket()]).run()
+        else:
+            uvicorn.Server(config).run()
+    finally:
+        publisher.stop()
+        logger.info(f"Stopped after {time.time() - started:.0f} s")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Multi-process server for the exhibit feedback API")
+    parser.add_argument("--host", default=SERVE_HOST)
+    parser.add_argument("--port", type=int, default=SERVE_PORT)
+    parser.add_argument("--workers", type=int, default=SERVE_WORKERS)
+    parser.add_argument("--drain-timeout", type=float, default=SERVE_DRAIN_TIMEOUT_S)
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.INFO))
+    serve(args.host, args.port, max(1, args.workers), args.drain_timeout, args.log_level)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,127 @@
+# session_state.py
+# Typed per-visitor session: a slotted object instead of a dict of ad-hoc keys, the asked
+# questions as an int bitmask over interned question ids, message roles as one-byte enums, and a
+# compact struct-packed binary form for stores that persist sessions (SQLite).
+
+import struct
+from itertools import accumulate
+from typing import List, Optional
+
+from conversation_memory import ConversationMemory, Role
+from question_bank import QUESTION_IDS
+
+ENCODING_VERSION = 1
+
+# version, flags, turn_count, selection_attempts, asked ids, turns, summary lines
+_HEADER = struct.Struct("<BBIIHHH")
+_HAS_EXHIBIT, _HAS_LAST_QID, _HAS_ZONE, _FORCE_OPEN_CHOICE = 1, 2, 4, 8
+_OPTIONAL_FIELDS = ((_HAS_EXHIBIT, "selected_exhibit"), (_HAS_LAST_QID, "last_qid"), (_HAS_ZONE, "zone"))
+_OPTIONAL_COUNT = tuple(bin(flags).count("1") for flags in range(8))  # optional strings present per flag combination
+_ROLES = tuple(Role)
+
+
+class SessionState:
+    """One visitor conversation. Mutated in place by the chat flow; callers put() it back to the store."""
+
+    __slots__ = ("session_id", "memory", "selected_exhibit", "last_qid", "asked", "turn_count",
+                 "selection_attempts", "force_open_choice", "zone")
+
+    def __init__(self, session_id: str, memory: Optional[ConversationMemory] = None):
+        self.session_id = session_id
+        self.memory = memory if memory is not None else ConversationMemory()  # recent turns + rolling summary
+        self.selected_exhibit: Optional[str] = None
+        self.last_qid: Optional[str] = None
+        self.asked = 0  # QUESTION_IDS bits of every question asked so far
+        self.turn_count = 0
+        self.selection_attempts = 0  # exhibit prompts without an answer, drives the LiDAR / generic / exit ladder
+        self.force_open_choice = False  # the visitor asked to pick an exhibit themselves (one-shot)
+        self.zone: Optional[str] = None  # kiosk location, picks the zone's LiDAR ranking
+
+    def has_asked(self, qid: str) -> bool:
+        return bool(self.asked & QUESTION_IDS.bit(qid))
+
+    def mark_asked(self, qid: str):
+        self.asked |= QUESTION_IDS.bit(qid)
+
+    @property
+    def asked_qids(self) -> List[str]:
+        return QUESTION_IDS.ids(self.asked)
+
+    def copy(self) -> "SessionState":
+        """Independent flags and counters (asked is an int); the memory is shared, not copied."""
+        other = SessionState.__new__(SessionState)
+        other.session_id, other.memory, other.zone = self.session_id, self.memory, self.zone
+        other.selected_exhibit, other.last_qid, other.asked = self.selected_exhibit, self.last_qid, self.asked
+        other.turn_count, other.selection_attempts = self.turn_count, self.selection_attempts
+        other.force_open_choice = self.force_open_choice
+        return other
+
+    def __repr__(self) -> str:
+        return (f"SessionState({self.session_id!r}, exhibit={self.selected_exhibit!r}, last_qid={self.last_qid!r}, "
+                f"turns={self.turn_count}, asked={self.asked_qids})")
+
+
+# ---------- Binary encoding ----------
+def encode_session(s: SessionState) -> bytes:
+    """
+    Header with the counters and item counts, then arrays: the length (in characters) of every
+    string, one role byte per turn, the token counts of the turns and summary lines, and finally
+    all strings as one UTF-8 run: session id, the optional exhibit / last question / zone, the
+    asked question ids (by name: bit positions are per process), turn contents, summary lines.
+    Decoding is a handful of struct calls and one UTF-8 decode however long the history is.
+    """
+    memory = s.memory
+    asked = QUESTION_IDS.ids(s.asked)
+    strings = [s.session_id]
+    flags = _FORCE_OPEN_CHOICE if s.force_open_choice else 0
+    for flag, attr in _OPTIONAL_FIELDS:
+        value = getattr(s, attr)
+        if value is not None:
+            flags |= flag
+            strings.append(value)
+    strings += asked
+    strings += [content for _, content, _ in memory.turns]
+    strings += [line for line, _ in memory.summary]
+    tokens = [t for _, _, t in memory.turns] + [t for _, t in memory.summary]
+    return b"".join((
+        _HEADER.pack(ENCODING_VERSION, flags, s.turn_count, s.selection_attempts,
+                     len(asked), len(memory.turns), len(memory.summary)),
+        struct.pack(f"<{len(strings)}I", *map(len, strings)),
+        bytes(role for role, _, _ in memory.turns),
+        struct.pack(f"<{len(tokens)}I", *tokens),
+        "".join(strings).encode("utf-8"),
+    ))
+
+
+def decode_session(data: bytes) -> SessionState:
+    version, flags, turn_count, selection_attempts, n_asked, n_turns, n_summary = _HEADER.unpack_from(data)
+    if version != ENCODING_VERSION:
+        raise ValueError(f"Unknown session encoding version {version}")
+    n_strings = 1 + _OPTIONAL_COUNT[flags & 7] + n_asked + n_turns + n_summary
+    offset = _HEADER.size + 4 * n_strings
+    lengths = struct.unpack_from(f"<{n_strings}I", data, _HEADER.size)
+    roles = data[offset:offset + n_turns]
+    offset += n_turns
+    tokens = struct.unpack_from(f"<{n_turns + n_summary}I", data, offset)
+    text = data[offset + 4 * (n_turns + n_summary):].decode("utf-8")
+    bounds = list(accumulate(lengths, initial=0))
+    strings = list(map(text.__getitem__, map(slice, bounds, bounds[1:])))
+
+    s = SessionState.__new__(SessionState)
+    s.session_id = strings[0]
+    i = 1
+    for flag, attr in _OPTIONAL_FIELDS:
+        if flags & flag:
+            setattr(s, attr, strings[i])
+            i += 1
+        else:
+            setattr(s, attr, None)
+    asked_end, turns_end = i + n_asked, i + n_asked + n_turns
+    s.asked = QUESTION_IDS.mask(strings[i:asked_end])
+    s.memory = ConversationMemory.restore(zip(map(_ROLES.__getitem__, roles), strings[asked_end:turns_end], tokens),
+                                          zip(strings[turns_end:], tokens[n_turns:]))
+    s.turn_count = turn_count
+    s.selection_attempts = selection_attempts
+    s.force_open_choice = bool(flags & _FORCE_OPEN_CHOICE)
+    return s
+
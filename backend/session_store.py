@@ -0,0 +1,179 @@
+# session_store.py
+# Pluggable session storage: bounded in-memory LRU with idle TTL, or a shared SQLite file
+# so several uvicorn workers can serve the same kiosk without sticky routing.
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from session_state import SessionState, decode_session, encode_session
+
+# ============ CONFIGURATION ============
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")  # memory | sqlite
+SESSION_MAX = int(os.getenv("SESSION_MAX", "5000"))
+SESSION_IDLE_TTL_S = float(os.getenv("SESSION_IDLE_TTL_S", "1800"))
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", "data/sessions.db")
+
+
+class SessionStore:
+    """
+    Interface used by main._get_session / _save_session.
+
+    get() returns None for unknown or expired sessions. Sessions are SessionState objects;
+    callers must put() after mutating them (a shared backend hands out copies).
+    """
+
+    blocking = False  # True: methods do I/O, main calls them through asyncio.to_thread
+
+    def get(self, session_id: str) -> Optional[SessionState]:
+        raise NotImplementedError
+
+    def put(self, session_id: str, session: SessionState) -> None:
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> None:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": type(self).__name__, "sessions": len(self)}
+
+    def close(self) -> None:
+        pass
+
+
+class MemorySessionStore(SessionStore):
+    """Per-process LRU bounded by max_size; sessions idle for longer than idle_ttl_s are dropped."""
+
+    def __init__(self, max_size: int = SESSION_MAX, idle_ttl_s: float = SESSION_IDLE_TTL_S):
+        self.max_size = max_size
+        self.idle_ttl_s = idle_ttl_s
+        self._data: "OrderedDict[str, SessionState]" = OrderedDict()
+        self._last_seen: Dict[str, float] = {}
+        self.evicted = 0
+        self.expired = 0
+
+    def _purge(self, now: float):
+        # Oldest entries sit at the front, so expiry stops at the first live session
+        while self._data:
+            oldest = next(iter(self._data))
+            if now - self._last_seen[oldest] <= self.idle_ttl_s:
+                break
+            self._drop(oldest)
+            self.expired += 1
+
+    def _drop(self, session_id: str):
+        self._data.pop(session_id, None)
+        self._last_seen.pop(session_id, None)
+
+    def get(self, session_id: str) -> Optional[SessionState]:
+        now = time.time()
+        self._purge(now)
+        session = self._data.get(session_id)
+        if session is not None:
+            self._data.move_to_end(session_id)
+            self._last_seen[session_id] = now
+        return session
+
+    def put(self, session_id: str, session: SessionState) -> None:
+        now = time.time()
+        self._data[session_id] = session
+        self._data.move_to_end(session_id)
+        self._last_seen[session_id] = now
+        while len(self._data) > self.max_size:
+            self._drop(next(iter(self._data)))
+            self.evicted += 1
+
+    def delete(self, session_id: str) -> None:
+        self._drop(session_id)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "max_size": self.max_size, "idle_ttl_s": self.idle_ttl_s,
+                "evicted": self.evicted, "expired": self.expired}
+
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessions in a SQLite file (WAL mode) shared by every worker on the host.
+    Same LRU + idle-TTL policy as the memory store, enforced with SQL on write.
+    """
+
+    PURGE_EVERY = 100  # writes between TTL/size sweeps
+    blocking = True
+
+    def __init__(self, path: str = SESSION_DB_PATH, max_size: int = SESSION_MAX, idle_ttl_s: float = SESSION_IDLE_TTL_S):
+        self.max_size = max_size
+        self.idle_ttl_s = idle_ttl_s
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=5, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # data: encode_session() bytes
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions (id TEXT PRIMARY KEY, data BLOB NOT NULL, last_seen REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_last_seen ON sessions(last_seen)")
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def get(self, session_id: str) -> Optional[SessionState]:
+        with self._lock:
+            row = self._conn.execute("SELECT data, last_seen FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        if row is None or time.time() - row[1] > self.idle_ttl_s:
+            return None
+        return decode_session(row[0])
+
+    def put(self, session_id: str, session: SessionState) -> None:
+        data = encode_session(session)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sessions (id, data, last_seen) VALUES (?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET data = excluded.data, last_seen = excluded.last_seen",
+                (session_id, data, now),
+            )
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                self._purge(now)
+
+    def _purge(self, now: float):
+        self._conn.execute("DELETE FROM sessions WHERE last_seen < ?", (now - self.idle_ttl_s,))
+        self._conn.execute(
+            "DELETE FROM sessions WHERE id IN (SELECT id FROM sessions ORDER BY last_seen DESC LIMIT -1 OFFSET ?)",
+            (self.max_size,),
+        )
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "max_size": self.max_size, "idle_ttl_s": self.idle_ttl_s}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def create_session_store(backend: str = SESSION_BACKEND) -> SessionStore:
+    if backend == "sqlite":
+        return SQLiteSessionStore()
+    if backend != "memory":
+        raise ValueError(f"Unknown SESSION_BACKEND: {backend}")
+    return MemorySessionStore()
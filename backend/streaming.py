@@ -0,0 +1,124 @@
+# streaming.py
+# Sentence-chunked incremental TTS: split a token stream at sentence boundaries and
+# synthesize each sentence while the model is still generating the next one.
+
+import asyncio
+import base64
+import logging
+import re
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# End of sentence = . ! ? (optionally followed by closing quotes/brackets) and then whitespace
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+")
+
+# Avoid splitting tiny fragments ("Oh. ", "e.g. ") into their own TTS call
+MIN_SENTENCE_CHARS = 20
+
+
+class SentenceChunker:
+    """
+    Incrementally collects text deltas and returns complete sentences as soon as they end.
+    """
+
+    def __init__(self, min_chars: int = MIN_SENTENCE_CHARS):
+        self.min_chars = min_chars
+        self._buf = ""
+
+    def feed(self, delta: str) -> List[str]:
+        self._buf += delta
+        sentences = []
+        start = 0
+        for m in _SENTENCE_END.finditer(self._buf):
+            if m.end() - start < self.min_chars:
+                continue
+            sentences.append(self._buf[start:m.end()].strip())
+            start = m.end()
+        self._buf = self._buf[start:]
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        rest, self._buf = self._buf.strip(), ""
+        return rest or None
+
+
+async def speak_stream(
+    deltas: AsyncIterator[str],
+    synthesize: Optional[Callable[[str], Awaitable[bytes]]],
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Turns a token stream into ordered events:
+      {"event": "token", "text": ...}                      for every delta
+      {"event": "audio", "index": i, "text": ..., "audio": <base64>}  per sentence, in order
+      {"event": "audio_error", "index": i, "text": ..., "detail": ...}  instead, when its TTS failed
+      {"event": "done", "reply_text": ...}                 once everything is sent
+
+    A failed sentence does not end the stream: the text was already sent as tokens, and the
+    turn still has to finish (saved, logged) with the full reply.
+
+    TTS for sentence i starts the moment it is complete, so it overlaps with generation
+    of sentence i+1. Pass synthesize=None for a text-only stream.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    tts_tasks: asyncio.Queue = asyncio.Queue()
+    parts: List[str] = []
+
+    def start_tts(sentence: str):
+        if synthesize is not None:
+            tts_tasks.put_nowait((sentence, asyncio.create_task(synthesize(sentence))))
+
+    async def produce():
+        chunker = SentenceChunker()
+        try:
+            async for delta in deltas:
+                parts.append(delta)
+                await queue.put({"event": "token", "text": delta})
+                for sentence in chunker.feed(delta):
+                    start_tts(sentence)
+            tail = chunker.flush()
+            if tail:
+                start_tts(tail)
+        finally:
+            tts_tasks.put_nowait(None)
+
+    async def emit_audio():
+        index = 0
+        while True:
+            item = await tts_tasks.get()
+            if item is None:
+                break
+            sentence, task = item
+            try:
+                audio = await task
+            except Exception as e:
+                detail = getattr(e, "detail", None) or str(e)
+                logger.warning(f"Stream TTS failed for sentence {index}: {detail}")
+                await queue.put({"event": "audio_error", "index": index, "text": sentence, "detail": detail})
+            else:
+                await queue.put({
+                    "event": "audio",
+                    "index": index,
+                    "text": sentence,
+                    "audio": base64.b64encode(audio).decode("ascii"),
+                })
+            index += 1
+
+    workers = [asyncio.create_task(produce()), asyncio.create_task(emit_audio())]
+    done_marker = asyncio.gather(*workers)
+    done_marker.add_done_callback(lambda _: queue.put_nowait(None))
+    try:
+        while True:
+            event = await queue.get()
+            if event is None:
+                break
+            yield event
+        await done_marker  # re-raise provider errors
+        yield {"event": "done", "reply_text": "".join(parts).strip()}
+    finally:
+        for w in workers:
+            w.cancel()
+        while not tts_tasks.empty():
+            item = tts_tasks.get_nowait()
+            if item is not None:
+                item[1].cancel()
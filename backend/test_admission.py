@@ -0,0 +1,74 @@
+# test_admission.py
+# Admission control: queue order by priority, 429s when the queue is full, too slow or /start is rate-limited.
+
+import asyncio
+
+import httpx
+import pytest
+
+from admission import PRIORITY_ACTIVE, PRIORITY_NEW, AdmissionController, AdmissionMiddleware
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_freed_slots_go_to_active_conversations_first():
+    ctl = AdmissionController(max_active=1, queue_max=8, start_queue_max=8, queue_timeout_s=5, start_rate=0)
+    assert await ctl.acquire(PRIORITY_ACTIVE)
+    order = []
+
+    async def waiter(name, priority):
+        assert await ctl.acquire(priority)
+        order.append(name)
+
+    tasks = [asyncio.create_task(waiter("start-1", PRIORITY_NEW)), asyncio.create_task(waiter("chat-1", PRIORITY_ACTIVE)),
+             asyncio.create_task(waiter("start-2", PRIORITY_NEW)), asyncio.create_task(waiter("chat-2", PRIORITY_ACTIVE))]
+    await asyncio.sleep(0)
+    assert ctl.queued == 4
+    for _ in tasks:
+        ctl.release()
+        await asyncio.sleep(0)
+    await asyncio.gather(*tasks)
+    assert order == ["chat-1", "chat-2", "start-1", "start-2"]
+    assert ctl.active == 1 and ctl.queued == 0
+
+
+async def test_rejects_when_queue_full_or_wait_too_long():
+    ctl = AdmissionController(max_active=1, queue_max=1, start_queue_max=0, queue_timeout_s=0.01, start_rate=0)
+    assert await ctl.acquire(PRIORITY_ACTIVE)
+    assert not await ctl.acquire(PRIORITY_NEW)  # new conversations may not queue at all here
+    queued = asyncio.create_task(ctl.acquire(PRIORITY_ACTIVE))
+    await asyncio.sleep(0)
+    assert not await ctl.acquire(PRIORITY_ACTIVE)  # queue full
+    assert not await queued  # timed out waiting
+    assert ctl.counters["rejected_full"] == 2 and ctl.counters["rejected_timeout"] == 1
+    assert ctl.queued == 0
+
+
+async def test_start_rate_limit():
+    ctl = AdmissionController(max_active=10, start_rate=0.001, start_burst=2)
+    assert await ctl.acquire(PRIORITY_NEW) and await ctl.acquire(PRIORITY_NEW)
+    assert not await ctl.acquire(PRIORITY_NEW)
+    assert await ctl.acquire(PRIORITY_ACTIVE)  # running conversations are not rate-limited
+    assert ctl.counters["rejected_start_rate"] == 1
+
+
+async def test_middleware_returns_429_with_retry_after():
+    release = asyncio.Event()
+
+    async def app(scope, receive, send):
+        await release.wait()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    ctl = AdmissionController(max_active=1, queue_max=0, queue_timeout_s=1, start_rate=0)
+    gated = AdmissionMiddleware(app, controller=ctl, priorities={"/chat": PRIORITY_ACTIVE})
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=gated), base_url="http://test") as c:
+        first = asyncio.create_task(c.post("/chat"))
+        while not ctl.active:
+            await asyncio.sleep(0)
+        busy = await c.post("/chat")
+        assert busy.status_code == 429 and busy.headers["retry-after"]
+        release.set()
+        assert (await first).status_code == 200
+        assert (await c.get("/health")).status_code == 200  # ungated path
+    assert ctl.active == 0
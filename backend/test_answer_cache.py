@@ -0,0 +1,48 @@
+# test_answer_cache.py
+# Cached factual answers: keys, fuzzy hits, and invalidation when the question bank content changes.
+
+import json
+
+import pytest
+
+import main
+from answer_cache import ANSWER_COUNTERS, AnswerCache
+
+pytestmark = pytest.mark.anyio
+
+REPLY = "Faces draws a portrait of you from the camera image in real time. Did it look like you?"
+
+
+def test_same_question_hits_and_reply_keeps_the_target_question():
+    cache = AnswerCache({"faces": "Faces"})
+    cache.put(cache.key("Faces", "How does Faces work?"), REPLY)
+    answer = cache.get(cache.key("Faces", "how does it work?"))
+    assert answer == "Faces draws a portrait of you from the camera image in real time."
+    assert cache.reply(answer, "What did you think?").endswith("What did you think?")
+    assert cache.get(cache.key("Sandbox", "How does it work?")) is None
+
+
+def test_non_questions_and_context_questions_are_not_cached():
+    cache = AnswerCache({"faces": "Faces"})
+    assert cache.key("Faces", "Maybe the faces one") is None
+    assert cache.key("Faces", "What do you mean?") is None
+
+
+async def test_reload_keeps_cache_only_when_content_hash_is_unchanged(question_bank_file):
+    cache = main.ANSWER_CACHE
+    cache.put(cache.key("Faces", "How does Faces work?"), REPLY)
+    assert len(cache) == 1
+
+    # Touching the file without changing it keeps the cached answers
+    question_bank_file.write_bytes(question_bank_file.read_bytes())
+    assert await main.reload_question_bank()
+    assert main.ANSWER_CACHE is cache and len(main.ANSWER_CACHE) == 1
+
+    invalidated = ANSWER_COUNTERS["invalidated"]
+    raw = json.loads(question_bank_file.read_text())
+    raw["Faces"]["one_liner"] = "A new description of Faces."
+    question_bank_file.write_text(json.dumps(raw))
+    assert await main.reload_question_bank()
+    assert main.ANSWER_CACHE is not cache and len(main.ANSWER_CACHE) == 0
+    assert main.ANSWER_CACHE.content_hash == main.QUESTION_BANK.content_hash != cache.content_hash
+    assert ANSWER_COUNTERS["invalidated"] == invalidated + 1
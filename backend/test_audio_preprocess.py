@@ -0,0 +1,44 @@
+# test_audio_preprocess.py
+# G.711 mu-law encoding of preprocessed STT clips (STT_COMPRESS=mulaw).
+
+import struct
+
+import pytest
+
+import audio_preprocess
+
+np = pytest.importorskip("numpy")
+
+# 16-bit linear sample -> G.711 mu-law byte (ITU-T G.711 / the reference encoder in audioop.lin2ulaw)
+G711_MULAW = {
+    0: 0xFF, 1: 0xFF, -1: 0x7E, 31: 0xFB, -31: 0x7B, 100: 0xF2, -100: 0x72, 1000: 0xCE, -1000: 0x4E,
+    4000: 0xAF, -4000: 0x2F, 8000: 0xA0, -8000: 0x20, 16000: 0x90, -16000: 0x10, 32000: 0x80, -32000: 0x00,
+    32767: 0x80, -32768: 0x00,
+}
+
+
+def as_float(samples):
+    # Half a step away from zero, so scaling back by 32767 truncates to exactly these integers
+    return np.array([(v + (0.5 if v >= 0 else -0.5)) / 32767 for v in samples])
+
+
+def test_mulaw_matches_g711():
+    encoded = audio_preprocess._mulaw(as_float(G711_MULAW))
+    assert list(encoded) == list(G711_MULAW.values())
+
+
+def test_mulaw_is_monotonic_and_sign_symmetric():
+    x = np.linspace(0, 1, 2001)
+    codes = np.frombuffer(audio_preprocess._mulaw(x), np.uint8).astype(int)
+    # Positive codes count down from 0xFF; negatives are the same codes with the sign bit cleared
+    assert np.all(np.diff(codes) <= 0)
+    negative = np.frombuffer(audio_preprocess._mulaw(-x[1:]), np.uint8).astype(int)
+    assert np.all(np.abs((codes[1:] & 0x7F) - negative) <= 1)
+
+
+def test_encode_wav_mulaw_header():
+    x = as_float([0, 1000, -1000, 32767])
+    wav = audio_preprocess.encode_wav(x, 16000, compress="mulaw")
+    tag, channels, rate, byte_rate, align, bits = struct.unpack_from("<HHIIHH", wav, 20)
+    assert (tag, channels, rate, byte_rate, align, bits) == (7, 1, 16000, 16000, 1, 8)
+    assert wav.endswith(bytes([0xFF, 0xCE, 0x4E, 0x80]))
@@ -0,0 +1,54 @@
+# test_choice_replies.py
+# Choice fast path: which answers count as plainly picking one declared choice.
+
+import pytest
+
+from choice_replies import ChoiceReplyEngine
+
+BANK = {
+    "D4A": {"display_name": "D4A Computer", "questions": [
+        {"id": "d4a_emotion", "text": "Nostalgic, primitive, or impressive?", "answer_type": "choice",
+         "choices": ["nostalgic", "primitive", "impressive", "boring"]},
+        {"id": "d4a_reason", "text": "What struck you most about it?", "answer_type": "open"},
+    ]},
+}
+
+
+@pytest.fixture
+def engine():
+    return ChoiceReplyEngine(BANK)
+
+
+@pytest.mark.parametrize("text, choice", [
+    ("Impressive", "impressive"),
+    ("pretty impressive!", "impressive"),
+    ("I'd say primitive.", "primitive"),
+    ("Nostalgic, definitely", "nostalgic"),
+])
+def test_plain_choice_answers_match(engine, text, choice):
+    assert engine.match("d4a_emotion", text) == choice
+
+
+@pytest.mark.parametrize("text", [
+    "not impressive",
+    "It wasn't boring",
+    "never primitive",
+    "impressive or primitive",  # two choices
+    "impressively small",  # whole words only
+    "is it primitive?",  # a question back
+    "impressive, but the screen was tiny and hard to read",  # more than a choice
+    "I liked the buttons",  # no choice at all
+])
+def test_negated_ambiguous_and_other_answers_do_not_match(engine, text):
+    assert engine.match("d4a_emotion", text) is None
+
+
+def test_open_and_unknown_questions_never_match(engine):
+    assert engine.match("d4a_reason", "impressive") is None
+    assert engine.match(None, "impressive") is None
+
+
+def test_reply_is_stable_and_ends_with_next_question(engine):
+    reply = engine.reply("d4a_emotion", "impressive", "What struck you most about it?")
+    assert reply.endswith(" What struck you most about it?") and "mpressive" in reply
+    assert engine.reply("d4a_emotion", "impressive", "What struck you most about it?") == reply
@@ -0,0 +1,41 @@
+# test_conversation_memory.py
+# History compaction: stays near the token budget, folds old turns into the summary, and never
+# evicts the last assistant turn (the question being answered) or the newest messages.
+
+from conversation_memory import MEMORY_MIN_RECENT, ConversationMemory, Role
+
+LONG = "and then I walked around the whole room looking at every single screen for a while " * 3
+
+
+def test_compaction_keeps_the_last_assistant_turn():
+    memory = ConversationMemory(budget=200, summary_budget=60)
+    memory.append(Role.ASSISTANT, "Welcome! Which exhibit did you just visit?")
+    memory.append(Role.USER, "Faces")
+    memory.append(Role.ASSISTANT, "Nice. Did the portrait look like you?")
+    for _ in range(MEMORY_MIN_RECENT + 4):
+        memory.append(Role.USER, LONG)
+
+    contents = [m["content"] for m in memory.history()]
+    assert "Nice. Did the portrait look like you?" in contents
+    assert "Welcome! Which exhibit did you just visit?" not in contents
+    assert memory.history()[0]["role"] == "system"
+    assert "Guide asked: Which exhibit did you just visit?" in contents[0]
+    assert "Visitor said: Faces" in contents[0]
+
+
+def test_compaction_stays_near_budget_and_keeps_recent_messages():
+    memory = ConversationMemory(budget=150, summary_budget=40)
+    for i in range(30):
+        memory.append(Role.ASSISTANT if i % 2 else Role.USER, f"message {i} " + LONG[:80])
+    assert memory.tokens + memory.summary_tokens <= 150
+    assert memory.summary_tokens <= 40
+    recent = [m["content"] for m in memory.history()[-MEMORY_MIN_RECENT:]]
+    assert recent[-1].startswith("message 29")
+
+
+def test_assistant_small_talk_without_a_question_is_not_summarized():
+    memory = ConversationMemory(budget=60, summary_budget=60)
+    memory.append("assistant", "Great, thanks for sharing that with me today.")
+    for _ in range(MEMORY_MIN_RECENT + 1):
+        memory.append("user", "ok " * 20)
+    assert not any(line.startswith("Guide") for line, _ in memory.summary)
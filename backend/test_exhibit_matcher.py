@@ -0,0 +1,41 @@
+# test_exhibit_matcher.py
+# Exhibit detection: whole words only, plain plurals, longest phrase first, names over keywords.
+
+import pytest
+
+from config import EXHIBITS, KEYWORD_MAPPING
+from exhibit_matcher import ExhibitMatcher
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return ExhibitMatcher.build({"D4A": {"display_name": "D4A Computer"}}, EXHIBITS, KEYWORD_MAPPING)
+
+
+@pytest.mark.parametrize("text", ["Can you say that again?", "I sat on a chair", "It was plain", "said"])
+def test_short_keywords_only_match_whole_words(matcher, text):
+    assert matcher.best(text) is None
+
+
+@pytest.mark.parametrize("text, exhibit", [
+    ("the AI one", "Asan.AI"),
+    ("I liked asan.ai", "Asan.AI"),
+    ("all those circuits", "Circuit Flowfields"),
+    ("the bots were funny", "Chatbot"),
+    ("the data traces wall", "Data traces"),
+    ("the server kit", "Server kit"),
+    ("the D4A computer", "D4A"),
+])
+def test_names_keywords_plurals_and_phrases(matcher, text, exhibit):
+    assert matcher.best(text) == exhibit
+
+
+def test_longest_phrase_wins_without_double_counting(matcher):
+    # "server kit" is one match for Server kit, not also a "server" hit for Server cabinet
+    assert [name for name, _ in matcher.candidates("the server kit")] == ["Server kit"]
+
+
+def test_official_name_outweighs_keyword(matcher):
+    found = dict(matcher.candidates("I saw Faces after the chat"))
+    assert found["Faces"] > found["Chatbot"]
+    assert matcher.best("I saw Faces after the chat") == "Faces"
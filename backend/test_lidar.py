@@ -0,0 +1,66 @@
+# test_lidar.py
+# Forward-decayed LiDAR rankings: incremental top-k against a brute-force recomputation, decay
+# and rebasing, and the session -> zone -> overall -> file fallback of suggestions().
+
+import json
+import math
+import random
+
+import pytest
+
+from lidar import DecayedRanking, LidarRankings
+
+EXHIBITS = ["Faces", "Sandbox", "Chatbot", "D4A", "Time travel", "Magic Mirror", "Film Forms"]
+
+
+def brute_force_top(events, now, half_life_s, k):
+    totals = {}
+    for exhibit, dwell, ts in events:
+        totals[exhibit] = totals.get(exhibit, 0.0) + dwell * 0.5 ** ((now - ts) / half_life_s)
+    return tuple(sorted(totals, key=totals.get, reverse=True)[:k])
+
+
+def test_incremental_top_k_matches_brute_force():
+    rng = random.Random(7)
+    ranking = DecayedRanking(half_life_s=600, k=3, t0=0.0)
+    events, ts = [], 0.0
+    for _ in range(500):
+        ts += rng.uniform(0, 30)
+        event = (rng.choice(EXHIBITS), rng.uniform(1, 120), ts)
+        events.append(event)
+        ranking.add(*event)
+        assert ranking.top() == brute_force_top(events, ts, 600, 3)
+
+
+def test_recent_dwell_outranks_older_dwell():
+    ranking = DecayedRanking(half_life_s=60, k=2, t0=0.0)
+    ranking.add("Faces", 100, 0)
+    ranking.add("Sandbox", 30, 180)  # 100 s three half-lives ago is worth 12.5 s now
+    assert ranking.top() == ("Sandbox", "Faces")
+    scores = dict(ranking.scores(now=180))
+    assert scores["Faces"] == pytest.approx(12.5) and scores["Sandbox"] == pytest.approx(30)
+
+
+def test_rebase_keeps_scores_finite_and_ordered():
+    ranking = DecayedRanking(half_life_s=1, k=2, t0=0.0)
+    ranking.add("Faces", 10, 0)
+    ranking.add("Sandbox", 10, 1000)  # exponent ~693 without the rebase
+    ranking.add("Faces", 10, 1000.5)
+    assert ranking.top() == ("Faces", "Sandbox")
+    assert all(math.isfinite(s) for _, s in ranking.scores(now=1000.5))
+
+
+def test_suggestions_prefer_the_most_specific_full_ranking(tmp_path):
+    stats_file = tmp_path / "lidar_stats.json"
+    stats_file.write_text(json.dumps(["D4A", "Chatbot"]))
+    lidar = LidarRankings(stats_path=str(stats_file), k=2)
+    assert lidar.suggestions() == ("D4A", "Chatbot")
+
+    lidar.ingest("Faces", 50, ts=100, zone="entrance", session_id="s1")
+    assert lidar.suggestions("s1", "entrance") == ("D4A", "Chatbot")  # nothing has 2 exhibits yet
+    lidar.ingest("Sandbox", 20, ts=101, zone="entrance")
+    assert lidar.suggestions("s1", "entrance") == ("Faces", "Sandbox")  # zone
+    lidar.ingest("Time travel", 90, ts=102, session_id="s1")
+    assert lidar.suggestions("s1", "entrance") == ("Time travel", "Faces")  # session
+    assert lidar.counters["from_file"] == 2 and lidar.counters["from_zone"] == 1
+    assert lidar.counters["from_session"] == 1
@@ -0,0 +1,54 @@
+# test_question_bank.py
+# Question bank validation and hot reload: an invalid edit must leave the live snapshot in place.
+
+import json
+
+import pytest
+
+import main
+from question_bank import QuestionBankError, validate_bank
+
+pytestmark = pytest.mark.anyio
+
+PACK = {"one_liner": "Your face, drawn by a camera.",
+        "questions": [{"id": "faces_q1", "text": "Did it look like you?", "answer_type": "open"}]}
+
+
+@pytest.mark.parametrize("raw, mapping, error", [
+    ({"Faces": {"questions": [{"id": "q", "text": "Pick one", "answer_type": "choice"}]}}, {}, "choice"),
+    ({"Faces": PACK, "Sandbox": PACK}, {}, "already used by Faces"),
+    ({"Faces": PACK}, {"camera": "Facez"}, "unknown exhibit 'Facez'"),
+    ([PACK], {}, "must be an object"),
+])
+def test_validate_bank_rejects(raw, mapping, error):
+    with pytest.raises(QuestionBankError, match=error):
+        validate_bank(raw, mapping, ["Faces", "Sandbox"])
+
+
+async def test_invalid_reload_keeps_previous_snapshot(question_bank_file):
+    live = main.QUESTION_BANK
+    errors = main.QUESTION_BANK_STATS["reload_errors"]
+
+    raw = json.loads(question_bank_file.read_text())
+    raw["Faces"]["questions"][0]["id"] = raw["Sandbox"]["questions"][0]["id"]  # duplicate question id
+    question_bank_file.write_text(json.dumps(raw))
+    assert not await main.reload_question_bank()
+    assert main.QUESTION_BANK is live
+    assert main.QUESTION_BANK_STATS["reload_errors"] == errors + 1
+    assert "already used by" in main.QUESTION_BANK_STATS["last_error"]
+
+    question_bank_file.write_text("{ not json")
+    assert not await main.reload_question_bank()
+    assert main.QUESTION_BANK is live
+
+
+async def test_valid_reload_swaps_snapshot(question_bank_file):
+    live = main.QUESTION_BANK
+    raw = json.loads(question_bank_file.read_text())
+    raw["Faces"]["one_liner"] = "A new description of Faces."
+    question_bank_file.write_text(json.dumps(raw))
+    assert await main.reload_question_bank()
+    assert main.QUESTION_BANK.version == live.version + 1
+    assert main.QUESTION_BANK.content_hash != live.content_hash
+    assert "A new description of Faces." in main.GLOBAL_KB_STR
+    assert main.QUESTION_BANK_STATS["last_error"] is None
@@ -0,0 +1,63 @@
+# test_resilience.py
+# Circuit breaker state machine and opt-in LLM hedging in resilience.py.
+
+import pytest
+
+import resilience
+from providers import FakeProvider
+from resilience import CircuitBreaker, ResilientProvider
+
+pytestmark = pytest.mark.anyio
+
+MESSAGES = [{"role": "user", "content": "Faces"}]
+
+
+def test_breaker_closed_open_half_open_closed(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failures=3, cooldown_s=10)
+
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.opens == 1
+    assert not breaker.allow() and breaker.short_circuits == 1
+
+    # After the cooldown a single probe goes through; everyone else is still refused
+    now[0] += 10
+    assert breaker.allow() and breaker.state == "half_open"
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_breaker_failed_probe_reopens(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failures=1, cooldown_s=5)
+    breaker.record_failure()
+    now[0] += 5
+    assert breaker.allow() and breaker.state == "half_open"
+    breaker.record_failure()
+    assert breaker.state == "open" and breaker.opens == 2
+    assert not breaker.allow()
+
+
+@pytest.mark.parametrize("hedge", [False, True])
+async def test_only_hedge_true_calls_are_hedged(monkeypatch, hedge):
+    monkeypatch.setattr(resilience, "HEDGE_DEFAULT_DELAY_S", 0.01)
+    inner = FakeProvider(llm_latency="const:50", token_ms=0)
+    provider = ResilientProvider(inner, retries=0, hedge=True)
+    reply = await provider.complete(MESSAGES, 50, hedge=hedge)
+    assert reply
+    assert provider.counters["llm"]["hedges"] == int(hedge)
+    assert inner.calls["llm"] == 1 + int(hedge)
+
+
+async def test_hedging_disabled_ignores_hedge_true(monkeypatch):
+    monkeypatch.setattr(resilience, "HEDGE_DEFAULT_DELAY_S", 0.01)
+    inner = FakeProvider(llm_latency="const:50", token_ms=0)
+    provider = ResilientProvider(inner, retries=0, hedge=False)
+    await provider.complete(MESSAGES, 50, hedge=True)
+    assert provider.counters["llm"]["hedges"] == 0 and inner.calls["llm"] == 1
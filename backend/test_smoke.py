@@ -0,0 +1,195 @@
+# test_smoke.py
+# End-to-end smoke tests: every kiosk endpoint once through the ASGI app with the fake provider
+# (fixtures in conftest.py). Run from backend/: python -m pytest -q
+
+import io
+import json
+import math
+import os
+import struct
+import wave
+
+import pytest
+from starlette.formparsers import MultiPartParser
+
+import audio_preprocess
+import main
+from audio_input import STT_MAX_UPLOAD_BYTES
+from conversation_memory import Role
+from session_state import SessionState, decode_session, encode_session
+from session_store import SQLiteSessionStore
+
+pytestmark = pytest.mark.anyio
+
+
+def make_wav(speech_s: float = 0.6, silence_s: float = 0.5, rate: int = 44100) -> bytes:
+    """Mono 16-bit clip: silence, a 220 Hz tone standing in for speech, silence."""
+    quiet = [0] * int(silence_s * rate)
+    tone = [int(8000 * math.sin(2 * math.pi * 220 * i / rate)) for i in range(int(speech_s * rate))]
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(struct.pack(f"<{len(quiet) * 2 + len(tone)}h", *quiet, *tone, *quiet))
+    return buf.getvalue()
+
+
+def sse_events(body: str):
+    return [json.loads(line[len("data: "):]) for line in body.splitlines() if line.startswith("data: ")]
+
+
+async def test_health_and_stats(client):
+    assert (await client.get("/")).json()["status"] == "healthy"
+    stats = (await client.get("/stats")).json()
+    assert stats["provider"]["backend"] == "fake"
+    assert stats["analytics"] is not None
+
+
+async def test_analytics(client):
+    ingest = await client.post("/analytics/ingest")
+    assert ingest.status_code == 200 and "pending_bytes" in ingest.json()
+    assert (await client.get("/analytics/overview")).status_code == 200
+    assert isinstance((await client.get("/analytics/daily")).json()["days"], list)
+
+
+async def test_start_then_chat(client):
+    start = await client.get("/start", params={"session_id": "s1"})
+    assert start.status_code == 200 and start.json()["reply_text"]
+    chat = await client.post("/chat", json={"session_id": "s1", "user_text": "Faces"})
+    assert chat.status_code == 200 and chat.json()["reply_text"]
+    assert len(main.SESSION_STORE.get("s1").memory) >= 3
+
+
+async def test_chat_with_sqlite_sessions(client, monkeypatch, tmp_path):
+    store = SQLiteSessionStore(os.path.join(tmp_path, "sessions.db"))
+    monkeypatch.setattr(main, "SESSION_STORE", store)
+    await client.get("/start", params={"session_id": "sq1"})
+    chat = await client.post("/chat", json={"session_id": "sq1", "user_text": "Faces"})
+    assert chat.status_code == 200
+    assert len(store.get("sq1").memory) >= 3
+    assert (await client.get("/stats")).json()["sessions"]["backend"] == "SQLiteSessionStore"
+
+
+async def test_chat_idempotency_key_runs_the_turn_once(client, fake_provider):
+    await client.get("/start", params={"session_id": "s2"})
+    body = {"session_id": "s2", "user_text": "It was fun, I liked the colours"}
+    headers = {"Idempotency-Key": "tap-1"}
+    first = await client.post("/chat", json=body, headers=headers)
+    calls = fake_provider.calls["llm"]
+    second = await client.post("/chat", json=body, headers=headers)
+    assert second.json() == first.json()
+    assert fake_provider.calls["llm"] == calls
+
+
+async def test_stt(client):
+    files = {"audio_file": ("clip.wav", make_wav(), "audio/wav")}
+    resp = await client.post("/stt", data={"session_id": "s3", "preprocess": "false"}, files=files)
+    assert resp.status_code == 200
+    assert resp.json()["transcript"] and resp.json()["bytes_saved"] is None
+
+
+async def test_stt_large_upload_stays_in_memory(client):
+    assert MultiPartParser.max_file_size == STT_MAX_UPLOAD_BYTES
+    files = {"audio_file": ("clip.wav", make_wav(speech_s=20), "audio/wav")}  # ~1.8 MB, above Starlette's spool
+    resp = await client.post("/stt", data={"session_id": "s3", "preprocess": "false"}, files=files)
+    assert resp.status_code == 200
+
+
+async def test_stt_preprocess(client):
+    files = {"audio_file": ("clip.wav", make_wav(), "audio/wav")}
+    resp = await client.post("/stt", data={"session_id": "s4", "preprocess": "true"}, files=files)
+    if not audio_preprocess.available():
+        assert resp.status_code == 501
+        return
+    assert resp.status_code == 200
+    assert resp.json()["transcript"] and resp.json()["bytes_saved"] > 0
+
+
+async def test_tts_post_and_get(client):
+    post = await client.post("/tts", json={"text": "Hello there.", "format": "wav"})
+    assert post.status_code == 200 and post.headers["content-type"] == "audio/wav"
+    assert post.content[:4] == b"RIFF"
+    get = await client.get("/tts", params={"text": "Hello there.", "format": "wav"})
+    assert get.status_code == 200 and get.content == post.content
+    cached = await client.get("/tts", params={"text": "Hello there.", "format": "wav"},
+                              headers={"If-None-Match": post.headers["etag"]})
+    assert cached.status_code == 304
+
+
+async def test_tts_rejects_unknown_format(client, tmp_path):
+    target = tmp_path / "escaped"
+    for resp in (
+        await client.post("/tts", json={"text": "Hello", "format": f"../../{target}"}),
+        await client.get("/tts", params={"text": "Hello", "format": "../x"}),
+        await client.post("/chat/stream", json={"session_id": "s5", "user_text": "hi"}, params={"format": "../x"}),
+    ):
+        assert resp.status_code == 400
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.parametrize("preprocess", [False, True])
+async def test_turn(client, monkeypatch, preprocess):
+    if preprocess and not audio_preprocess.available():
+        pytest.skip("STT preprocessing needs NumPy")
+    monkeypatch.setattr(main, "STT_PREPROCESS", preprocess)
+    await client.get("/start", params={"session_id": "s6"})
+    files = {"audio_file": ("clip.wav", make_wav(), "audio/wav")}
+    resp = await client.post("/turn", data={"session_id": "s6", "format": "wav"}, files=files)
+    assert resp.status_code == 200
+    turn = resp.json()
+    assert turn["transcript"] and turn["reply_text"]
+    audio = await client.get(turn["audio_url"])
+    assert audio.status_code == 200 and audio.content[:4] == b"RIFF"
+
+
+async def test_turn_with_shared_clip_dir(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(main, "AUDIO_CLIP_DIR", str(tmp_path))
+    await client.get("/start", params={"session_id": "s6b"})
+    files = {"audio_file": ("clip.wav", make_wav(), "audio/wav")}
+    turn = (await client.post("/turn", data={"session_id": "s6b", "format": "wav"}, files=files)).json()
+    assert [p.name for p in tmp_path.iterdir()] == [turn["audio_url"].rsplit("/", 1)[1] + ".wav"]
+    audio = await client.get(turn["audio_url"])
+    assert audio.status_code == 200 and audio.content[:4] == b"RIFF"
+    assert (await client.get("/audio/" + "0" * 32)).status_code == 404
+
+
+async def test_chat_stream(client):
+    await client.get("/start", params={"session_id": "s7"})
+    resp = await client.post("/chat/stream", json={"session_id": "s7", "user_text": "Faces"}, params={"format": "wav"})
+    assert resp.status_code == 200
+    events = sse_events(resp.text)
+    kinds = [e["event"] for e in events]
+    assert kinds[-1] == "done" and "token" in kinds and "audio" in kinds
+    assert events[-1]["reply_text"] == "".join(e["text"] for e in events if e["event"] == "token").strip()
+
+
+async def test_chat_stream_survives_a_failed_sentence(client, fake_provider, monkeypatch):
+    async def broken_tts(text, voice, fmt):
+        raise RuntimeError("tts down")
+
+    monkeypatch.setattr(fake_provider, "synthesize", broken_tts)
+    await client.get("/start", params={"session_id": "s8"})
+    before = len(main.SESSION_STORE.get("s8").memory)
+    resp = await client.post("/chat/stream", json={"session_id": "s8", "user_text": "Faces"}, params={"format": "mp3"})
+    kinds = [e["event"] for e in sse_events(resp.text)]
+    assert "audio_error" in kinds and kinds[-1] == "done"
+    assert len(main.SESSION_STORE.get("s8").memory) > before
+
+
+def test_session_encoding_round_trip(tmp_path):
+    s = SessionState("s9")
+    s.selected_exhibit, s.zone = "Faces", "entrance"
+    s.mark_asked("faces_q1")
+    s.memory.append(Role.ASSISTANT, "Hi! Which exhibit did you visit?")
+    s.memory.append(Role.USER, "Faces, the one with the camera \u2764")
+    restored = decode_session(encode_session(s))
+    assert (restored.selected_exhibit, restored.zone, restored.asked) == (s.selected_exhibit, s.zone, s.asked)
+    assert restored.memory.history() == s.memory.history()
+
+    store = SQLiteSessionStore(os.path.join(tmp_path, "sessions.db"))
+    try:
+        store.put("s9", s)
+        assert store.get("s9").memory.history() == s.memory.history()
+    finally:
+        store.close()
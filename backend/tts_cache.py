@@ -0,0 +1,189 @@
+# tts_cache.py
+# Content-addressed TTS audio cache: identical (text, voice, format, model) requests are
+# synthesized once, kept on disk (shared by workers, survives restarts) and, for the hottest
+# clips, in memory.
+
+import hashlib
+import os
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+# ============ CONFIGURATION ============
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "data/tts_cache")
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+TTS_CACHE_MEMORY_BYTES = int(os.getenv("TTS_CACHE_MEMORY_BYTES", str(32 * 1024 * 1024)))
+# Cache-Control max-age for cached clips; the URL/body is content-addressed so clips never change
+TTS_CACHE_MAX_AGE_S = int(os.getenv("TTS_CACHE_MAX_AGE_S", str(30 * 86400)))
+
+_KEY = re.compile(r"[0-9a-f]{64}")
+_EXTENSION = re.compile(r"[a-z0-9]{1,8}")
+
+
+def cache_key(text: str, voice: str, fmt: str, model: str) -> str:
+    # Unit separator keeps ("a b", "c") and ("a", "b c") apart
+    raw = "\x1f".join((model, voice, fmt, text))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """
+    Two-level LRU keyed by cache_key().
+
+    Disk: one file per clip (<dir>/<key[:2]>/<key>.<fmt>), written atomically, bounded by
+    max_bytes. Recency is the file mtime, so the order survives restarts and is shared by
+    workers; each process evicts only when its own view of the total is over budget.
+    Memory: byte-bounded LRU in front of the disk for clips served by /turn and /chat/stream.
+
+    Everything but get_memory() touches the disk; the server calls it through asyncio.to_thread.
+    load() (the walk over the existing files) runs once at startup, not at construction.
+    """
+
+    def __init__(
+        self,
+        directory: str = TTS_CACHE_DIR,
+        max_bytes: int = TTS_CACHE_MAX_BYTES,
+        memory_bytes: int = TTS_CACHE_MEMORY_BYTES,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_size = 0
+        # key -> (path, size), least recently used first
+        self._disk: "OrderedDict[str, tuple]" = OrderedDict()
+        self._disk_size = 0
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def load(self):
+        """Index the clips already on disk (older than anything stored or touched since)."""
+        if not os.path.isdir(self.directory):
+            return
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.startswith("."):
+                    continue  # half-written temp files
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, name.split(".", 1)[0], path, st.st_size))
+        with self._lock:
+            disk: "OrderedDict[str, tuple]" = OrderedDict()
+            for _, key, path, size in sorted(entries):
+                if key not in self._disk and key not in disk:
+                    disk[key] = (path, size)
+                    self._disk_size += size
+            disk.update(self._disk)
+            self._disk = disk
+
+    def _path(self, key: str, fmt: str) -> str:
+        # fmt reaches here from requests: only a plain extension may become part of a path
+        if not _KEY.fullmatch(key) or not _EXTENSION.fullmatch(fmt):
+            raise ValueError(f"Invalid TTS cache entry: {key!r}.{fmt!r}")
+        return os.path.join(self.directory, key[:2], f"{key}.{fmt}")
+
+    # ---------- Lookup ----------
+    def get_memory(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.hits_memory += 1
+            return audio
+
+    def get_path(self, key: str, fmt: str) -> Optional[str]:
+        """Path of the cached file (touching its recency), or None on a miss."""
+        path = self._path(key, fmt)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                entry = self._disk.pop(key, None)
+                if entry:
+                    self._disk_size -= entry[1]  # evicted by another worker
+                self.misses += 1
+            return None
+        with self._lock:
+            if key not in self._disk:
+                # Written by another worker
+                size = os.path.getsize(path)
+                self._disk[key] = (path, size)
+                self._disk_size += size
+            self._disk.move_to_end(key)
+            self.hits_disk += 1
+        return path
+
+    def get(self, key: str, fmt: str) -> Optional[bytes]:
+        audio = self.get_memory(key)
+        if audio is not None:
+            return audio
+        return self.read(key, fmt)
+
+    def read(self, key: str, fmt: str) -> Optional[bytes]:
+        """The clip from disk (kept in memory from then on), or None on a miss."""
+        path = self.get_path(key, fmt)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+        except FileNotFoundError:
+            return None
+        self._remember(key, audio)
+        return audio
+
+    # ---------- Store ----------
+    def put(self, key: str, fmt: str, audio: bytes):
+        path = self._path(key, fmt)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = os.path.join(os.path.dirname(path), f".{uuid.uuid4().hex}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(audio)
+        os.replace(tmp, path)  # readers never see a partial clip
+        with self._lock:
+            old = self._disk.pop(key, None)
+            if old:
+                self._disk_size -= old[1]
+            self._disk[key] = (path, len(audio))
+            self._disk_size += len(audio)
+            while self._disk_size > self.max_bytes and len(self._disk) > 1:
+                _, (old_path, size) = self._disk.popitem(last=False)
+                self._disk_size -= size
+                self.evicted += 1
+                try:
+                    os.remove(old_path)
+                except FileNotFoundError:
+                    pass
+        self._remember(key, audio)
+
+    def _remember(self, key: str, audio: bytes):
+        if len(audio) > self.memory_bytes:
+            return
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_size -= len(old)
+            self._memory[key] = audio
+            self._memory_size += len(audio)
+            while self._memory_size > self.memory_bytes:
+                _, dropped = self._memory.popitem(last=False)
+                self._memory_size -= len(dropped)
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.hits_memory + self.hits_disk
+        lookups = hits + self.misses
+        return {
+            "entries": len(self._disk), "disk_bytes": self._disk_size, "max_bytes": self.max_bytes,
+            "memory_entries": len(self._memory), "memory_bytes": self._memory_size,
+            "hits_memory": self.hits_memory, "hits_disk": self.hits_disk, "misses": self.misses,
+            "evicted": self.evicted, "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,50 @@
+# warm_tts_cache.py
+# Deploy-time warm-up: pre-synthesizes every fixed line the kiosk speaks (the /start replies,
+# the fixed prompts of get_next_question_logic and every question text in exhibit_questions.json)
+# into the TTS cache, so visitors never wait on TTS for them.
+#
+#   python warm_tts_cache.py                       # default voice/format
+#   python warm_tts_cache.py --voice coral --voice alloy --format mp3 --format wav
+
+import argparse
+import asyncio
+import time
+
+import main
+from providers import close_provider
+from tts_cache import cache_key
+
+
+async def warm(voices, formats) -> int:
+    main.load_exhibit_questions()
+    main.TTS_CACHE.load()
+    texts = main.static_tts_texts()
+    jobs = [(t, v, f) for t in texts for v in voices for f in formats]
+    todo = [j for j in jobs if main.TTS_CACHE.get_path(cache_key(j[0], j[1], j[2], main.tts_model()), j[2]) is None]
+    print(f"{len(texts)} texts x {len(voices)} voices x {len(formats)} formats: "
+          f"{len(jobs) - len(todo)} cached, {len(todo)} to synthesize")
+
+    start = time.perf_counter()
+    # Concurrency is bounded by the provider's TTS semaphore (TTS_CONCURRENCY)
+    results = await asyncio.gather(*(main.synthesize_speech(t, v, f) for t, v, f in todo), return_exceptions=True)
+    failed = [(job, r) for job, r in zip(todo, results) if isinstance(r, Exception)]
+    for (text, voice, fmt), err in failed:
+        print(f"FAILED [{voice}/{fmt}] {text[:60]!r}: {getattr(err, 'detail', err)}")
+    await close_provider()
+
+    stats = main.TTS_CACHE.stats()
+    print(f"Done in {time.perf_counter() - start:.1f}s: {len(todo) - len(failed)} synthesized, {len(failed)} failed; "
+          f"cache holds {stats['entries']} clips ({stats['disk_bytes'] / 1e6:.1f} MB)")
+    return 1 if failed else 0
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Pre-synthesize all fixed kiosk texts into the TTS cache")
+    parser.add_argument("--voice", action="append", help=f"repeatable (default {main.DEFAULT_VOICE})")
+    parser.add_argument("--format", action="append", help=f"repeatable (default {main.DEFAULT_AUDIO_FORMAT})")
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(warm(args.voice or [main.DEFAULT_VOICE], args.format or [main.DEFAULT_AUDIO_FORMAT])))
+
+
+if __name__ == "__main__":
+    main_cli()
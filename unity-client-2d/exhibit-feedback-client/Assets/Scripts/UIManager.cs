@@ -28,6 +28,8 @@ public class UIManager : MonoBehaviour
 
     [Header("Backend")]
     [SerializeField] private string backendBaseUrl = "http://127.0.0.1:8000";
+    [Tooltip("Use the single-shot /turn endpoint (STT + chat + TTS in one request) instead of /stt -> /chat -> /tts.")]
+    [SerializeField] private bool useTurnEndpoint = true;
 
     [Header("Session Management")]
     [Tooltip("Reset session only when Idle and no interaction for this many seconds.")]
@@ -156,7 +158,8 @@ public class UIManager : MonoBehaviour
         if (currentState == AppState.Listening && micClip != null)
         {
             Microphone.End(micDevice);
-            StartCoroutine(SendAudioToSTTThenChat(micClip));
+            if (useTurnEndpoint) StartCoroutine(SendAudioToTurn(micClip));
+            else StartCoroutine(SendAudioToSTTThenChat(micClip));
             return;
         }
         StopAllCoroutines();
@@ -397,6 +400,100 @@ public class UIManager : MonoBehaviour
         }
     }
 
+    IEnumerator SendAudioToTurn(AudioClip clip)
+    {
+        ChangeState(AppState.Thinking);
+
+        byte[] wavData = WavUtility.FromAudioClip(clip, out string fileName);
+
+        WWWForm form = new WWWForm();
+        form.AddField("session_id", currentSessionId);
+        form.AddField("language", "en"); // change to "de" if needed
+        form.AddField("format", "mp3");
+        form.AddBinaryData("audio_file", wavData, fileName, "audio/wav");
+
+        using (UnityWebRequest req = UnityWebRequest.Post($"{backendBaseUrl}/turn", form))
+        {
+            yield return req.SendWebRequest();
+
+            if (req.result != UnityWebRequest.Result.Success)
+            {
+                Debug.LogError($"Turn failed: {req.error}\nBody: {req.downloadHandler.text}");
+                botReplyField.text = $"(turn error) {req.error}";
+                ChangeState(AppState.Idle);
+                yield break;
+            }
+
+            string json = req.downloadHandler.text;
+            TurnResponse turn = JsonUtility.FromJson<TurnResponse>(json);
+
+            if (turn == null || string.IsNullOrEmpty(turn.reply_text))
+            {
+                Debug.LogError($"Bad /turn JSON: {json}");
+                botReplyField.text = "(turn error) bad response";
+                ChangeState(AppState.Idle);
+                yield break;
+            }
+
+            TouchInteraction();
+
+            transcriptField.text = turn.transcript;
+            botReplyField.text = turn.reply_text;
+
+            yield return PlayAudioFromUrl($"{backendBaseUrl}{turn.audio_url}");
+
+            float totalTime = Time.time - _pipelineStartTime;
+            Debug.Log($"[TIMER] Total pipeline (/turn): {totalTime:F2}s ({totalTime*1000:F0}ms)");
+        }
+    }
+
+    IEnumerator PlayAudioFromUrl(string url)
+    {
+        if (ttsAudioSource == null)
+        {
+            Debug.LogWarning("TTS AudioSource not assigned. Skipping playback.");
+            ChangeState(AppState.Idle);
+            yield break;
+        }
+
+        ChangeState(AppState.Speaking);
+
+        using (var req = UnityWebRequestMultimedia.GetAudioClip(url, AudioType.MPEG))
+        {
+            yield return req.SendWebRequest();
+
+            if (req.result != UnityWebRequest.Result.Success)
+            {
+                Debug.LogError("Audio download failed: " + req.error);
+                ChangeState(AppState.Idle);
+                yield break;
+            }
+
+            var clip = DownloadHandlerAudioClip.GetContent(req);
+            if (clip == null || clip.length <= 0.01f)
+            {
+                Debug.LogError("Turn AudioClip is null/empty.");
+                ChangeState(AppState.Idle);
+                yield break;
+            }
+
+            ttsAudioSource.Stop();
+            ttsAudioSource.clip = clip;
+            ttsAudioSource.Play();
+
+            yield return null;
+
+            float startWait = Time.realtimeSinceStartup;
+            while (!ttsAudioSource.isPlaying && (Time.realtimeSinceStartup - startWait) < 0.5f)
+                yield return null;
+
+            while (ttsAudioSource.isPlaying)
+                yield return null;
+        }
+
+        ChangeState(AppState.Idle);
+    }
+
     IEnumerator CallTTSAndPlay(string text)
     {
         if (ttsAudioSource == null)
@@ -480,6 +577,15 @@ public class UIManager : MonoBehaviour
         public int processing_time_ms;
     }
 
+    [Serializable]
+    private class TurnResponse
+    {
+        public string transcript;
+        public string reply_text;
+        public string audio_url;
+        public int processing_time_ms;
+    }
+
     // Optional helper methods
     public void UpdateTranscript(string text) => transcriptField.text = text;
     public void UpdateBotReply(string text) => botReplyField.text = text;